@@ -3,10 +3,13 @@ FarmOG Station - Streamlit Dashboard
 Multi-modal disease detection system
 """
 
+import time
+_SCRIPT_START = time.perf_counter()
+
 import streamlit as st
-import numpy as np
 from PIL import Image
 import json
+import os
 import sys
 from pathlib import Path
 
@@ -14,8 +17,9 @@ from pathlib import Path
 parent_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(parent_dir))
 
-import tensorflow as tf
 from src.fusion_engine import FarmOGFusionEngine
+from src.prediction_cache import PredictionCache
+from src.risk_cache import CachedRiskScorer, RiskLookupTable
 from src.disease_siganture import get_disease_display_name
 
 # Page config
@@ -36,22 +40,59 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Load model
+# Inference backend: keras (default), tflite or tflite_int8
+MODEL_BACKEND = os.environ.get('FARMOG_BACKEND', 'keras')
+DEFAULT_MODEL_PATHS = {
+    'keras': 'notebooks/models/farmog_resnet50v2_classifier.h5',
+    'tflite': 'notebooks/models/resnet50v2.tflite',
+    'tflite_int8': 'notebooks/models/resnet50v2_int8.tflite'
+}
+MODEL_PATH = os.environ.get('FARMOG_MODEL_PATH', DEFAULT_MODEL_PATHS.get(MODEL_BACKEND))
+MODEL_THREADS = int(os.environ['FARMOG_THREADS']) if os.environ.get('FARMOG_THREADS') else None
+# Preprocessing profile of the model's backbone: resnet50v2, mobilenetv2 or efficientnetb0
+MODEL_BACKBONE = os.environ.get('FARMOG_BACKBONE', 'resnet50v2')
+# Optional SQLite file so cached predictions survive app restarts
+CACHE_PATH = os.environ.get('FARMOG_CACHE_PATH')
+# Model loading: background (warm in a thread), lazy (on first image) or eager
+MODEL_LOADING = os.environ.get('FARMOG_MODEL_LOADING', 'background')
+# Cascade mode: run the model above first (e.g. MobileNetV2) and escalate uncertain
+# images to this larger model (e.g. ResNet50V2)
+CASCADE_MODEL_PATH = os.environ.get('FARMOG_CASCADE_MODEL_PATH')
+CASCADE_BACKEND = os.environ.get('FARMOG_CASCADE_BACKEND', MODEL_BACKEND)
+CASCADE_BACKBONE = os.environ.get('FARMOG_CASCADE_BACKBONE', 'resnet50v2')
+CASCADE_MIN_CONFIDENCE = float(os.environ.get('FARMOG_CASCADE_MIN_CONFIDENCE', '0.8'))
+
+# Build the engine without blocking on the model; sensor-only use never loads TensorFlow
 @st.cache_resource
-def load_model():
-    model = tf.keras.models.load_model('notebooks/models/farmog_resnet50v2_classifier.h5')
+def load_engine():
     with open('notebooks/models/class_names.json', 'r') as f:
         class_names = json.load(f)
-    return model, class_names
+    prediction_cache = PredictionCache(db_path=CACHE_PATH)
+    engine = FarmOGFusionEngine.from_model_file(MODEL_PATH, class_names, backend=MODEL_BACKEND,
+                                                num_threads=MODEL_THREADS,
+                                                lazy=MODEL_LOADING != 'eager',
+                                                backbone=MODEL_BACKBONE,
+                                                prediction_cache=prediction_cache)
+    if CASCADE_MODEL_PATH:
+        # The large model only loads when the first image is escalated
+        fallback = FarmOGFusionEngine.from_model_file(CASCADE_MODEL_PATH, class_names,
+                                                      backend=CASCADE_BACKEND, num_threads=MODEL_THREADS,
+                                                      lazy=True, backbone=CASCADE_BACKBONE,
+                                                      prediction_cache=prediction_cache)
+        engine.enable_cascade(fallback, min_confidence=CASCADE_MIN_CONFIDENCE)
+    # Slider readings repeat on every rerun; score them from a memoized lookup table
+    engine.risk_scorer = CachedRiskScorer(lookup_table=RiskLookupTable())
+    if MODEL_LOADING == 'background':
+        engine.warm_up(background=True)
+    return engine
 
 # Initialize
 try:
-    model, class_names = load_model()
-    fusion_engine = FarmOGFusionEngine(model, class_names)
-    st.success("✅ Model loaded successfully")
+    fusion_engine = load_engine()
 except Exception as e:
     st.error(f"❌ Error loading model: {e}")
     st.stop()
+startup_ms = (time.perf_counter() - _SCRIPT_START) * 1000
 
 # Header
 st.markdown('<p class="main-header">🌱 FarmOG Station</p>', unsafe_allow_html=True)
@@ -64,6 +105,22 @@ with st.sidebar:
     mode = st.radio("Detection Mode", ["Vision + Sensor Fusion", "Vision Only", "Sensor Only"])
     st.markdown("---")
     st.info("Upload a plant image and enter sensor data for comprehensive diagnosis")
+    st.markdown("---")
+    st.caption(f"⏱️ Startup: {startup_ms:.0f} ms")
+    if fusion_engine.vision_ready:
+        load_time = fusion_engine.model_load_seconds
+        loaded_in = f" in {load_time:.1f} s" if load_time is not None else ""
+        st.caption(f"✅ Model ready ({MODEL_BACKEND}{loaded_in})")
+    elif MODEL_LOADING == 'background':
+        st.caption(f"⏳ Model loading in background ({MODEL_BACKEND})")
+    else:
+        st.caption(f"💤 Model loads on first image ({MODEL_BACKEND})")
+    cache_stats = fusion_engine.prediction_cache.stats()
+    st.caption(f"🗂️ Prediction cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+    if fusion_engine.cascade is not None:
+        cascade_stats = fusion_engine.cascade.stats()
+        st.caption(f"🪜 Cascade: {cascade_stats['escalated']} of {cascade_stats['images']} images escalated "
+                   f"({cascade_stats['escalation_rate']:.0%})")
 
 # Main content
 col1, col2 = st.columns([1, 1])
@@ -79,18 +136,16 @@ with col1:
         image = Image.open(uploaded_file)
         st.image(image, caption="Uploaded Image", use_container_width=True)
 
-        # Preprocess
-        img_resized = image.resize((224, 224))
-        img_array = np.array(img_resized)
-        from tensorflow.keras.applications.resnet_v2 import preprocess_input
-        img_array = preprocess_input(img_array)
-
-        # Predict
-        vision_results = fusion_engine.predict_from_image(img_array)
-
-        st.success("✅ Image analyzed")
-
         if mode == "Vision Only":
+            # Preprocess + predict (loads the model here if it is not warm yet)
+            try:
+                # Reruns and re-uploads of the same photo are served from the prediction cache
+                vision_results = fusion_engine.predict_from_file(uploaded_file.getvalue())
+            except Exception as e:
+                st.error(f"❌ Error loading model: {e}")
+                st.stop()
+
+            st.success("✅ Image analyzed")
             st.markdown("---")
             st.subheader("🔬 Vision Analysis Results")
 
@@ -126,10 +181,8 @@ with col1:
                     st.write(f"- {action}")
                 st.info(f"**Root Cause:** {disease_info['root_cause']}")
         else:
-            st.markdown("**Top Predictions:**")
-            top_preds = fusion_engine.get_top_vision_predictions(vision_results, top_n=3)
-            for disease, conf in top_preds:
-                st.write(f"- {get_disease_display_name(disease)}: {conf*100:.1f}%")
+            # Fusion: the image is predicted once below, together with the sensor diagnosis
+            vision_panel = st.container()
 
 with col2:
     if mode != "Vision Only":
@@ -160,8 +213,7 @@ with col2:
             st.markdown("---")
             st.subheader("🔬 Sensor Analysis Results")
 
-            from src.sensor_matcher import get_all_disease_risks, get_top_risks
-            risks = get_top_risks(sensor_data, top_n=3)
+            risks = fusion_engine.risk_scorer.get_top_risks(sensor_data, top_n=3)
 
             if risks and risks[0][1] > 20:
                 top_disease, top_risk = risks[0]
@@ -197,12 +249,31 @@ with col2:
             else:
                 st.success("✅ Conditions appear favorable - low disease risk")
 
+# Fusion vision panel: one model pass per rerun (one cascade decision per image)
+if uploaded_file and mode == "Vision + Sensor Fusion":
+    try:
+        if submit:
+            # In cascade mode a conflicting cheap result is re-checked with the large model
+            vision_results, diagnosis = fusion_engine.diagnose_file(uploaded_file.getvalue(), sensor_data)
+        else:
+            vision_results = fusion_engine.predict_from_file(uploaded_file.getvalue())
+    except Exception as e:
+        st.error(f"❌ Error loading model: {e}")
+        st.stop()
+
+    with vision_panel:
+        st.success("✅ Image analyzed")
+        st.markdown("**Top Predictions:**")
+        top_preds = fusion_engine.get_top_vision_predictions(vision_results, top_n=3)
+        for disease, conf in top_preds:
+            st.write(f"- {get_disease_display_name(disease)}: {conf*100:.1f}%")
+
 # Fusion Diagnosis
 if uploaded_file and submit and mode == "Vision + Sensor Fusion":
     st.markdown("---")
     st.header("🔬 Diagnosis Results")
 
-    diagnosis = fusion_engine.cross_validate(vision_results, sensor_data)
+    diagnosis = diagnosis.to_dict()
 
     # Status indicator
     status = diagnosis['status']
@@ -0,0 +1,193 @@
+"""
+FarmOG Station - End-to-End Pipeline Benchmark
+==============================================
+Sensor scoring, fusion, reporting, preprocessing and vision inference with
+p50/p95/p99 latency, throughput and peak memory, written as JSON and
+optionally checked against a stored baseline.
+
+Run from the repo root:
+    python -m benchmarks.bench_pipeline --output bench_results.json
+    python -m benchmarks.bench_pipeline --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_pipeline --baseline benchmarks/baseline.json
+
+Exits with status 1 when a benchmark is slower than the baseline by more
+than --tolerance. Baselines are only meaningful on the machine that made them.
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.harness import compare, environment, format_table, load_json, measure, save_json
+from benchmarks.synthetic_model import SyntheticModel
+from src.fusion_engine import FarmOGFusionEngine
+from src.preprocessing import ImagePreprocessor
+from src.sensor_matcher import (
+    calculate_disease_risk, calculate_disease_risk_batch, encode_irrigation,
+    get_all_disease_risks, get_top_risks
+)
+
+CLASS_NAMES_PATH = 'notebooks/models/class_names.json'
+MODEL_PATHS = {
+    'keras': 'notebooks/models/farmog_resnet50v2_classifier.h5',
+    'tflite': 'notebooks/models/resnet50v2.tflite',
+    'tflite_int8': 'notebooks/models/resnet50v2_int8.tflite'
+}
+
+SENSOR_SAMPLE = {
+    'air_temp': 18.0,
+    'air_humidity': 93.0,
+    'soil_moisture': 75.0,
+    'rainfall_24h': 12.0,
+    'irrigation_method': 'overhead'
+}
+
+def _load_class_names():
+    with open(CLASS_NAMES_PATH, 'r') as f:
+        return json.load(f)
+
+def _random_readings(n, seed=0):
+    rng = np.random.RandomState(seed)
+    return {
+        'air_temp': rng.uniform(5, 40, n),
+        'air_humidity': rng.uniform(20, 100, n),
+        'soil_moisture': rng.uniform(10, 90, n),
+        'rainfall_24h': rng.uniform(0, 20, n),
+        'irrigation': encode_irrigation(rng.choice(['drip', 'overhead'], n)),
+    }
+
+def _jpeg_bytes(width=640, height=480, seed=0):
+    rng = np.random.RandomState(seed)
+    # Smooth gradient plus noise compresses like a photo, unlike pure noise
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=-1)
+    pixels = np.clip(base + rng.randint(-20, 20, base.shape), 0, 255).astype(np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, format='JPEG', quality=90)
+    return buf.getvalue()
+
+def _vision_backends(class_names):
+    """
+    Backends to benchmark: real model files when present, otherwise the
+    synthetic stand-in for Keras
+
+    Returns:
+        tuple: ({name: backend}, {name: skip reason})
+    """
+    from src.inference_backends import KerasBackend, load_backend
+
+    backends, skipped = {}, {}
+    for kind, path in MODEL_PATHS.items():
+        if not os.path.exists(path):
+            skipped[f"vision.{kind}"] = f"{path} not found"
+            continue
+        try:
+            backends[kind] = load_backend(kind, path, batch_size=8)
+        except (ImportError, ValueError) as e:
+            skipped[f"vision.{kind}"] = str(e)
+
+    if 'keras' not in backends:
+        backends['synthetic'] = KerasBackend(model=SyntheticModel(num_classes=len(class_names)))
+    return backends, skipped
+
+def run(scale=1.0):
+    """
+    Run every benchmark
+
+    Args:
+        scale: multiplier on iteration counts (e.g. 0.1 for a quick run)
+
+    Returns:
+        dict: {'environment', 'timestamp', 'benchmarks': {name: stats}, 'skipped': {name: reason}}
+    """
+    def iters(n):
+        return max(5, int(n * scale))
+
+    random.seed(0)
+    class_names = _load_class_names()
+    engine = FarmOGFusionEngine(class_names=class_names)
+    results = {}
+
+    # Sensor scoring
+    results['sensor.calculate_disease_risk'] = measure(
+        lambda: calculate_disease_risk(SENSOR_SAMPLE, 'Tomato___Late_blight'), iters(20000))
+    results['sensor.get_all_disease_risks'] = measure(
+        lambda: get_all_disease_risks(SENSOR_SAMPLE), iters(5000))
+    results['sensor.get_top_risks'] = measure(
+        lambda: get_top_risks(SENSOR_SAMPLE, top_n=3), iters(5000))
+    readings = _random_readings(1000)
+    results['sensor.calculate_disease_risk_batch_1000'] = measure(
+        lambda: calculate_disease_risk_batch(**readings), iters(500), items_per_call=1000)
+
+    # Fusion and reporting
+    rng = np.random.RandomState(0)
+    probs = rng.dirichlet(np.ones(len(class_names)))
+    vision_results = {class_names[str(i)]: float(p) for i, p in enumerate(probs)}
+    results['fusion.cross_validate'] = measure(
+        lambda: engine.cross_validate(vision_results, SENSOR_SAMPLE), iters(5000))
+    diagnosis = engine.cross_validate(vision_results, SENSOR_SAMPLE)
+    results['fusion.generate_report'] = measure(
+        lambda: engine.generate_report(diagnosis), iters(5000))
+
+    # Preprocessing
+    jpeg = _jpeg_bytes()
+    for profile in ('resnet50v2', 'efficientnetb0'):
+        preprocessor = ImagePreprocessor(profile)
+        results[f'preprocess.{profile}'] = measure(
+            lambda p=preprocessor: p.preprocess(jpeg), iters(300))
+
+    # Vision inference
+    backends, skipped = _vision_backends(class_names)
+    batch = ImagePreprocessor('resnet50v2', batch_size=8).preprocess_batch([jpeg] * 8).copy()
+    for name, backend in backends.items():
+        engine.backend = backend
+        results[f'vision.{name}.batch1'] = measure(
+            lambda: engine.predict_batch(batch[:1]), iters(100), warmup=3)
+        results[f'vision.{name}.batch8'] = measure(
+            lambda: engine.predict_batch(batch), iters(30), warmup=2, items_per_call=8)
+        results[f'end_to_end.{name}.predict_from_file'] = measure(
+            lambda: engine.predict_from_file(jpeg), iters(100), warmup=3)
+
+    return {
+        'environment': environment(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'benchmarks': results,
+        'skipped': skipped,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FarmOG pipeline benchmarks")
+    parser.add_argument('--output', help="write results JSON here")
+    parser.add_argument('--baseline', help="compare against this results JSON")
+    parser.add_argument('--save-baseline', help="write results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed p50 slowdown (0.25 = 25%%)")
+    parser.add_argument('--quick', action='store_true', help="10x fewer iterations (noisy, not for baselines)")
+    args = parser.parse_args(argv)
+
+    results = run(scale=0.1 if args.quick else 1.0)
+    print(format_table(results))
+
+    if args.output:
+        save_json(results, args.output)
+    if args.save_baseline:
+        save_json(results, args.save_baseline)
+
+    if args.baseline:
+        regressions = compare(results, load_json(args.baseline), tolerance=args.tolerance)
+        if regressions:
+            print(f"\nRegressions (p50 slower than baseline by more than {args.tolerance:.0%}):")
+            for name, before, after, ratio in regressions:
+                print(f"  {name}: {before:.1f} us -> {after:.1f} us ({ratio:.2f}x)")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+FarmOG Station - Top-K Selection Benchmark
+==========================================
+Full sort vs heapq / argpartition selection at growing class counts
+
+Run from the repo root:
+    python -m benchmarks.bench_topk
+"""
+
+import heapq
+import random
+import timeit
+from operator import itemgetter
+
+import numpy as np
+
+from src.selection import top_k_items, top_k_rows
+
+def _argpartition_top_k(matrix, k):
+    num_cols = matrix.shape[1]
+    candidates = np.argpartition(matrix, num_cols - k, axis=1)[:, num_cols - k:]
+    order = np.argsort(-np.take_along_axis(matrix, candidates, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
+def bench_scalar(num_classes, k=3, repeat=5):
+    """Best-of-repeat microseconds per call: sorted() vs heapq vs top_k_items on a dict"""
+    rng = random.Random(0)
+    scores = {f"Class_{i}": rng.random() for i in range(num_classes)}
+    number = max(1, 20000 // num_classes)
+
+    full_sort = lambda: sorted(scores.items(), key=lambda x: x[1], reverse=True)[:k]
+    heap = lambda: heapq.nlargest(k, scores.items(), key=itemgetter(1))
+    selected = lambda: top_k_items(scores, k)
+    assert full_sort() == heap() == selected()
+
+    return tuple(min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+                 for fn in (full_sort, heap, selected))
+
+def bench_matrix(num_rows, num_classes, k=3, repeat=5):
+    """Best-of-repeat milliseconds per call: argsort vs argpartition vs top_k_rows"""
+    matrix = np.random.default_rng(0).random((num_rows, num_classes))
+
+    full_sort = lambda: np.argsort(-matrix, axis=1, kind='stable')[:, :k]
+    partition = lambda: _argpartition_top_k(matrix, k)
+    selected = lambda: top_k_rows(matrix, k)[0]
+    assert np.array_equal(full_sort(), partition())
+    assert np.array_equal(full_sort(), selected())
+
+    return tuple(min(timeit.repeat(fn, number=3, repeat=repeat)) / 3 * 1e3
+                 for fn in (full_sort, partition, selected))
+
+def main():
+    print("=" * 60)
+    print("TOP-3 SELECTION: dict (scalar path), µs per call")
+    print("=" * 60)
+    print(f"{'classes':>8} {'sorted':>10} {'heapq':>10} {'top_k':>10} {'speedup':>8}")
+    for num_classes in (10, 100, 1000, 10000):
+        t_sort, t_heap, t_top = bench_scalar(num_classes)
+        print(f"{num_classes:>8} {t_sort:>10.1f} {t_heap:>10.1f} {t_top:>10.1f} {t_sort / t_top:>7.2f}x")
+
+    print()
+    print("=" * 60)
+    print("TOP-3 SELECTION: 10,000-row matrix (batch path), ms per call")
+    print("=" * 60)
+    print(f"{'classes':>8} {'argsort':>10} {'argpart':>10} {'top_k':>10} {'speedup':>8}")
+    for num_classes in (10, 100, 1000):
+        t_sort, t_part, t_top = bench_matrix(10000, num_classes)
+        print(f"{num_classes:>8} {t_sort:>10.2f} {t_part:>10.2f} {t_top:>10.2f} {t_sort / t_top:>7.2f}x")
+
+if __name__ == '__main__':
+    main()
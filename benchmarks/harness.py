@@ -0,0 +1,126 @@
+"""
+FarmOG Station - Benchmark Harness
+==================================
+Latency percentiles, throughput, peak memory and baseline comparison shared
+by the benchmark scripts
+"""
+
+import json
+import platform
+import time
+import tracemalloc
+
+def percentile(sorted_values, q):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+def measure(fn, iterations=200, warmup=10, items_per_call=1, memory_calls=3):
+    """
+    Time a callable and record its peak Python memory
+
+    Memory is traced over separate calls so tracemalloc overhead does not
+    leak into the latency numbers.
+
+    Args:
+        fn: zero-argument callable
+        iterations: timed calls
+        warmup: untimed calls first (caches, lazy imports, model load)
+        items_per_call: items processed per call (rows, images) for throughput
+        memory_calls: calls traced for peak memory
+
+    Returns:
+        dict: p50_us, p95_us, p99_us, mean_us, throughput_per_s, peak_kb, iterations
+    """
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    clock = time.perf_counter
+    for _ in range(iterations):
+        start = clock()
+        fn()
+        timings.append(clock() - start)
+    timings.sort()
+    total = sum(timings)
+
+    tracemalloc.start()
+    try:
+        for _ in range(memory_calls):
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'p50_us': percentile(timings, 50) * 1e6,
+        'p95_us': percentile(timings, 95) * 1e6,
+        'p99_us': percentile(timings, 99) * 1e6,
+        'mean_us': total / iterations * 1e6,
+        'throughput_per_s': iterations * items_per_call / total if total else 0.0,
+        'peak_kb': peak / 1024.0,
+        'iterations': iterations,
+    }
+
+def environment():
+    """Machine description stored next to results, so baselines are compared like for like"""
+    info = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'processor': platform.processor(),
+    }
+    try:
+        import numpy as np
+        info['numpy'] = np.__version__
+    except ImportError:
+        pass
+    return info
+
+def compare(results, baseline, tolerance=0.25, metric='p50_us'):
+    """
+    Flag benchmarks that got slower than the baseline
+
+    Args:
+        results: {'benchmarks': {name: measure() dict}}
+        baseline: same structure, loaded from a previous run
+        tolerance: allowed relative slowdown (0.25 = 25 %)
+        metric: latency metric compared
+
+    Returns:
+        list of tuples: [(name, baseline value, current value, ratio), ...] regressions only
+    """
+    regressions = []
+    previous = baseline.get('benchmarks', {})
+    for name, stats in results.get('benchmarks', {}).items():
+        before = previous.get(name)
+        if not before or not before.get(metric):
+            continue
+        ratio = stats[metric] / before[metric]
+        if ratio > 1 + tolerance:
+            regressions.append((name, before[metric], stats[metric], ratio))
+    return regressions
+
+def save_json(data, path):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+def load_json(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def format_table(results):
+    """Plain-text summary of a results dict"""
+    lines = [f"{'benchmark':<40} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10} {'items/s':>12} {'peak KB':>10}"]
+    for name, stats in results.get('benchmarks', {}).items():
+        lines.append(
+            f"{name:<40} {stats['p50_us']:>10.1f} {stats['p95_us']:>10.1f} {stats['p99_us']:>10.1f} "
+            f"{stats['throughput_per_s']:>12.0f} {stats['peak_kb']:>10.1f}"
+        )
+    for name, reason in results.get('skipped', {}).items():
+        lines.append(f"{name:<40} skipped: {reason}")
+    return "\n".join(lines)
@@ -0,0 +1,35 @@
+"""
+FarmOG Station - Synthetic Stand-In Model
+=========================================
+Small NumPy classifier with the Keras predict_on_batch interface, used by the
+benchmarks when the trained .h5 / .tflite files are not available
+"""
+
+import numpy as np
+
+class SyntheticModel:
+    """
+    Strided average pooling + two dense layers + softmax.
+
+    Not a real classifier: it only does a fixed, deterministic amount of work
+    per image so pipeline overheads around the model can be measured.
+    """
+
+    def __init__(self, num_classes=10, input_size=224, pool=8, hidden=256, seed=0):
+        rng = np.random.RandomState(seed)
+        self.pool = pool
+        features = (input_size // pool) ** 2 * 3
+        self.w1 = rng.standard_normal((features, hidden)).astype(np.float32) / np.sqrt(features)
+        self.w2 = rng.standard_normal((hidden, num_classes)).astype(np.float32) / np.sqrt(hidden)
+
+    def predict_on_batch(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        n, h, w, c = batch.shape
+        p = self.pool
+        pooled = batch[:, :h // p * p, :w // p * p].reshape(n, h // p, p, w // p, p, c).mean(axis=(2, 4))
+        hidden = np.maximum(pooled.reshape(n, -1) @ self.w1, 0.0)
+        logits = hidden @ self.w2
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        return probs
@@ -0,0 +1,281 @@
+"""
+FarmOG Station - Alert Deduplication and Hysteresis
+===================================================
+Turns a stream of sensor risk scores into few, meaningful notifications.
+
+- Hysteresis: a warning is raised above `raise_threshold` (60) but only
+  clears once the risk falls below `raise_threshold - hysteresis`; the same
+  band applies to critical (70).
+- Cooldown: after a notification for a (station, disease) key, the same or a
+  lower level is not sent again for `cooldown_seconds`, so a flapping reading
+  produces one message instead of one per sample.
+- Dedup keys are (station_id, disease index); only keys with a raised level
+  or a running cooldown are kept in memory.
+
+State can be saved to a small JSON file so a gateway restart does not
+re-send every active warning.
+"""
+
+import json
+import os
+import threading
+
+from src.disease_siganture import SIGNATURE_TABLE
+from src.fleet_scheduler import FleetAlert, LEVEL_NONE, LEVEL_WARNING, LEVEL_CRITICAL, LEVEL_NAMES
+from src.fusion_engine import EARLY_WARNING_RISK, EARLY_WARNING_FINAL_RISK
+
+STATE_VERSION = 1
+
+_EMPTY = (LEVEL_NONE, None, LEVEL_NONE, LEVEL_NONE)
+
+class AlertManager:
+    """
+    Stateful early-warning filter, safe to share between threads.
+
+    Feed it risks with observe() / observe_risks() / observe_batch(); it
+    returns the FleetAlerts worth sending. Pass it to FleetScheduler as
+    alert_manager to filter the scheduler's alerts.
+    """
+
+    def __init__(self, raise_threshold=EARLY_WARNING_RISK, critical_threshold=EARLY_WARNING_FINAL_RISK,
+                 hysteresis=10.0, cooldown_seconds=6 * 3600, notify_clear=False, state_path=None,
+                 autosave=False):
+        """
+        Args:
+            raise_threshold: risk above which an EARLY_WARNING is raised
+            critical_threshold: risk above which it is CRITICAL
+            hysteresis: how far below a threshold the risk must fall to leave that level
+            cooldown_seconds: minimum time between notifications of the same level per key
+            notify_clear: also send 'CLEARED' when a notified warning ends
+            state_path: JSON file to load state from and save it to (optional)
+            autosave: save after every tick that sent notifications (needs state_path)
+        """
+        self.raise_threshold = raise_threshold
+        self.critical_threshold = critical_threshold
+        self.hysteresis = hysteresis
+        self.cooldown_seconds = cooldown_seconds
+        self.notify_clear = notify_clear
+        self.state_path = state_path
+        self.autosave = autosave
+
+        # (station_id, disease index) -> (level, last raise sent at, highest level sent
+        # within the cooldown, level the receiver last heard)
+        self._state = {}
+        self._lock = threading.Lock()
+
+        self.observed = 0
+        self.notified = 0
+        self.suppressed = 0
+
+        if state_path is not None and os.path.exists(state_path):
+            self.load(state_path)
+
+    def __len__(self):
+        return len(self._state)
+
+    def _next_level(self, level, risk):
+        """Level after a new risk value, with hysteresis"""
+        if risk > self.critical_threshold:
+            return LEVEL_CRITICAL
+        if level == LEVEL_CRITICAL and risk >= self.critical_threshold - self.hysteresis:
+            return LEVEL_CRITICAL
+        if risk > self.raise_threshold:
+            return LEVEL_WARNING
+        if level >= LEVEL_WARNING and risk >= self.raise_threshold - self.hysteresis:
+            return LEVEL_WARNING
+        return LEVEL_NONE
+
+    def _observe(self, key, risk, timestamp):
+        """Update one key (lock held); returns a FleetAlert or None"""
+        self.observed += 1
+        level, sent_at, sent_level, notified = self._state.get(key, _EMPTY)
+        new_level = self._next_level(level, risk)
+        cooling = sent_at is not None and timestamp - sent_at < self.cooldown_seconds
+        if new_level == level:
+            if level == LEVEL_NONE and key in self._state and not cooling:
+                del self._state[key]
+            return None
+
+        if new_level > level:
+            # Raise / escalate unless this level was already sent within the cooldown
+            send = new_level > notified and (new_level > sent_level or not cooling)
+        else:
+            send = self.notify_clear and new_level == LEVEL_NONE and notified > LEVEL_NONE
+
+        alert = None
+        if send:
+            station_id, disease = key
+            alert = FleetAlert(timestamp, station_id, SIGNATURE_TABLE.diseases[disease], float(risk),
+                               LEVEL_NAMES[new_level], LEVEL_NAMES[level])
+            self.notified += 1
+            if new_level > level:
+                sent_level = max(sent_level, new_level) if cooling else new_level
+                sent_at = timestamp
+        elif new_level > level:
+            self.suppressed += 1
+
+        if new_level > level:
+            notified = max(notified, new_level) if send else notified
+        elif new_level == LEVEL_NONE:
+            notified = LEVEL_NONE
+
+        if new_level == LEVEL_NONE and not cooling:
+            self._state.pop(key, None)  # Nothing left to remember
+        else:
+            self._state[key] = (new_level, sent_at, sent_level, notified)
+        return alert
+
+    def observe(self, station_id, disease, risk, timestamp):
+        """
+        Args:
+            station_id: station name
+            disease: class name in SIGNATURE_TABLE
+            risk: risk score 0-100
+            timestamp: epoch seconds
+
+        Returns:
+            FleetAlert or None
+        """
+        with self._lock:
+            return self._observe((station_id, SIGNATURE_TABLE.index[disease]), risk, timestamp)
+
+    def observe_risks(self, station_id, risks, timestamp):
+        """
+        Args:
+            risks: dict {disease_name: risk_score}, e.g. from get_all_disease_risks
+
+        Returns:
+            list of FleetAlert worth sending
+        """
+        alerts = []
+        with self._lock:
+            for disease, risk in risks.items():
+                i = SIGNATURE_TABLE.index.get(disease)
+                if i is None:
+                    continue
+                alert = self._observe((station_id, i), risk, timestamp)
+                if alert is not None:
+                    alerts.append(alert)
+        self._maybe_save(alerts)
+        return alerts
+
+    def observe_batch(self, station_ids, risks, timestamp):
+        """
+        Args:
+            station_ids: list of N station names
+            risks: (N, n_diseases) array in SIGNATURE_TABLE.diseases order
+            timestamp: epoch seconds
+
+        Returns:
+            list of FleetAlert worth sending
+        """
+        import numpy as np
+
+        risks = np.asarray(risks)
+        floor = min(self.raise_threshold, self.critical_threshold) - self.hysteresis
+        alerts = []
+        with self._lock:
+            # Only entries near a threshold, or keys with live state, can change anything
+            rows, cols = np.nonzero(risks >= floor)
+            candidates = set(zip(rows.tolist(), cols.tolist()))
+            positions = {station_id: i for i, station_id in enumerate(station_ids)}
+            for station_id, disease in self._state:
+                row = positions.get(station_id)
+                if row is not None:
+                    candidates.add((row, disease))
+
+            for row, disease in sorted(candidates):
+                alert = self._observe((station_ids[row], disease), float(risks[row, disease]), timestamp)
+                if alert is not None:
+                    alerts.append(alert)
+        self._maybe_save(alerts)
+        return alerts
+
+    def observe_diagnosis(self, station_id, diagnosis, timestamp):
+        """
+        Filter the early warnings of one cross_validate / diagnose result
+
+        Only diseases cross_validate warned about can raise; a raised one is
+        held by its sensor risk while it stays in the top sensors, and counts
+        as risk 0 once it drops out.
+
+        Args:
+            diagnosis: Diagnosis from FarmOGFusionEngine.diagnose
+            timestamp: epoch seconds
+
+        Returns:
+            list of FleetAlert worth sending (empty: nothing new to report)
+        """
+        warned = {disease for disease, _ in diagnosis.warnings}
+        alerts = []
+        with self._lock:
+            seen = set()
+            for disease, risk in diagnosis.sensors:
+                i = SIGNATURE_TABLE.index.get(disease)
+                if i is None:
+                    continue
+                key = (station_id, i)
+                seen.add(key)
+                if disease in warned or self._state.get(key, _EMPTY)[0]:
+                    alert = self._observe(key, risk, timestamp)
+                    if alert is not None:
+                        alerts.append(alert)
+            for key in [k for k in self._state if k[0] == station_id and k not in seen]:
+                alert = self._observe(key, 0.0, timestamp)
+                if alert is not None:
+                    alerts.append(alert)
+        self._maybe_save(alerts)
+        return alerts
+
+    def active(self):
+        """
+        Returns:
+            list of tuples: [(station_id, disease, level name), ...] currently raised
+        """
+        with self._lock:
+            return [(station_id, SIGNATURE_TABLE.diseases[disease], LEVEL_NAMES[level])
+                    for (station_id, disease), (level, _, _, _) in self._state.items() if level]
+
+    def stats(self):
+        """
+        Returns:
+            dict: observed, notified, suppressed, keys
+        """
+        with self._lock:
+            return {
+                'observed': self.observed,
+                'notified': self.notified,
+                'suppressed': self.suppressed,
+                'keys': len(self._state),
+            }
+
+    # Persistence -----------------------------------------------------------------
+
+    def _maybe_save(self, alerts):
+        if alerts and self.autosave and self.state_path is not None:
+            self.save()
+
+    def save(self, path=None):
+        """Write state atomically as JSON"""
+        path = path or self.state_path
+        with self._lock:
+            states = [[station_id, SIGNATURE_TABLE.diseases[disease], *state]
+                      for (station_id, disease), state in self._state.items()]
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'version': STATE_VERSION, 'states': states}, f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    def load(self, path=None):
+        """Replace state with a file written by save()"""
+        path = path or self.state_path
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported alert state version {data.get('version')}")
+        with self._lock:
+            self._state = {}
+            for station_id, disease, *state in data['states']:
+                i = SIGNATURE_TABLE.index.get(disease)
+                if i is not None:
+                    self._state[(station_id, i)] = tuple(state)
@@ -0,0 +1,85 @@
+"""
+FarmOG Station - Model Cascade
+==============================
+Runs a cheap backbone (e.g. MobileNetV2) first and escalates an image to a
+larger one (e.g. ResNet50V2) only when the cheap result is not good enough:
+
+- its top-1 confidence is below `min_confidence`, or
+- cross-validation against the sensors ends in a CONFLICT (NEEDS_REVIEW).
+
+Accepted images cost one small forward pass; escalated ones cost both, so
+the saving depends on the escalation rate reported by stats().
+"""
+
+import threading
+
+from src import instrumentation
+
+ESCALATE_LOW_CONFIDENCE = 'low_confidence'
+ESCALATE_CONFLICT = 'conflict'
+
+class ModelCascade:
+    """
+    Escalation policy and counters for FarmOGFusionEngine's cascade mode.
+
+    Attach with engine.enable_cascade(fallback_engine, ...); the engine calls
+    escalation_reason() after the cheap pass and record() with the outcome.
+    """
+
+    def __init__(self, fallback, min_confidence=0.8, escalate_on_conflict=True):
+        """
+        Args:
+            fallback: FarmOGFusionEngine running the larger model (same class names)
+            min_confidence: escalate when the cheap top-1 confidence (0-1) is below this
+            escalate_on_conflict: escalate when cross-validation finds a CONFLICT
+        """
+        self.fallback = fallback
+        self.min_confidence = min_confidence
+        self.escalate_on_conflict = escalate_on_conflict
+
+        self._lock = threading.Lock()
+        self.images = 0
+        self.escalations = {ESCALATE_LOW_CONFIDENCE: 0, ESCALATE_CONFLICT: 0}
+
+    def escalation_reason(self, vision_results, diagnosis=None):
+        """
+        Args:
+            vision_results: dict from the cheap model
+            diagnosis: Diagnosis of the cheap result (optional, enables the conflict check)
+
+        Returns:
+            str: ESCALATE_LOW_CONFIDENCE / ESCALATE_CONFLICT, or None to accept
+        """
+        top_confidence = max(vision_results.values()) if vision_results else 0.0
+        if top_confidence < self.min_confidence:
+            return ESCALATE_LOW_CONFIDENCE
+        if self.escalate_on_conflict and diagnosis is not None and diagnosis.conflict is not None:
+            return ESCALATE_CONFLICT
+        return None
+
+    def record(self, reason):
+        """Count one image; reason None means the cheap result was kept"""
+        with self._lock:
+            self.images += 1
+            if reason is not None:
+                self.escalations[reason] += 1
+        instrumentation.increment('cascade_outcome', reason or 'accepted')
+
+    def stats(self):
+        """
+        Returns:
+            dict: images, escalated, escalation_rate (0-1) and per-reason counts
+        """
+        with self._lock:
+            escalated = sum(self.escalations.values())
+            return {
+                'images': self.images,
+                'escalated': escalated,
+                'escalation_rate': escalated / self.images if self.images else 0.0,
+                **self.escalations,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.images = 0
+            self.escalations = dict.fromkeys(self.escalations, 0)
@@ -0,0 +1,198 @@
+"""
+FarmOG Station - Compact Diagnosis Results
+==========================================
+Slot-based diagnosis record that keeps only names, scores and a status code,
+and expands to the legacy cross_validate dict on demand
+"""
+
+from enum import IntEnum
+
+from src.disease_siganture import DISEASE_SIGNATURES, get_disease_display_name
+
+class DiagnosisStatus(IntEnum):
+    """Compact status codes for fusion diagnoses"""
+    UNKNOWN = 0
+    CONFIRMED = 1
+    EARLY_WARNING = 2
+    NEEDS_REVIEW = 3
+    LOW_CONFIDENCE = 4
+    UNCERTAIN = 5
+
+SENSOR_REPORT_MIN_RISK = 20        # sensor risks listed in the expanded diagnosis
+
+CONFLICT_CAUSES = (
+    "Multiple diseases present simultaneously",
+    "Disease in early/transitional stage",
+    "Sensor calibration may need adjustment",
+    "Unusual environmental conditions"
+)
+
+CONFLICT_NEXT_STEPS = (
+    "Take additional photos from different angles",
+    "Verify sensor calibration",
+    "Monitor closely for 24-48 hours",
+    "Consider expert consultation"
+)
+
+LEGACY_KEYS = (
+    "vision_predictions",
+    "sensor_predictions",
+    "confirmed",
+    "early_warnings",
+    "conflicts",
+    "final_diagnosis",
+    "confidence",
+    "status"
+)
+
+class Diagnosis:
+    """
+    Result of one cross-validation.
+    
+    Disease names are shared references to the class-name strings, so a
+    record costs a few small tuples. Display names, corrective actions and
+    alert texts are looked up from DISEASE_SIGNATURES only when accessed.
+    Indexing with a legacy key (diagnosis["status"]) expands just that field,
+    so generate_report, calculate_health_score and the app work unchanged.
+    """
+    __slots__ = ('status', 'final_diagnosis', 'confidence', 'vision', 'sensors',
+                 'confirmed', 'warnings', 'conflict')
+    
+    def __init__(self, status, final_diagnosis, confidence, vision=(), sensors=(),
+                 confirmed=(), warnings=(), conflict=None):
+        """
+        Args:
+            status: DiagnosisStatus
+            final_diagnosis: class name
+            confidence: final confidence (0-100)
+            vision: ((class_name, confidence 0-1), ...) top vision predictions
+            sensors: ((disease, risk), ...) top sensor risks
+            confirmed: ((disease, combined, vision_conf 0-1, sensor_risk), ...)
+            warnings: ((disease, risk), ...) early warnings
+            conflict: (vision_disease, vision_conf 0-1, sensor_disease, sensor_risk) or None
+        """
+        self.status = status
+        self.final_diagnosis = final_diagnosis
+        self.confidence = confidence
+        self.vision = vision
+        self.sensors = sensors
+        self.confirmed = confirmed
+        self.warnings = warnings
+        self.conflict = conflict
+    
+    def __repr__(self):
+        return (f"Diagnosis({self.status.name}, {self.final_diagnosis!r}, "
+                f"confidence={self.confidence:.1f})")
+    
+    # Legacy dict sections ----------------------------------------------------
+    
+    def vision_predictions(self):
+        return [
+            {
+                "disease": disease,
+                "display_name": get_disease_display_name(disease),
+                "confidence": confidence * 100,
+                "source": "vision"
+            }
+            for disease, confidence in self.vision
+        ]
+    
+    def sensor_predictions(self):
+        return [
+            {
+                "disease": disease,
+                "display_name": get_disease_display_name(disease),
+                "risk_score": risk,
+                "source": "sensor"
+            }
+            for disease, risk in self.sensors
+            if risk > SENSOR_REPORT_MIN_RISK  # Only include significant risks
+        ]
+    
+    def confirmed_cases(self):
+        cases = []
+        for disease, combined, vision_conf, sensor_risk in self.confirmed:
+            signature = DISEASE_SIGNATURES[disease]
+            cases.append({
+                "disease": disease,
+                "display_name": get_disease_display_name(disease),
+                "confidence": combined,
+                "vision_confidence": vision_conf * 100,
+                "sensor_risk": sensor_risk,
+                "status": "CONFIRMED",
+                "validation": "✅ Vision + Sensor Agreement",
+                "corrective_actions": signature["corrective_actions"],
+                "root_cause": signature["root_cause"],
+                "prevention": signature["prevention"]
+            })
+        return cases
+    
+    def early_warnings(self):
+        return [
+            {
+                "disease": disease,
+                "display_name": get_disease_display_name(disease),
+                "risk_score": risk,
+                "status": "EARLY_WARNING",
+                "alert": f"⚠️ Conditions favor {get_disease_display_name(disease)} - symptoms may appear in 24-48h",
+                "corrective_actions": DISEASE_SIGNATURES[disease]["corrective_actions"],
+                "preventive_note": "Act now to prevent disease development"
+            }
+            for disease, risk in self.warnings
+        ]
+    
+    def conflicts(self):
+        if self.conflict is None:
+            return []
+        vision_disease, vision_conf, sensor_disease, sensor_risk = self.conflict
+        return [{
+            "vision_says": vision_disease,
+            "vision_display": get_disease_display_name(vision_disease),
+            "vision_confidence": vision_conf * 100,
+            "sensor_says": sensor_disease,
+            "sensor_display": get_disease_display_name(sensor_disease),
+            "sensor_risk": sensor_risk,
+            "status": "CONFLICT",
+            "alert": "⚠️ Vision and sensor predictions disagree - manual review recommended",
+            "possible_causes": list(CONFLICT_CAUSES),
+            "next_steps": list(CONFLICT_NEXT_STEPS)
+        }]
+    
+    # Mapping-style access ------------------------------------------------------
+    
+    def __getitem__(self, key):
+        if key == "status":
+            return self.status.name
+        if key == "final_diagnosis":
+            return self.final_diagnosis
+        if key == "confidence":
+            return self.confidence
+        if key == "vision_predictions":
+            return self.vision_predictions()
+        if key == "sensor_predictions":
+            return self.sensor_predictions()
+        if key == "confirmed":
+            return self.confirmed_cases()
+        if key == "early_warnings":
+            return self.early_warnings()
+        if key == "conflicts":
+            return self.conflicts()
+        raise KeyError(key)
+    
+    def __contains__(self, key):
+        return key in LEGACY_KEYS
+    
+    def keys(self):
+        return list(LEGACY_KEYS)
+    
+    def get(self, key, default=None):
+        return self[key] if key in LEGACY_KEYS else default
+    
+    def to_dict(self):
+        """
+        Expand to the dict returned by FarmOGFusionEngine.cross_validate
+        
+        Returns:
+            dict with comprehensive diagnosis
+        """
+        return {key: self[key] for key in LEGACY_KEYS}
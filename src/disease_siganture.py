@@ -4,6 +4,9 @@ FarmOG Station - Disease Signature Database
 Maps disease conditions to sensor patterns based on agronomic research
 """
 
+from collections import namedtuple
+from types import MappingProxyType
+
 # Disease signature patterns from your master table
 DISEASE_SIGNATURES = {
     "Tomato___Bacterial_spot": {
@@ -255,4 +258,169 @@ def get_all_diseases():
 def get_disease_display_name(class_name):
     """Convert class name to display name"""
     sig = DISEASE_SIGNATURES.get(class_name)
-    return sig['name'] if sig else class_name.replace('Tomato___', '').replace('_', ' ')
\ No newline at end of file
+    return sig['name'] if sig else class_name.replace('Tomato___', '').replace('_', ' ')
+
+# =============================================================================
+# Compiled scoring table
+# =============================================================================
+# DISEASE_SIGNATURES is compiled once at import into column vectors (one entry
+# per disease, in get_all_diseases() order) so the risk scorers never touch the
+# nested dicts or compare condition strings on the hot path.
+
+# Humidity rule kinds
+HUMIDITY_NONE = 0
+HUMIDITY_MIN = 1     # air_humidity_min: risk at or above threshold, ramp below
+HUMIDITY_MAX = 2     # air_humidity_max: risk at or below threshold (spider mites)
+HUMIDITY_RANGE = 3   # air_humidity_range: risk inside the band (healthy)
+
+# Soil moisture targets
+MOISTURE_CODES = MappingProxyType({
+    'low': 0,
+    'optimal': 1,
+    'high': 2
+})
+
+# Irrigation methods (sensor readings and signature irrigation_risk)
+IRRIGATION_CODES = MappingProxyType({
+    'drip': 0,
+    'overhead': 1
+})
+
+SignatureTable = namedtuple('SignatureTable', [
+    'diseases',          # tuple of disease class names
+    'index',             # read-only {disease_name: position}
+    'humidity_mode',     # HUMIDITY_* code
+    'humidity_lo',       # min threshold (MIN/RANGE), nan otherwise
+    'humidity_hi',       # max threshold (MAX/RANGE), nan otherwise
+    'temp_lo',           # air_temp_range bounds, nan if no range
+    'temp_hi',
+    'moisture_target',   # MOISTURE_CODES value
+    'irrigation_risk',   # IRRIGATION_CODES value, -1 if none
+    'w_humidity',        # risk weights, 0.0 if absent
+    'w_temperature',
+    'w_moisture',
+    'w_irrigation',
+    'w_rainfall',
+    'has_humidity',      # per-feature masks: term contributes to the score
+    'has_temperature',
+    'has_moisture',
+    'has_irrigation',
+    'has_rainfall',
+])
+
+def _compile_row(signature):
+    """Compile one signature dict into a tuple of SignatureTable column values"""
+    conditions = signature['sensor_conditions']
+    weights = signature['risk_weights']
+    nan = float('nan')
+    
+    if 'air_humidity_min' in conditions:
+        humidity = (HUMIDITY_MIN, float(conditions['air_humidity_min']), nan)
+    elif 'air_humidity_max' in conditions:
+        humidity = (HUMIDITY_MAX, nan, float(conditions['air_humidity_max']))
+    elif 'air_humidity_range' in conditions:
+        min_h, max_h = conditions['air_humidity_range']
+        humidity = (HUMIDITY_RANGE, float(min_h), float(max_h))
+    else:
+        humidity = (HUMIDITY_NONE, nan, nan)
+    
+    temp_range = conditions.get('air_temp_range')
+    temp_lo, temp_hi = (float(temp_range[0]), float(temp_range[1])) if temp_range else (nan, nan)
+    
+    moisture = conditions.get('soil_moisture', 'optimal')
+    if moisture not in MOISTURE_CODES:
+        raise ValueError(f"Unknown soil_moisture target: {moisture!r}")
+    
+    irrigation = conditions.get('irrigation_risk')
+    if irrigation is not None and irrigation not in IRRIGATION_CODES:
+        raise ValueError(f"Unknown irrigation_risk: {irrigation!r}")
+    
+    return (
+        humidity[0], humidity[1], humidity[2],
+        temp_lo, temp_hi,
+        MOISTURE_CODES[moisture],
+        IRRIGATION_CODES[irrigation] if irrigation is not None else -1,
+        float(weights.get('humidity', 0.0)),
+        float(weights.get('temperature', 0.0)),
+        float(weights.get('moisture', 0.0)),
+        float(weights.get('irrigation', 0.0)),
+        float(weights.get('rainfall', 0.0)),
+        'humidity' in weights and humidity[0] != HUMIDITY_NONE,
+        'temperature' in weights and temp_range is not None,
+        'moisture' in weights,
+        'irrigation' in weights and irrigation == 'overhead',
+        'rainfall' in weights and conditions.get('rainfall') == 'frequent',
+    )
+
+def compile_signatures(signatures=None):
+    """
+    Compile a signature dict into an immutable SignatureTable
+    
+    Args:
+        signatures: dict in the DISEASE_SIGNATURES format (default: DISEASE_SIGNATURES)
+    
+    Returns:
+        SignatureTable: one tuple per field, indexed by disease position
+    """
+    if signatures is None:
+        signatures = DISEASE_SIGNATURES
+    
+    diseases = tuple(signatures.keys())
+    rows = [_compile_row(signatures[d]) for d in diseases]
+    columns = tuple(zip(*rows)) if rows else ((),) * (len(SignatureTable._fields) - 2)
+    index = MappingProxyType({d: i for i, d in enumerate(diseases)})
+    
+    return SignatureTable(diseases, index, *columns)
+
+def check_compiled_signatures(table=None, signatures=None):
+    """
+    Verify a compiled table against the dict form it was built from
+    
+    Raises:
+        ValueError: if any disease or field disagrees with the source dicts
+    """
+    if table is None:
+        table = SIGNATURE_TABLE
+    if signatures is None:
+        signatures = DISEASE_SIGNATURES
+    
+    if table.diseases != tuple(signatures.keys()):
+        raise ValueError("Compiled table disease order does not match signatures")
+    
+    for i, disease in enumerate(table.diseases):
+        conditions = signatures[disease]['sensor_conditions']
+        weights = signatures[disease]['risk_weights']
+        
+        expected = {
+            'w_humidity': weights.get('humidity', 0.0),
+            'w_temperature': weights.get('temperature', 0.0),
+            'w_moisture': weights.get('moisture', 0.0),
+            'w_irrigation': weights.get('irrigation', 0.0),
+            'w_rainfall': weights.get('rainfall', 0.0),
+            'moisture_target': MOISTURE_CODES[conditions.get('soil_moisture', 'optimal')],
+            'has_temperature': 'temperature' in weights and 'air_temp_range' in conditions,
+            'has_moisture': 'moisture' in weights,
+            'has_irrigation': 'irrigation' in weights and conditions.get('irrigation_risk') == 'overhead',
+            'has_rainfall': 'rainfall' in weights and conditions.get('rainfall') == 'frequent',
+        }
+        if 'air_temp_range' in conditions:
+            expected['temp_lo'], expected['temp_hi'] = conditions['air_temp_range']
+        if 'air_humidity_min' in conditions:
+            expected['humidity_mode'] = HUMIDITY_MIN
+            expected['humidity_lo'] = conditions['air_humidity_min']
+        elif 'air_humidity_max' in conditions:
+            expected['humidity_mode'] = HUMIDITY_MAX
+            expected['humidity_hi'] = conditions['air_humidity_max']
+        elif 'air_humidity_range' in conditions:
+            expected['humidity_mode'] = HUMIDITY_RANGE
+            expected['humidity_lo'], expected['humidity_hi'] = conditions['air_humidity_range']
+        else:
+            expected['humidity_mode'] = HUMIDITY_NONE
+        expected['has_humidity'] = 'humidity' in weights and expected['humidity_mode'] != HUMIDITY_NONE
+        
+        for field, value in expected.items():
+            if getattr(table, field)[i] != value:
+                raise ValueError(f"Compiled {field} for {disease} does not match signature")
+
+SIGNATURE_TABLE = compile_signatures()
+check_compiled_signatures()
@@ -0,0 +1,331 @@
+"""
+FarmOG Station - Model Evaluation
+=================================
+Evaluates every available model (backbone x backend) on the validation set
+in one pass over the images:
+
+- images are decoded once per batch by ImageFolderLoader as raw uint8 pixels
+  and normalized once per preprocessing profile, so all models see identical
+  inputs (the int8 model is compared on exactly the float model's pixels)
+- each backend runs the batch with its own batched forward pass
+- confusion matrices and per-class precision / recall / F1 are NumPy
+
+Writes evaluation_report.json (notebook 07 schema for the reference model,
+plus every model under "models") and prints an accuracy / latency table.
+
+Usage:
+    python -m src.evaluate --data "data/raw/.../valid"
+    python -m src.evaluate --model mobilenetv2:tflite:notebooks/models/mobilenet_v2.tflite --per-class 50
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from src.image_loader import ImageFolderLoader, find_images
+from src.preprocessing import get_profile, normalize
+
+DEFAULT_DATA_DIR = 'data/raw/New Plant Diseases Dataset(Augmented)/New Plant Diseases Dataset(Augmented)/valid'
+
+ModelSpec = namedtuple('ModelSpec', ['backbone', 'backend', 'path'])
+
+# Files written by notebooks 02-04 and 08; missing ones are skipped
+DEFAULT_MODELS = (
+    ModelSpec('resnet50v2', 'keras', 'notebooks/models/farmog_resnet50v2_classifier.h5'),
+    ModelSpec('resnet50v2', 'tflite', 'notebooks/models/resnet50v2.tflite'),
+    ModelSpec('resnet50v2', 'tflite_int8', 'notebooks/models/resnet50v2_int8.tflite'),
+    ModelSpec('efficientnetb0', 'keras', 'notebooks/models/efficientnet_classifier.h5'),
+    ModelSpec('mobilenetv2', 'keras', 'notebooks/models/farmog_disease_classifier.h5'),
+    ModelSpec('mobilenetv2', 'tflite', 'notebooks/models/mobilenet_v2.tflite'),
+)
+
+MODEL_TITLES = {
+    'resnet50v2': 'ResNet50V2',
+    'efficientnetb0': 'EfficientNetB0',
+    'mobilenetv2': 'MobileNetV2',
+}
+
+def display_name(class_name):
+    """Class name as written in evaluation_report.json ('Bacterial spot')"""
+    return class_name.replace('Tomato___', '').replace('_', ' ')
+
+def parse_model_spec(text):
+    """'backbone:backend:path' -> ModelSpec"""
+    parts = text.split(':', 2)
+    if len(parts) != 3:
+        raise argparse.ArgumentTypeError(f"Expected backbone:backend:path, got {text!r}")
+    get_profile(parts[0])
+    return ModelSpec(*parts)
+
+# Metrics ----------------------------------------------------------------------
+
+def confusion_matrix(y_true, y_pred, num_classes):
+    """
+    Args:
+        y_true: (N,) int true class indices
+        y_pred: (N,) int predicted class indices
+
+    Returns:
+        numpy array: (C, C) counts, rows = true class, columns = predicted
+    """
+    y_true = np.asarray(y_true, dtype=np.int64)
+    y_pred = np.asarray(y_pred, dtype=np.int64)
+    counts = np.bincount(y_true * num_classes + y_pred, minlength=num_classes * num_classes)
+    return counts.reshape(num_classes, num_classes)
+
+def per_class_metrics(cm):
+    """
+    Precision, recall and F1 per class (0 where undefined, like sklearn)
+
+    Returns:
+        tuple: (precision, recall, f1, support) arrays of length C
+    """
+    cm = np.asarray(cm, dtype=np.float64)
+    tp = np.diag(cm)
+    predicted = cm.sum(axis=0)
+    support = cm.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    return precision, recall, f1, support
+
+def summarize(cm, class_labels, model='ResNet50V2'):
+    """
+    Report dict in the evaluation_report.json schema of notebook 07
+
+    Args:
+        cm: (C, C) confusion matrix
+        class_labels: class names in index order
+        model: model title
+
+    Returns:
+        dict: model, accuracy, macro_f1, weighted_f1, total_samples, correct,
+              incorrect, per_class_metrics
+    """
+    precision, recall, f1, support = per_class_metrics(cm)
+    total = int(cm.sum())
+    correct = int(np.trace(cm))
+    return {
+        'model': model,
+        'accuracy': correct / total if total else 0.0,
+        'macro_f1': float(f1.mean()),
+        'weighted_f1': float((f1 * support).sum() / support.sum()) if total else 0.0,
+        'total_samples': total,
+        'correct': correct,
+        'incorrect': total - correct,
+        'per_class_metrics': [
+            {
+                'Disease': display_name(name),
+                'Precision': float(p),
+                'Recall': float(r),
+                'F1-Score': float(f),
+            }
+            for name, p, r, f in zip(class_labels, precision, recall, f1)
+        ],
+    }
+
+# Evaluation -------------------------------------------------------------------
+
+def labelled_items(data_dir, class_labels, per_class=None):
+    """
+    (path, class index) pairs from a class-per-folder directory
+
+    Folders that are not model classes are ignored; per_class keeps the first
+    N images of each class (sorted), for quick comparisons.
+    """
+    index = {name: i for i, name in enumerate(class_labels)}
+    items, seen = [], {}
+    for path, label in find_images(data_dir):
+        i = index.get(label)
+        if i is None:
+            continue
+        if per_class is not None:
+            if seen.get(i, 0) >= per_class:
+                continue
+            seen[i] = seen.get(i, 0) + 1
+        items.append((path, i))
+    return items
+
+def evaluate_models(specs, items, batch_size=32, workers=None, num_threads=None):
+    """
+    Run every model over the same decoded images
+
+    Args:
+        specs: list of ModelSpec
+        items: list of (path, class index)
+        batch_size: images per decoded batch and forward pass
+        workers: decode threads (default: CPU count)
+        num_threads: TFLite interpreter threads
+
+    Returns:
+        tuple: (y_true array, {spec: {'y_pred': array, 'batch_seconds': list,
+                                      'batch_sizes': list, 'load_seconds': float}},
+                failed [(path, error), ...])
+    """
+    from src.inference_backends import load_backend
+
+    backends, results = {}, {}
+    for spec in specs:
+        start = time.perf_counter()
+        backends[spec] = load_backend(spec.backend, spec.path, num_threads=num_threads, batch_size=batch_size)
+        results[spec] = {'y_pred': [], 'batch_seconds': [], 'batch_sizes': [],
+                         'load_seconds': time.perf_counter() - start}
+
+    profiles = {spec.backbone: get_profile(spec.backbone) for spec in specs}
+    sizes = {profile.size for profile in profiles.values()}
+    if len(sizes) != 1:
+        raise ValueError(f"Models need one input size to share decoded images, got {sorted(sizes)}")
+    width, height = sizes.pop()
+    inputs = {name: np.empty((batch_size, height, width, 3), dtype=np.float32) for name in profiles}
+
+    y_true = []
+    with ImageFolderLoader(items, profile=next(iter(profiles)), batch_size=batch_size, workers=workers,
+                           dtype=np.uint8) as loader:
+        for batch in loader:
+            n = len(batch.images)
+            if n == 0:
+                continue
+            y_true.extend(batch.labels)
+            normalized = {name: normalize(batch.images, profile, out=inputs[name][:n])
+                          for name, profile in profiles.items()}
+            for spec, backend in backends.items():
+                start = time.perf_counter()
+                probs = backend.predict(normalized[spec.backbone])
+                seconds = time.perf_counter() - start
+                result = results[spec]
+                result['y_pred'].append(np.argmax(probs, axis=1))
+                result['batch_seconds'].append(seconds)
+                result['batch_sizes'].append(n)
+        failed = list(loader.failed)
+
+    for result in results.values():
+        result['y_pred'] = np.concatenate(result['y_pred']) if result['y_pred'] else np.empty(0, np.int64)
+    return np.asarray(y_true, dtype=np.int64), results, failed
+
+def latency_summary(batch_seconds, batch_sizes):
+    """
+    Returns:
+        dict: ms_per_image (mean), p50 / p95 per-image ms across batches, images_per_second
+    """
+    seconds = np.asarray(batch_seconds)
+    sizes = np.asarray(batch_sizes)
+    if not len(seconds):
+        return {'ms_per_image': None, 'p50_ms': None, 'p95_ms': None, 'images_per_second': None}
+    per_image = seconds / sizes * 1000.0
+    total = seconds.sum()
+    return {
+        'ms_per_image': float(total / sizes.sum() * 1000.0),
+        'p50_ms': float(np.percentile(per_image, 50)),
+        'p95_ms': float(np.percentile(per_image, 95)),
+        'images_per_second': float(sizes.sum() / total) if total else None,
+    }
+
+def build_report(specs, class_labels, y_true, results, batch_size):
+    """
+    Report with the first spec as reference at the top level
+
+    Returns:
+        dict: notebook 07 fields of the reference model, plus 'models' (one
+              summary per model with backend, latency, confusion matrix and
+              prediction agreement with the reference)
+    """
+    num_classes = len(class_labels)
+    reference = results[specs[0]]['y_pred']
+    models = []
+    for spec in specs:
+        result = results[spec]
+        cm = confusion_matrix(y_true, result['y_pred'], num_classes)
+        summary = summarize(cm, class_labels, MODEL_TITLES.get(spec.backbone, spec.backbone))
+        summary.update({
+            'backbone': spec.backbone,
+            'backend': spec.backend,
+            'model_path': spec.path,
+            'model_bytes': os.path.getsize(spec.path),
+            'load_seconds': result['load_seconds'],
+            'batch_size': batch_size,
+            'latency': latency_summary(result['batch_seconds'], result['batch_sizes']),
+            'agreement_with_reference': float(np.mean(result['y_pred'] == reference)) if len(reference) else None,
+            'confusion_matrix': cm.tolist(),
+        })
+        models.append(summary)
+
+    report = {key: value for key, value in models[0].items()
+              if key in ('model', 'accuracy', 'macro_f1', 'weighted_f1', 'total_samples',
+                         'correct', 'incorrect', 'per_class_metrics')}
+    report['models'] = models
+    return report
+
+def tradeoff_table(report):
+    """Markdown table of accuracy against latency and size, one row per model"""
+    reference = report['models'][0]
+    lines = [
+        "| Model | Backend | Accuracy | Δ vs ref | Macro F1 | Agreement | ms/image | p95 ms | img/s | Size MB |",
+        "|-------|---------|----------|----------|----------|-----------|----------|--------|-------|---------|",
+    ]
+    def fmt(value, spec):
+        return '-' if value is None else format(value, spec)
+    for m in report['models']:
+        latency = m['latency']
+        agreement = m['agreement_with_reference']
+        lines.append(
+            f"| {m['model']} | {m['backend']} | {m['accuracy'] * 100:.2f}% "
+            f"| {(m['accuracy'] - reference['accuracy']) * 100:+.2f} | {m['macro_f1']:.4f} "
+            f"| {fmt(agreement if agreement is None else agreement * 100, '.2f')}% "
+            f"| {fmt(latency['ms_per_image'], '.2f')} | {fmt(latency['p95_ms'], '.2f')} "
+            f"| {fmt(latency['images_per_second'], '.1f')} | {m['model_bytes'] / 1e6:.1f} |"
+        )
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate FarmOG vision models on the validation set")
+    parser.add_argument('--data', default=DEFAULT_DATA_DIR, help="class-per-folder validation images")
+    parser.add_argument('--class-names', default='notebooks/models/class_names.json')
+    parser.add_argument('--model', dest='models', action='append', type=parse_model_spec, default=None,
+                        help="backbone:backend:path (repeatable, first is the reference); "
+                             "default: every model file found in notebooks/models")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=None, help="decode threads")
+    parser.add_argument('--threads', type=int, default=None, help="TFLite interpreter threads")
+    parser.add_argument('--per-class', type=int, default=None, help="evaluate the first N images per class")
+    parser.add_argument('--output', default='notebooks/models/evaluation_report.json')
+    parser.add_argument('--table', default=None, help="also write the tradeoff table to this Markdown file")
+    args = parser.parse_args(argv)
+
+    specs = args.models or [spec for spec in DEFAULT_MODELS if os.path.exists(spec.path)]
+    missing = [spec.path for spec in specs if not os.path.exists(spec.path)]
+    if missing or not specs:
+        parser.error(f"Model files not found: {', '.join(missing) or 'none of the defaults'}")
+
+    with open(args.class_names, 'r') as f:
+        class_names = json.load(f)
+    class_labels = [class_names[str(i)] for i in range(len(class_names))]
+
+    items = labelled_items(args.data, class_labels, per_class=args.per_class)
+    if not items:
+        parser.error(f"No images of the model classes under {args.data}")
+    print(f"Evaluating {len(specs)} model(s) on {len(items)} images")
+
+    start = time.perf_counter()
+    y_true, results, failed = evaluate_models(specs, items, batch_size=args.batch_size,
+                                              workers=args.workers, num_threads=args.threads)
+    for path, error in failed:
+        print(f"⚠️ Skipped {path}: {error}")
+
+    report = build_report(specs, class_labels, y_true, results, args.batch_size)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    table = tradeoff_table(report)
+    if args.table:
+        with open(args.table, 'w') as f:
+            f.write(table + "\n")
+    print(table)
+    print(f"✅ Evaluation report saved to {args.output} ({time.perf_counter() - start:.0f} s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+"""
+FarmOG Station - Fleet Scheduler
+================================
+Keeps the latest readings of every station and, on a fixed tick, scores the
+stations whose readings changed in one calculate_disease_risk_batch call.
+
+Early warnings use the same rule as cross_validate without an image: a
+disease among a station's top TOP_N sensor risks above EARLY_WARNING_RISK
+(60) is warned, and above EARLY_WARNING_FINAL_RISK (70) it is critical
+(it would become the final diagnosis). Alerts are sent to pluggable sinks
+when a warning is raised, escalates to critical, or clears; with an
+src.alerting.AlertManager they are filtered through its hysteresis and
+cooldowns instead.
+
+Per-tick cost grows with the number of changed stations, not the fleet size.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from src.disease_siganture import SIGNATURE_TABLE, IRRIGATION_CODES
+from src.fusion_engine import TOP_N, EARLY_WARNING_RISK, EARLY_WARNING_FINAL_RISK
+from src.selection import top_k_rows
+from src.sensor_matcher import calculate_disease_risk_batch
+
+FleetAlert = namedtuple('FleetAlert', [
+    'timestamp',    # tick time (epoch seconds)
+    'station_id',
+    'disease',
+    'risk_score',
+    'level',        # 'EARLY_WARNING', 'CRITICAL' or 'CLEARED'
+    'previous',     # level before this tick ('CLEARED' if none)
+])
+
+# Warning levels per (station, disease)
+LEVEL_NONE = 0
+LEVEL_WARNING = 1
+LEVEL_CRITICAL = 2
+LEVEL_NAMES = ('CLEARED', 'EARLY_WARNING', 'CRITICAL')
+
+# Columns kept per station, in calculate_disease_risk_batch argument names
+NUMERIC_COLUMNS = ('air_temp', 'air_humidity', 'soil_moisture', 'rainfall_24h')
+
+class MemorySink:
+    """Collects alerts in a list (tests, dashboards)"""
+
+    def __init__(self):
+        self.alerts = []
+
+    def __call__(self, alerts):
+        self.alerts.extend(alerts)
+
+class StreamSink:
+    """Writes one line per alert to a text stream"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __call__(self, alerts):
+        for alert in alerts:
+            self.stream.write(
+                f"{alert.timestamp:.0f} {alert.station_id} {alert.level} "
+                f"{alert.disease} {alert.risk_score:.1f}\n"
+            )
+        self.stream.flush()
+
+class FleetScheduler:
+    """
+    Per-station reading state with dirty tracking and tick-batched scoring.
+
+    submit() can be called from any thread at each station's own cadence;
+    tick() (or the background loop from start()) scores what changed.
+    Ticks are serialized by their own lock, so submit() never waits on scoring.
+    """
+
+    def __init__(self, sinks=(), tick_seconds=60.0, initial_capacity=256, clock=time.time,
+                 alert_manager=None):
+        """
+        Args:
+            sinks: callables receiving a list of FleetAlert per tick
+            tick_seconds: interval of the background loop
+            initial_capacity: stations preallocated (grows as needed)
+            clock: time source for alert timestamps
+            alert_manager: src.alerting.AlertManager deciding which alerts are
+                           sent (default: every level change)
+        """
+        self.sinks = list(sinks)
+        self.alert_manager = alert_manager
+        self.tick_seconds = tick_seconds
+        self.clock = clock
+
+        self.station_ids = []
+        self._rows = {}
+        num_diseases = len(SIGNATURE_TABLE.diseases)
+        self._columns = {name: np.full(initial_capacity, np.nan) for name in NUMERIC_COLUMNS}
+        self._irrigation = np.full(initial_capacity, -1, dtype=np.int8)
+        self.risks = np.zeros((initial_capacity, num_diseases))
+        self._levels = np.zeros((initial_capacity, num_diseases), dtype=np.int8)
+        self._dirty = set()
+
+        self.ticks = 0
+        self.stations_scored = 0
+        self._lock = threading.Lock()
+        # Serializes whole ticks (manual and background) without blocking submit()
+        self._tick_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self.station_ids)
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def _grow(self):
+        capacity = len(self._irrigation) * 2
+        for name, column in self._columns.items():
+            grown = np.full(capacity, np.nan)
+            grown[:len(column)] = column
+            self._columns[name] = grown
+        irrigation = np.full(capacity, -1, dtype=np.int8)
+        irrigation[:len(self._irrigation)] = self._irrigation
+        self._irrigation = irrigation
+        for attr in ('risks', '_levels'):
+            old = getattr(self, attr)
+            grown = np.zeros((capacity, old.shape[1]), dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, attr, grown)
+
+    def _row(self, station_id):
+        row = self._rows.get(station_id)
+        if row is None:
+            row = len(self.station_ids)
+            if row == len(self._irrigation):
+                self._grow()
+            self._rows[station_id] = row
+            self.station_ids.append(station_id)
+        return row
+
+    def submit(self, station_id, sensor_data):
+        """
+        Record a reading; keys not present keep their last value
+
+        Args:
+            station_id: station name
+            sensor_data: dict with any of air_temp, air_humidity, soil_moisture,
+                         rainfall_24h, irrigation_method
+
+        Returns:
+            bool: True if the station's inputs changed (it will be rescored)
+        """
+        with self._lock:
+            row = self._row(station_id)
+            changed = False
+            for name in NUMERIC_COLUMNS:
+                if name in sensor_data:
+                    value = sensor_data[name]
+                    value = np.nan if value is None else float(value)
+                    column = self._columns[name]
+                    old = column[row]
+                    if not (old == value or (old != old and value != value)):
+                        column[row] = value
+                        changed = True
+            if 'irrigation_method' in sensor_data:
+                code = IRRIGATION_CODES.get(sensor_data['irrigation_method'], -1)
+                if self._irrigation[row] != code:
+                    self._irrigation[row] = code
+                    changed = True
+            if changed:
+                self._dirty.add(row)
+            return changed
+
+    def tick(self):
+        """
+        Score every station whose readings changed and dispatch alerts
+
+        Safe to call while the background loop runs: ticks run one at a time,
+        so a slower tick cannot overwrite a newer one's risks and levels.
+
+        Returns:
+            list of FleetAlert sent this tick
+        """
+        with self._tick_lock:
+            return self._tick()
+
+    def _tick(self):
+        with self._lock:
+            if not self._dirty:
+                self.ticks += 1
+                return []
+            rows = np.fromiter(self._dirty, dtype=np.intp, count=len(self._dirty))
+            rows.sort()
+            self._dirty = set()
+            columns = {name: column[rows] for name, column in self._columns.items()}
+            irrigation = self._irrigation[rows]
+
+        risks = calculate_disease_risk_batch(irrigation=irrigation, **columns)
+
+        # cross_validate's early warning rule with no image: top TOP_N sensor risks only
+        top_index, top_risk = top_k_rows(risks, TOP_N, stable=True)
+        levels = np.zeros(risks.shape, dtype=np.int8)
+        top_levels = np.where(top_risk > EARLY_WARNING_FINAL_RISK, LEVEL_CRITICAL,
+                              np.where(top_risk > EARLY_WARNING_RISK, LEVEL_WARNING, LEVEL_NONE))
+        np.put_along_axis(levels, top_index, top_levels.astype(np.int8), axis=1)
+
+        now = self.clock()
+        with self._lock:
+            previous = self._levels[rows]
+            self.risks[rows] = risks
+            self._levels[rows] = levels
+            station_ids = [self.station_ids[r] for r in rows.tolist()]
+            self.ticks += 1
+            self.stations_scored += len(rows)
+
+        if self.alert_manager is not None:
+            # Diseases outside the top TOP_N cannot be warned: they count as risk 0
+            top_risks = np.zeros_like(risks)
+            np.put_along_axis(top_risks, top_index, top_risk, axis=1)
+            alerts = self.alert_manager.observe_batch(station_ids, top_risks, now)
+        else:
+            alerts = []
+            changed_rows, changed_cols = np.nonzero(levels != previous)
+            for i, j in zip(changed_rows.tolist(), changed_cols.tolist()):
+                alerts.append(FleetAlert(
+                    now, station_ids[i], SIGNATURE_TABLE.diseases[j], float(risks[i, j]),
+                    LEVEL_NAMES[levels[i, j]], LEVEL_NAMES[previous[i, j]]
+                ))
+
+        if alerts:
+            for sink in self.sinks:
+                sink(alerts)
+        return alerts
+
+    def station_risks(self, station_id):
+        """
+        Returns:
+            dict: {disease_name: risk_score} as of the last tick that scored the station
+        """
+        row = self._rows[station_id]
+        return dict(zip(SIGNATURE_TABLE.diseases, self.risks[row].tolist()))
+
+    def active_warnings(self):
+        """
+        Returns:
+            list of tuples: [(station_id, disease, level name, risk), ...] currently raised
+        """
+        with self._lock:
+            n = len(self.station_ids)
+            rows, cols = np.nonzero(self._levels[:n])
+            return [(self.station_ids[r], SIGNATURE_TABLE.diseases[c], LEVEL_NAMES[self._levels[r, c]],
+                     float(self.risks[r, c])) for r, c in zip(rows.tolist(), cols.tolist())]
+
+    # Background loop -------------------------------------------------------------
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            self.tick()
+            next_tick += self.tick_seconds
+            self._stop.wait(max(0.0, next_tick - time.monotonic()))
+
+    def start(self):
+        """Tick every tick_seconds in a daemon thread"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="farmog-fleet-scheduler", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """Stop the background loop after the current tick"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
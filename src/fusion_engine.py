@@ -4,9 +4,55 @@ FarmOG Station - Multi-Modal Fusion Engine
 Cross-validates vision model predictions with sensor pattern matching
 """
 
-import numpy as np
-from src.disease_siganture import DISEASE_SIGNATURES, get_disease_display_name
+import os
+import threading
+import time
+from collections import namedtuple
+
+from src.disease_siganture import SIGNATURE_TABLE
+from src.diagnosis import Diagnosis, DiagnosisStatus
+from src import instrumentation
 from src.sensor_matcher import calculate_disease_risk, get_all_disease_risks
+from src.micro_batcher import MicroBatcher
+from src.report_renderer import render_report
+from src.selection import top_k_items, top_k_rows
+
+# NumPy and the inference backends (and through them TensorFlow) are imported
+# on first vision use, so sensor-only and report-only callers stay import-light.
+
+HEALTHY_CLASS = "Tomato___healthy"
+PENDING_CLASS = "Unknown"          # final diagnosis while an image awaits inference
+
+# Cross-validation thresholds (vision confidences are 0-1, sensor risks 0-100)
+TOP_N = 3                          # predictions considered from each modality
+VISION_MIN_CONFIDENCE = 0.1        # vision predictions below this are ignored
+CONFIRM_VISION_MIN = 0.5           # CONFIRMED: both modalities agree above these
+CONFIRM_SENSOR_MIN = 50
+CONFIRMED_CONFIDENCE_CAP = 95
+EARLY_WARNING_RISK = 60            # EARLY_WARNING: sensor risk above this...
+EARLY_WARNING_VISION_MAX = 0.7     # ...and vision below this (or healthy)
+EARLY_WARNING_FINAL_RISK = 70      # early warning becomes the final diagnosis
+CONFLICT_VISION_MIN = 0.5          # CONFLICT: modalities disagree above these
+CONFLICT_SENSOR_MIN = 50
+CONFLICT_PENALTY = 0.7             # confidence multiplier for NEEDS_REVIEW
+LOW_CONFIDENCE_MIN = 0.3           # LOW_CONFIDENCE: fall back to vision above this
+UNCERTAIN_CONFIDENCE = 50.0
+
+BatchDiagnosis = namedtuple('BatchDiagnosis', [
+    'status',        # (N,) int8 DiagnosisStatus codes
+    'final_index',   # (N,) int index into labels
+    'confidence',    # (N,) float64 final confidence (0-100)
+    'labels',        # tuple of class names referenced by final_index
+    'details',       # list of legacy diagnosis dicts if verbose, else None
+])
+
+def _reusable_source(source):
+    """File-like sources are read once so a cascade can decode them twice"""
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    if hasattr(source, 'read'):
+        return source.read()
+    return source
 
 class FarmOGFusionEngine:
     """
@@ -15,16 +61,120 @@ class FarmOGFusionEngine:
     2. Sensor pattern matching (environmental conditions)
     """
     
-    def __init__(self, vision_model=None, class_names=None):
+    def __init__(self, vision_model=None, class_names=None, backend=None, model_loader=None,
+                 backbone='resnet50v2', prediction_cache=None, model_version='default',
+                 risk_scorer=None, cascade=None, sensor_gate=None):
         """
         Initialize fusion engine
         
         Args:
             vision_model: Trained Keras model (optional, can load later)
             class_names: Dict mapping indices to class names
+            backend: inference backend from src.inference_backends (optional,
+                     defaults to a KerasBackend wrapping vision_model)
+            model_loader: callable returning a backend, run on first vision
+                          request or by warm_up() (optional)
+            backbone: preprocessing profile name, see src.preprocessing.PROFILES
+            prediction_cache: src.prediction_cache.PredictionCache (optional)
+            model_version: identifies the model in prediction cache keys
+            risk_scorer: object with get_all_disease_risks(sensor_data), e.g. a
+                         src.risk_cache.CachedRiskScorer (default: direct scoring)
+            cascade: src.cascade.ModelCascade escalating uncertain images to a
+                     larger model (optional, see enable_cascade)
+            sensor_gate: src.sensor_gate.SensorGate, opt-in policy deferring
+                         low-risk images (optional, used by diagnose_file)
         """
         self.vision_model = vision_model
         self.class_names = class_names
+        self.backend = backend
+        self.model_loader = model_loader
+        self.backbone = backbone
+        self._preprocessors = threading.local()
+        self.prediction_cache = prediction_cache
+        self.model_version = model_version
+        self.risk_scorer = risk_scorer
+        self.cascade = cascade
+        self.sensor_gate = sensor_gate
+        self.model_file = None
+        self.model_load_seconds = None
+        self._load_lock = threading.Lock()
+        self._labels = ([], None)
+    
+    @classmethod
+    def from_model_file(cls, model_path, class_names, backend='keras', num_threads=None, batch_size=None,
+                        lazy=False, backbone='resnet50v2', prediction_cache=None):
+        """
+        Build an engine around a model file with the chosen inference backend
+        
+        Args:
+            model_path: .h5 for 'keras', .tflite for 'tflite' / 'tflite_int8'
+            class_names: Dict mapping indices to class names
+            backend: backend name, see src.inference_backends.BACKENDS
+            num_threads: TFLite interpreter threads
+            batch_size: images per forward pass
+            lazy: defer loading the model until first use or warm_up()
+            backbone: preprocessing profile name, see src.preprocessing.PROFILES
+            prediction_cache: src.prediction_cache.PredictionCache (optional)
+        """
+        from src.prediction_cache import model_version_for
+        
+        def loader():
+            from src.inference_backends import load_backend
+            return load_backend(backend, model_path, num_threads=num_threads, batch_size=batch_size)
+        
+        engine = cls(class_names=class_names, model_loader=loader, backbone=backbone,
+                     prediction_cache=prediction_cache,
+                     model_version=model_version_for(model_path, backend))
+        engine.model_file = (model_path, backend)
+        if not lazy:
+            engine.warm_up(background=False)
+        return engine
+    
+    @property
+    def vision_ready(self):
+        """True once a model is loaded and predictions will not block on loading"""
+        return self.backend is not None or self.vision_model is not None
+    
+    def warm_up(self, background=True):
+        """
+        Load the vision model now instead of on the first vision request
+        
+        Args:
+            background: load in a daemon thread and return immediately
+        
+        Returns:
+            threading.Thread if background, else None
+        """
+        if not background:
+            self._get_backend()
+            return None
+        
+        def run():
+            try:
+                self._get_backend()
+            except Exception:
+                # Retried (and raised to the caller) on the first vision request
+                pass
+        
+        thread = threading.Thread(target=run, name="farmog-model-warmup", daemon=True)
+        thread.start()
+        return thread
+    
+    def _get_backend(self):
+        """Active inference backend, loading or wrapping the model on first use"""
+        if self.backend is not None:
+            return self.backend
+        
+        with self._load_lock:
+            if self.backend is None:
+                if self.vision_model is not None:
+                    from src.inference_backends import KerasBackend
+                    self.backend = KerasBackend(self.vision_model)
+                elif self.model_loader is not None:
+                    start = time.perf_counter()
+                    self.backend = self.model_loader()
+                    self.model_load_seconds = time.perf_counter() - start
+        return self.backend
         
     def predict_from_image(self, image):
         """
@@ -36,19 +186,277 @@ class FarmOGFusionEngine:
         Returns:
             dict: {class_name: confidence, ...}
         """
-        if self.vision_model is None:
+        if self.prediction_cache is None:
+            return self.predict_batch([image])[0]
+        
+        from src.prediction_cache import content_hash, prediction_key
+        key = prediction_key(content_hash(image), self.model_version, 'preprocessed')
+        return self.prediction_cache.get_or_compute(key, lambda: self.predict_batch([image])[0])
+    
+    def _preprocessor(self):
+        """This thread's ImagePreprocessor for the engine backbone"""
+        preprocessor = getattr(self._preprocessors, 'current', None)
+        if preprocessor is None or preprocessor.profile.name != self.backbone:
+            from src.preprocessing import ImagePreprocessor
+            preprocessor = ImagePreprocessor(self.backbone)
+            self._preprocessors.current = preprocessor
+        return preprocessor
+    
+    def enable_cascade(self, fallback, min_confidence=0.8, escalate_on_conflict=True):
+        """
+        Use this engine's model as the cheap first stage of a cascade
+        
+        predict_from_file and diagnose_file then re-run uncertain images on
+        the fallback engine (e.g. ResNet50V2 behind a MobileNetV2 engine).
+        
+        Args:
+            fallback: FarmOGFusionEngine with the larger model
+            min_confidence: escalate below this top-1 confidence (0-1)
+            escalate_on_conflict: escalate when diagnose_file finds a CONFLICT
+        
+        Returns:
+            ModelCascade: escalation counters via .stats()
+        """
+        from src.cascade import ModelCascade
+        self.cascade = ModelCascade(fallback, min_confidence=min_confidence,
+                                    escalate_on_conflict=escalate_on_conflict)
+        return self.cascade
+    
+    def predict_from_file(self, source):
+        """
+        Preprocess an image for the engine backbone and get vision predictions
+        
+        With a prediction cache, encoded images (path, bytes, upload) are looked
+        up by their raw bytes before decoding, so repeats skip both decode and
+        forward pass. In cascade mode low-confidence results come from the
+        fallback model.
+        
+        Args:
+            source: image path, bytes, file-like object (e.g. an upload) or PIL image
+        
+        Returns:
+            dict: {class_name: confidence, ...}
+        """
+        if self.cascade is None:
+            return self._predict_file(source)
+        
+        source = _reusable_source(source)
+        vision_results = self._predict_file(source)
+        reason = self.cascade.escalation_reason(vision_results)
+        if reason is not None:
+            vision_results = self.cascade.fallback.predict_from_file(source)
+        self.cascade.record(reason)
+        return vision_results
+    
+    def diagnose_file(self, source, sensor_data, item_id=None):
+        """
+        Predict an image and cross-validate it with sensor readings
+        
+        With a sensor gate, an image the gate defers is not run: it is queued
+        for process_deferred and a pending diagnosis (status UNKNOWN, final
+        diagnosis "Unknown", sensor risks only) is returned with vision_results
+        None; the real diagnosis comes from process_deferred. In cascade mode the image is
+        escalated to the fallback model when the cheap prediction is uncertain
+        or conflicts with the sensors, and the diagnosis is redone with the
+        fallback's predictions.
+        
+        Args:
+            source: image path, bytes, file-like object (e.g. an upload) or PIL image
+            sensor_data: dict with sensor readings
+            item_id: id reported back by process_deferred if the image is deferred
+        
+        Returns:
+            tuple: (vision_results dict or None, Diagnosis)
+        """
+        sensor_risks = self._sensor_risks(sensor_data)
+        if self.sensor_gate is not None and self.sensor_gate.should_defer(sensor_data, sensor_risks):
+            self.sensor_gate.defer(source, sensor_risks, item_id)
+            instrumentation.increment('sensor_gate', 'deferred')
+            instrumentation.record_status(DiagnosisStatus.UNKNOWN)
+            return None, Diagnosis(DiagnosisStatus.UNKNOWN, PENDING_CLASS, 0.0,
+                                   sensors=tuple(top_k_items(sensor_risks, TOP_N)))
+        
+        if self.cascade is None:
+            vision_results = self._predict_file(source)
+            return vision_results, self.diagnose_risks(vision_results, sensor_risks)
+        
+        source = _reusable_source(source)
+        vision_results = self._predict_file(source)
+        diagnosis = self.diagnose_risks(vision_results, sensor_risks)
+        reason = self.cascade.escalation_reason(vision_results, diagnosis)
+        if reason is not None:
+            vision_results = self.cascade.fallback.predict_from_file(source)
+            diagnosis = self.diagnose_risks(vision_results, sensor_risks)
+        self.cascade.record(reason)
+        return vision_results, diagnosis
+    
+    def process_deferred(self, batch_size=32, max_items=None):
+        """
+        Run the images held back by the sensor gate in batched forward passes
+        
+        Args:
+            batch_size: images per forward pass
+            max_items: process at most this many (default: the whole queue)
+        
+        Images that cannot be decoded are skipped and recorded in
+        sensor_gate.failed as (item_id, error).
+        
+        Returns:
+            list of tuples: [(item_id, vision_results, Diagnosis), ...] oldest first,
+                            diagnosed against the sensor risks at capture time
+        """
+        if self.sensor_gate is None:
+            return []
+        
+        from src.preprocessing import ImagePreprocessor
+        gate = self.sensor_gate
+        preprocessor = None
+        results = []
+        remaining = max_items
+        while remaining is None or remaining > 0:
+            chunk = gate.take(batch_size if remaining is None else min(batch_size, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            if preprocessor is None:
+                preprocessor = ImagePreprocessor(self.backbone, batch_size=batch_size)
+            
+            decoded = []
+            for item in chunk:
+                try:
+                    preprocessor.preprocess_at(len(decoded), item.source)
+                except Exception as e:
+                    gate.failed.append((item.item_id, e))
+                    continue
+                decoded.append(item)
+            if not decoded:
+                continue
+            
+            batch = preprocessor.buffer[:len(decoded)]
+            for item, vision_results in zip(decoded, self.predict_batch(batch)):
+                results.append((item.item_id, vision_results,
+                                self.diagnose_risks(vision_results, item.sensor_risks)))
+        return results
+    
+    def _predict_file(self, source):
+        """predict_from_file for this engine's own model only"""
+        data = None
+        if self.prediction_cache is not None:
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                data = source
+            elif isinstance(source, (str, os.PathLike)):
+                with open(source, 'rb') as f:
+                    data = f.read()
+            elif hasattr(source, 'getvalue'):
+                data = source.getvalue()
+        
+        if data is None:
+            return self.predict_from_image(self._preprocessor().preprocess(source))
+        
+        from src.prediction_cache import content_hash, prediction_key
+        key = prediction_key(content_hash(data), self.model_version, self.backbone)
+        return self.prediction_cache.get_or_compute(
+            key, lambda: self.predict_batch([self._preprocessor().preprocess(data)])[0]
+        )
+    
+    def predict_batch(self, images):
+        """
+        Get vision model predictions for many images with batched forward passes
+        
+        Args:
+            images: list of preprocessed image arrays, or an (N, 224, 224, 3) array;
+                    uint8 arrays are raw pixels and are normalized for the engine
+                    backbone first
+        
+        Returns:
+            list of dicts: [{class_name: confidence, ...}, ...] in input order
+        """
+        backend = self._get_backend()
+        if backend is None:
             raise ValueError("Vision model not loaded!")
         
-        # Get predictions
-        predictions = self.vision_model.predict(np.expand_dims(image, axis=0), verbose=0)[0]
+        import numpy as np
+        batch = np.asarray(images)
+        if batch.dtype == np.uint8:
+            # Raw pixels, e.g. from ImagePreprocessor(dtype=np.uint8)
+            from src.preprocessing import normalize
+            batch = normalize(batch, self.backbone)
+        elif np.issubdtype(batch.dtype, np.floating):
+            batch = batch.astype(np.float32, copy=False)
+        elif batch.size:
+            raise ValueError(f"Expected preprocessed float images or raw uint8 pixels, got {batch.dtype}")
+        if batch.ndim == 3:
+            batch = batch[np.newaxis]
+        if len(batch) == 0:
+            return []
+        
+        with instrumentation.stage('model_forward'):
+            predictions = backend.predict(batch).tolist()
         
         # Map to class names
-        results = {}
-        for idx, prob in enumerate(predictions):
-            class_name = self.class_names.get(str(idx), f"Class_{idx}")
-            results[class_name] = float(prob)
+        labels = self._class_labels(len(predictions[0]))
+        return [dict(zip(labels, row)) for row in predictions]
+    
+    def predict_folder(self, sources, batch_size=32, workers=None, prefetch=2):
+        """
+        Predict a folder (or list) of images, decoding ahead on a thread pool
         
-        return results
+        Args:
+            sources: directory path, or list of paths / (path, label) tuples
+            batch_size: images per forward pass
+            workers: decode threads (default: CPU count)
+            prefetch: batches decoded ahead of inference
+        
+        Yields:
+            tuple: (path, label, {class_name: confidence, ...}) in input order;
+                   label is the class folder name or None
+        """
+        from src.image_loader import ImageFolderLoader
+        
+        with ImageFolderLoader(sources, profile=self.backbone, batch_size=batch_size,
+                               workers=workers, prefetch=prefetch) as loader:
+            for batch in loader:
+                results = self.predict_batch(batch.images)
+                yield from zip(batch.paths, batch.labels, results)
+    
+    def _class_labels(self, num_classes):
+        """Class names in model output order, cached per class count"""
+        labels, source = self._labels
+        if source is not self.class_names or len(labels) != num_classes:
+            labels = [self.class_names.get(str(idx), f"Class_{idx}") for idx in range(num_classes)]
+            self._labels = (labels, self.class_names)
+        return labels
+    
+    def create_micro_batcher(self, max_batch_size=32, max_wait_ms=10):
+        """
+        Start a micro-batching queue in front of predict_batch
+        
+        Concurrent callers submit single images; requests are grouped up to
+        max_batch_size or max_wait_ms and run as one forward pass.
+        
+        Returns:
+            MicroBatcher: call .predict(image) or .submit(image), then .close()
+        """
+        return MicroBatcher(self.predict_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    
+    def create_worker_pool(self, processes=None, threads_per_worker=1, chunksize=4):
+        """
+        Start worker processes running this engine's model file
+        
+        Only for engines built with from_model_file. With a .tflite model the
+        workers share the memory-mapped weights.
+        
+        Returns:
+            InferenceWorkerPool: call .predict(sources) / .diagnose(tasks), then .close()
+        """
+        if self.model_file is None:
+            raise ValueError("Worker pools need an engine created with from_model_file")
+        from src.worker_pool import InferenceWorkerPool
+        model_path, backend = self.model_file
+        return InferenceWorkerPool(model_path, self.class_names, backend=backend, backbone=self.backbone,
+                                   processes=processes, threads_per_worker=threads_per_worker,
+                                   chunksize=chunksize)
     
     def get_top_vision_predictions(self, vision_results, top_n=3, threshold=0.1):
         """
@@ -62,9 +470,7 @@ class FarmOGFusionEngine:
         Returns:
             list of tuples: [(class_name, confidence), ...]
         """
-        filtered = [(k, v) for k, v in vision_results.items() if v >= threshold]
-        sorted_preds = sorted(filtered, key=lambda x: x[1], reverse=True)
-        return sorted_preds[:top_n]
+        return top_k_items(vision_results, top_n, threshold=threshold)
     
     def cross_validate(self, vision_results, sensor_data):
         """
@@ -77,237 +483,250 @@ class FarmOGFusionEngine:
         Returns:
             dict with comprehensive diagnosis
         """
+        return self.diagnose(vision_results, sensor_data).to_dict()
+    
+    def cross_validate_risks(self, vision_results, sensor_risks):
+        """
+        Cross-validate vision predictions against precomputed sensor risk scores
+        
+        Args:
+            vision_results: dict from predict_from_image
+            sensor_risks: dict from get_all_disease_risks
+        
+        Returns:
+            dict with comprehensive diagnosis (same as cross_validate)
+        """
+        return self.diagnose_risks(vision_results, sensor_risks).to_dict()
+    
+    def diagnose(self, vision_results, sensor_data):
+        """
+        Same as cross_validate, returning a compact Diagnosis instead of a dict
+        
+        Returns:
+            Diagnosis: supports diagnosis["status"] etc. and .to_dict()
+        """
+        return self.diagnose_risks(vision_results, self._sensor_risks(sensor_data))
+    
+    def _sensor_risks(self, sensor_data):
+        """Risk dict through the engine's risk scorer if it has one"""
+        if self.risk_scorer is not None:
+            with instrumentation.stage('sensor_scoring'):
+                return self.risk_scorer.get_all_disease_risks(sensor_data)
+        return get_all_disease_risks(sensor_data)
+    
+    @instrumentation.timed('cross_validation')
+    def diagnose_risks(self, vision_results, sensor_risks):
+        """
+        Same as cross_validate_risks, returning a compact Diagnosis
+        
+        Returns:
+            Diagnosis: supports diagnosis["status"] etc. and .to_dict()
+        """
         # Get top vision predictions
-        top_vision = self.get_top_vision_predictions(vision_results, top_n=3)
+        top_vision = self.get_top_vision_predictions(vision_results, top_n=TOP_N, threshold=VISION_MIN_CONFIDENCE)
         
         # Get sensor risk scores
-        sensor_risks = get_all_disease_risks(sensor_data)
-        top_sensors = sorted(sensor_risks.items(), key=lambda x: x[1], reverse=True)[:3]
-        
-        # Find matches and conflicts
-        diagnosis = {
-            "vision_predictions": [],
-            "sensor_predictions": [],
-            "confirmed": [],
-            "early_warnings": [],
-            "conflicts": [],
-            "final_diagnosis": None,
-            "confidence": 0.0,
-            "status": "UNKNOWN"
-        }
-        
-        # Format vision predictions
-        for disease, confidence in top_vision:
-            diagnosis["vision_predictions"].append({
-                "disease": disease,
-                "display_name": get_disease_display_name(disease),
-                "confidence": confidence * 100,
-                "source": "vision"
-            })
-        
-        # Format sensor predictions
-        for disease, risk in top_sensors:
-            if risk > 20:  # Only include significant risks
-                diagnosis["sensor_predictions"].append({
-                    "disease": disease,
-                    "display_name": get_disease_display_name(disease),
-                    "risk_score": risk,
-                    "source": "sensor"
-                })
+        top_sensors = top_k_items(sensor_risks, TOP_N)
+        
+        final_diagnosis = None
+        confidence = 0.0
+        status = DiagnosisStatus.UNKNOWN
+        confirmed = []
+        early_warnings = []
+        conflict = None
         
         # CROSS-VALIDATION LOGIC
         
         # Case 1: CONFIRMED - Both vision and sensor agree
         for v_disease, v_conf in top_vision:
             for s_disease, s_risk in top_sensors:
-                if v_disease == s_disease and v_conf > 0.5 and s_risk > 50:
+                if v_disease == s_disease and v_conf > CONFIRM_VISION_MIN and s_risk > CONFIRM_SENSOR_MIN:
                     # Strong agreement!
-                    combined_confidence = min(95, (v_conf * 100 + s_risk) / 2)
-                    
-                    diagnosis["confirmed"].append({
-                        "disease": v_disease,
-                        "display_name": get_disease_display_name(v_disease),
-                        "confidence": combined_confidence,
-                        "vision_confidence": v_conf * 100,
-                        "sensor_risk": s_risk,
-                        "status": "CONFIRMED",
-                        "validation": "✅ Vision + Sensor Agreement",
-                        "corrective_actions": DISEASE_SIGNATURES[v_disease]["corrective_actions"],
-                        "root_cause": DISEASE_SIGNATURES[v_disease]["root_cause"],
-                        "prevention": DISEASE_SIGNATURES[v_disease]["prevention"]
-                    })
+                    combined_confidence = min(CONFIRMED_CONFIDENCE_CAP, (v_conf * 100 + s_risk) / 2)
+                    confirmed.append((v_disease, combined_confidence, v_conf, s_risk))
                     
                     # Set as final diagnosis
-                    if diagnosis["final_diagnosis"] is None:
-                        diagnosis["final_diagnosis"] = v_disease
-                        diagnosis["confidence"] = combined_confidence
-                        diagnosis["status"] = "CONFIRMED"
+                    if final_diagnosis is None:
+                        final_diagnosis = v_disease
+                        confidence = combined_confidence
+                        status = DiagnosisStatus.CONFIRMED
         
         # Case 2: EARLY WARNING - High sensor risk but no visual symptoms (or low confidence)
-        if len(diagnosis["confirmed"]) == 0:
-            top_vision_disease = top_vision[0][0] if top_vision else "Tomato___healthy"
+        if not confirmed:
+            top_vision_disease = top_vision[0][0] if top_vision else HEALTHY_CLASS
             top_vision_conf = top_vision[0][1] if top_vision else 1.0
             
             for s_disease, s_risk in top_sensors:
                 # High sensor risk but vision doesn't strongly agree
-                if s_risk > 60 and (top_vision_disease == "Tomato___healthy" or 
-                                   (s_disease != top_vision_disease and top_vision_conf < 0.7)):
-                    
-                    diagnosis["early_warnings"].append({
-                        "disease": s_disease,
-                        "display_name": get_disease_display_name(s_disease),
-                        "risk_score": s_risk,
-                        "status": "EARLY_WARNING",
-                        "alert": f"⚠️ Conditions favor {get_disease_display_name(s_disease)} - symptoms may appear in 24-48h",
-                        "corrective_actions": DISEASE_SIGNATURES[s_disease]["corrective_actions"],
-                        "preventive_note": "Act now to prevent disease development"
-                    })
+                if s_risk > EARLY_WARNING_RISK and (top_vision_disease == HEALTHY_CLASS or 
+                                   (s_disease != top_vision_disease and top_vision_conf < EARLY_WARNING_VISION_MAX)):
+                    early_warnings.append((s_disease, s_risk))
                     
                     # Set as final diagnosis if no confirmed cases
-                    if diagnosis["final_diagnosis"] is None and s_risk > 70:
-                        diagnosis["final_diagnosis"] = s_disease
-                        diagnosis["confidence"] = s_risk
-                        diagnosis["status"] = "EARLY_WARNING"
+                    if final_diagnosis is None and s_risk > EARLY_WARNING_FINAL_RISK:
+                        final_diagnosis = s_disease
+                        confidence = s_risk
+                        status = DiagnosisStatus.EARLY_WARNING
         
         # Case 3: CONFLICT - Vision sees one thing, sensors say another
-        if len(diagnosis["confirmed"]) == 0 and len(diagnosis["early_warnings"]) == 0:
+        if not confirmed and not early_warnings:
             top_vision_disease, top_vision_conf = top_vision[0] if top_vision else ("Unknown", 0)
             top_sensor_disease, top_sensor_risk = top_sensors[0] if top_sensors else ("Unknown", 0)
             
             if (top_vision_disease != top_sensor_disease and 
-                top_vision_conf > 0.5 and top_sensor_risk > 50):
-                
-                diagnosis["conflicts"].append({
-                    "vision_says": top_vision_disease,
-                    "vision_display": get_disease_display_name(top_vision_disease),
-                    "vision_confidence": top_vision_conf * 100,
-                    "sensor_says": top_sensor_disease,
-                    "sensor_display": get_disease_display_name(top_sensor_disease),
-                    "sensor_risk": top_sensor_risk,
-                    "status": "CONFLICT",
-                    "alert": "⚠️ Vision and sensor predictions disagree - manual review recommended",
-                    "possible_causes": [
-                        "Multiple diseases present simultaneously",
-                        "Disease in early/transitional stage",
-                        "Sensor calibration may need adjustment",
-                        "Unusual environmental conditions"
-                    ],
-                    "next_steps": [
-                        "Take additional photos from different angles",
-                        "Verify sensor calibration",
-                        "Monitor closely for 24-48 hours",
-                        "Consider expert consultation"
-                    ]
-                })
+                top_vision_conf > CONFLICT_VISION_MIN and top_sensor_risk > CONFLICT_SENSOR_MIN):
+                conflict = (top_vision_disease, top_vision_conf, top_sensor_disease, top_sensor_risk)
                 
                 # Use vision if higher confidence, otherwise sensor
                 if top_vision_conf > (top_sensor_risk / 100):
-                    diagnosis["final_diagnosis"] = top_vision_disease
-                    diagnosis["confidence"] = top_vision_conf * 100 * 0.7  # Reduce due to conflict
-                    diagnosis["status"] = "NEEDS_REVIEW"
+                    final_diagnosis = top_vision_disease
+                    confidence = top_vision_conf * 100 * CONFLICT_PENALTY  # Reduce due to conflict
                 else:
-                    diagnosis["final_diagnosis"] = top_sensor_disease
-                    diagnosis["confidence"] = top_sensor_risk * 0.7
-                    diagnosis["status"] = "NEEDS_REVIEW"
+                    final_diagnosis = top_sensor_disease
+                    confidence = top_sensor_risk * CONFLICT_PENALTY
+                status = DiagnosisStatus.NEEDS_REVIEW
         
         # Case 4: Low confidence all around
-        if diagnosis["final_diagnosis"] is None:
+        if final_diagnosis is None:
             # Default to vision's top prediction or healthy
-            if top_vision and top_vision[0][1] > 0.3:
-                diagnosis["final_diagnosis"] = top_vision[0][0]
-                diagnosis["confidence"] = top_vision[0][1] * 100
-                diagnosis["status"] = "LOW_CONFIDENCE"
+            if top_vision and top_vision[0][1] > LOW_CONFIDENCE_MIN:
+                final_diagnosis = top_vision[0][0]
+                confidence = top_vision[0][1] * 100
+                status = DiagnosisStatus.LOW_CONFIDENCE
             else:
-                diagnosis["final_diagnosis"] = "Tomato___healthy"
-                diagnosis["confidence"] = 50.0
-                diagnosis["status"] = "UNCERTAIN"
+                final_diagnosis = HEALTHY_CLASS
+                confidence = UNCERTAIN_CONFIDENCE
+                status = DiagnosisStatus.UNCERTAIN
         
-        return diagnosis
+        instrumentation.record_status(status)
+        return Diagnosis(status, final_diagnosis, confidence, tuple(top_vision), tuple(top_sensors),
+                         tuple(confirmed), tuple(early_warnings), conflict)
     
+    @instrumentation.timed('cross_validation')
+    def cross_validate_batch(self, vision_probs, sensor_risks, verbose=False):
+        """
+        Vectorized cross_validate over many (vision, sensor) pairs
+        
+        Runs the same CONFIRMED / EARLY_WARNING / CONFLICT / LOW_CONFIDENCE
+        decision tree with array operations; statuses, final diagnoses and
+        confidences match cross_validate_risks row by row.
+        
+        Args:
+            vision_probs: (N, C) class probabilities, columns in class_names order
+            sensor_risks: (N, D) risk matrix from calculate_disease_risk_batch,
+                          columns in SIGNATURE_TABLE.diseases order
+            verbose: also build the legacy diagnosis dicts (slow, per row)
+        
+        Returns:
+            BatchDiagnosis: status codes, final_index into labels, confidences
+        """
+        import numpy as np
+        
+        V = np.asarray(vision_probs, dtype=np.float64)
+        S = np.asarray(sensor_risks, dtype=np.float64)
+        n = len(V)
+        rows = np.arange(n)
+        
+        # Label space: disease table first, then vision classes it does not know
+        class_labels = self._class_labels(V.shape[1])
+        diseases = SIGNATURE_TABLE.diseases
+        extra = [name for name in class_labels if name not in SIGNATURE_TABLE.index]
+        labels = diseases + tuple(extra)
+        class_to_label = np.array([labels.index(name) for name in class_labels], dtype=np.intp)
+        healthy = labels.index(HEALTHY_CLASS)
+        
+        # Top predictions from each modality (stable order, like the dict path)
+        vision_idx = np.argsort(-V, axis=1, kind='stable')[:, :TOP_N]
+        vision_conf = np.take_along_axis(V, vision_idx, axis=1)
+        vision_valid = vision_conf >= VISION_MIN_CONFIDENCE
+        vision_label = class_to_label[vision_idx]
+        sensor_idx, sensor_top = top_k_rows(S, TOP_N, stable=True)
+        
+        status = np.full(n, DiagnosisStatus.UNKNOWN, dtype=np.int8)
+        final = np.full(n, -1, dtype=np.intp)
+        confidence = np.zeros(n)
+        
+        # Case 1: CONFIRMED - first (vision rank, sensor rank) pair that agrees
+        match = (
+            vision_valid[:, :, None]
+            & (vision_label[:, :, None] == sensor_idx[:, None, :])
+            & (vision_conf[:, :, None] > CONFIRM_VISION_MIN)
+            & (sensor_top[:, None, :] > CONFIRM_SENSOR_MIN)
+        ).reshape(n, -1)
+        confirmed = match.any(axis=1)
+        first = match.argmax(axis=1)
+        v_rank, s_rank = first // TOP_N, first % TOP_N
+        combined = np.minimum(CONFIRMED_CONFIDENCE_CAP,
+                              (vision_conf[rows, v_rank] * 100 + sensor_top[rows, s_rank]) / 2)
+        status[confirmed] = DiagnosisStatus.CONFIRMED
+        final[confirmed] = vision_label[rows, v_rank][confirmed]
+        confidence[confirmed] = combined[confirmed]
+        
+        # Case 2: EARLY WARNING - high sensor risk, vision healthy or unsure
+        has_vision = vision_valid[:, 0]
+        top_label = np.where(has_vision, vision_label[:, 0], healthy)
+        top_conf = np.where(has_vision, vision_conf[:, 0], 1.0)
+        warns = (
+            ~confirmed[:, None]
+            & (sensor_top > EARLY_WARNING_RISK)
+            & ((top_label == healthy)[:, None]
+               | ((sensor_idx != top_label[:, None]) & (top_conf < EARLY_WARNING_VISION_MAX)[:, None]))
+        )
+        any_warning = warns.any(axis=1)
+        final_warn = warns & (sensor_top > EARLY_WARNING_FINAL_RISK)
+        early = final_warn.any(axis=1)
+        w_rank = final_warn.argmax(axis=1)
+        status[early] = DiagnosisStatus.EARLY_WARNING
+        final[early] = sensor_idx[rows, w_rank][early]
+        confidence[early] = sensor_top[rows, w_rank][early]
+        
+        # Case 3: CONFLICT - vision and sensors confidently disagree
+        conflict_vision_conf = np.where(has_vision, vision_conf[:, 0], 0.0)
+        conflict = (
+            ~confirmed & ~any_warning
+            & ~(has_vision & (vision_label[:, 0] == sensor_idx[:, 0]))
+            & (conflict_vision_conf > CONFLICT_VISION_MIN)
+            & (sensor_top[:, 0] > CONFLICT_SENSOR_MIN)
+        )
+        use_vision = conflict_vision_conf > sensor_top[:, 0] / 100
+        status[conflict] = DiagnosisStatus.NEEDS_REVIEW
+        final[conflict] = np.where(use_vision, vision_label[:, 0], sensor_idx[:, 0])[conflict]
+        confidence[conflict] = np.where(use_vision,
+                                        conflict_vision_conf * 100 * CONFLICT_PENALTY,
+                                        sensor_top[:, 0] * CONFLICT_PENALTY)[conflict]
+        
+        # Case 4: Low confidence all around
+        undecided = final < 0
+        low = undecided & has_vision & (vision_conf[:, 0] > LOW_CONFIDENCE_MIN)
+        uncertain = undecided & ~low
+        status[low] = DiagnosisStatus.LOW_CONFIDENCE
+        final[low] = vision_label[:, 0][low]
+        confidence[low] = vision_conf[:, 0][low] * 100
+        status[uncertain] = DiagnosisStatus.UNCERTAIN
+        final[uncertain] = healthy
+        confidence[uncertain] = UNCERTAIN_CONFIDENCE
+        
+        details = None
+        if verbose:
+            details = [
+                self.cross_validate_risks(dict(zip(class_labels, v_row)), dict(zip(diseases, s_row)))
+                for v_row, s_row in zip(V.tolist(), S.tolist())
+            ]
+        
+        if details is None:
+            # Verbose details go through diagnose_risks, which counts them itself
+            instrumentation.record_statuses(status)
+        return BatchDiagnosis(status, final, confidence, labels, details)
+    
+    @instrumentation.timed('report_rendering')
     def generate_report(self, diagnosis):
         """
         Generate human-readable report from diagnosis
         
+        Args:
+            diagnosis: Diagnosis from diagnose() or dict from cross_validate()
+        
         Returns:
             str: formatted report
         """
-        report = []
-        report.append("="*60)
-        report.append("🌱 FARMOG STATION - DIAGNOSIS REPORT")
-        report.append("="*60)
-        report.append("")
-        
-        # Final diagnosis
-        final_disease = diagnosis["final_diagnosis"]
-        final_name = get_disease_display_name(final_disease)
-        confidence = diagnosis["confidence"]
-        status = diagnosis["status"]
-        
-        status_emoji = {
-            "CONFIRMED": "✅",
-            "EARLY_WARNING": "⚠️",
-            "NEEDS_REVIEW": "🔍",
-            "LOW_CONFIDENCE": "❓",
-            "UNCERTAIN": "❓"
-        }
-        
-        report.append(f"{status_emoji.get(status, '•')} DIAGNOSIS: {final_name}")
-        report.append(f"   Confidence: {confidence:.1f}%")
-        report.append(f"   Status: {status}")
-        report.append("")
-        
-        # Vision predictions
-        if diagnosis["vision_predictions"]:
-            report.append("📷 VISION ANALYSIS:")
-            for pred in diagnosis["vision_predictions"][:3]:
-                report.append(f"   • {pred['display_name']}: {pred['confidence']:.1f}%")
-            report.append("")
-        
-        # Sensor predictions
-        if diagnosis["sensor_predictions"]:
-            report.append("📊 SENSOR ANALYSIS:")
-            for pred in diagnosis["sensor_predictions"][:3]:
-                report.append(f"   • {pred['display_name']}: {pred['risk_score']:.1f}% risk")
-            report.append("")
-        
-        # Confirmed cases
-        if diagnosis["confirmed"]:
-            report.append("✅ CONFIRMED DIAGNOSIS:")
-            for item in diagnosis["confirmed"]:
-                report.append(f"   Disease: {item['display_name']}")
-                report.append(f"   {item['validation']}")
-                report.append(f"   Root Cause: {item['root_cause']}")
-                report.append("")
-                report.append("   🛠️ CORRECTIVE ACTIONS:")
-                for action in item['corrective_actions']:
-                    report.append(f"      → {action}")
-            report.append("")
-        
-        # Early warnings
-        if diagnosis["early_warnings"]:
-            report.append("⚠️ EARLY WARNINGS:")
-            for item in diagnosis["early_warnings"]:
-                report.append(f"   {item['alert']}")
-                report.append(f"   Risk Score: {item['risk_score']:.1f}%")
-                report.append("")
-                report.append("   🛡️ PREVENTIVE ACTIONS:")
-                for action in item['corrective_actions']:
-                    report.append(f"      → {action}")
-            report.append("")
-        
-        # Conflicts
-        if diagnosis["conflicts"]:
-            report.append("🔍 CONFLICTS DETECTED:")
-            for item in diagnosis["conflicts"]:
-                report.append(f"   Vision: {item['vision_display']} ({item['vision_confidence']:.1f}%)")
-                report.append(f"   Sensor: {item['sensor_display']} ({item['sensor_risk']:.1f}%)")
-                report.append(f"   {item['alert']}")
-                report.append("")
-                report.append("   Possible causes:")
-                for cause in item['possible_causes']:
-                    report.append(f"      • {cause}")
-            report.append("")
-        
-        report.append("="*60)
-        
-        return "\n".join(report)
\ No newline at end of file
+        return render_report(diagnosis)
@@ -0,0 +1,421 @@
+"""
+FarmOG Station - Columnar History Store
+=======================================
+Append-only storage for sensor readings, risk vectors and compact diagnoses.
+
+Layout (one raw NumPy structured-array segment per station per UTC day):
+
+    root/
+        schema.json                       disease order and record dtypes
+        labels.json                       class names referenced by diagnoses
+        readings/<station>/<YYYY-MM-DD>.bin
+        risks/<station>/<YYYY-MM-DD>.bin
+        diagnoses/<station>/<YYYY-MM-DD>.bin
+
+Segments are plain fixed-width records, so appends are a file write and scans
+are np.memmap plus a binary search on the timestamp column: no parsing and no
+per-row dicts. Columns of a scan feed calculate_disease_risk_batch and
+cross_validate_batch directly.
+
+Segments carry no header, so schema.json records the disease column order and
+the record dtypes the store was written with. Opening a store whose schema
+differs from this build's (e.g. a disease added to the signature table)
+raises instead of reading old segments with the wrong stride and columns.
+
+Readings and risks are float64 like the live scorers, so rescoring stored
+history reproduces the live risks exactly (float32 shifted scores enough to
+flip the strict > 60 / > 70 warning thresholds).
+
+Record sizes: reading 41 bytes, risk vector 8 + 8 per disease, diagnosis 15
+bytes. A season (180 days) of 15-minute readings from 300 stations is about
+5.2M readings, ~215 MB.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.disease_siganture import SIGNATURE_TABLE, IRRIGATION_CODES
+
+READING_DTYPE = np.dtype([
+    ('timestamp', '<f8'),       # epoch seconds
+    ('air_temp', '<f8'),        # NaN = not reported
+    ('air_humidity', '<f8'),
+    ('soil_moisture', '<f8'),
+    ('rainfall_24h', '<f8'),
+    ('irrigation', 'i1'),       # IRRIGATION_CODES, -1 = unknown
+])
+
+RISK_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('risks', '<f8', (len(SIGNATURE_TABLE.diseases),)),  # SIGNATURE_TABLE.diseases order
+])
+
+DIAGNOSIS_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('status', 'i1'),           # DiagnosisStatus
+    ('final_index', '<i2'),     # index into HistoryStore.labels
+    ('confidence', '<f4'),
+])
+
+KINDS = {
+    'readings': READING_DTYPE,
+    'risks': RISK_DTYPE,
+    'diagnoses': DIAGNOSIS_DTYPE,
+}
+
+SEGMENT_SUFFIX = '.bin'
+SCHEMA_VERSION = 1
+
+def current_schema():
+    """Schema of segments written by this build, as stored in schema.json"""
+    schema = {
+        'version': SCHEMA_VERSION,
+        'diseases': list(SIGNATURE_TABLE.diseases),
+        'dtypes': {kind: dtype.descr for kind, dtype in KINDS.items()},
+    }
+    # Round-trip so tuples compare equal to the lists read back from JSON
+    return json.loads(json.dumps(schema))
+
+def day_of(timestamp):
+    """UTC day partition name of an epoch timestamp"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d')
+
+def _day_start(day):
+    return datetime.strptime(day, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()
+
+def reading_columns(readings):
+    """
+    Keyword arguments for calculate_disease_risk_batch from scanned readings
+
+    Args:
+        readings: READING_DTYPE array (e.g. from HistoryStore.scan_readings)
+
+    Returns:
+        dict: air_temp, air_humidity, soil_moisture, rainfall_24h, irrigation columns
+    """
+    return {
+        'air_temp': readings['air_temp'],
+        'air_humidity': readings['air_humidity'],
+        'soil_moisture': readings['soil_moisture'],
+        'rainfall_24h': readings['rainfall_24h'],
+        'irrigation': readings['irrigation'],
+    }
+
+class HistoryStore:
+    """
+    Append-only, time-partitioned columnar store.
+
+    Within a station, records of one kind must be appended in non-decreasing
+    timestamp order (scans rely on it for binary search). Safe for threads
+    sharing one HistoryStore; use one writer process per root.
+    """
+
+    def __init__(self, root):
+        """
+        Args:
+            root: directory for the store (created if missing)
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._last_timestamp = {}
+        self._check_schema()
+
+        self._labels_path = os.path.join(root, 'labels.json')
+        if os.path.exists(self._labels_path):
+            with open(self._labels_path, 'r') as f:
+                self.labels = json.load(f)
+        else:
+            self.labels = list(SIGNATURE_TABLE.diseases)
+            self._save_labels()
+        self._label_index = {label: i for i, label in enumerate(self.labels)}
+
+    # Paths and labels -----------------------------------------------------------
+
+    def _station_dir(self, kind, station_id):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown record kind {kind!r}, expected one of {sorted(KINDS)}")
+        station = str(station_id)
+        if not station or os.sep in station or station.startswith('.'):
+            raise ValueError(f"Invalid station id {station_id!r}")
+        return os.path.join(self.root, kind, station)
+
+    def _check_schema(self):
+        """Write schema.json for a new store, or verify an existing one against this build"""
+        path = os.path.join(self.root, 'schema.json')
+        schema = current_schema()
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                stored = json.load(f)
+            if stored != schema:
+                changed = [key for key in schema if stored.get(key) != schema[key]]
+                raise ValueError(f"History store {self.root} was written with a different schema "
+                                 f"({', '.join(changed)} changed); migrate it or use a new root")
+            return
+        if any(self.stations(kind) for kind in KINDS):
+            raise ValueError(f"History store {self.root} has segments but no schema.json; "
+                             f"cannot verify its disease order and record layout")
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(schema, f, indent=1)
+        os.replace(tmp, path)
+
+    def _save_labels(self):
+        tmp = self._labels_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.labels, f, indent=1)
+        os.replace(tmp, self._labels_path)
+
+    def label_id(self, label):
+        """Stable integer id of a class name, registering new names"""
+        with self._lock:
+            index = self._label_index.get(label)
+            if index is None:
+                index = len(self.labels)
+                self.labels.append(label)
+                self._label_index[label] = index
+                self._save_labels()
+            return index
+
+    def stations(self, kind='readings'):
+        """
+        Returns:
+            list: station ids that have records of this kind
+        """
+        kind_dir = os.path.join(self.root, kind)
+        if not os.path.isdir(kind_dir):
+            return []
+        return sorted(os.listdir(kind_dir))
+
+    def segments(self, kind, station_id):
+        """
+        Returns:
+            list: segment day names (YYYY-MM-DD) for a station, oldest first
+        """
+        station_dir = self._station_dir(kind, station_id)
+        if not os.path.isdir(station_dir):
+            return []
+        return sorted(name[:-len(SEGMENT_SUFFIX)] for name in os.listdir(station_dir)
+                      if name.endswith(SEGMENT_SUFFIX))
+
+    # Appending --------------------------------------------------------------------
+
+    def _last_stored_timestamp(self, kind, station_id):
+        days = self.segments(kind, station_id)
+        if not days:
+            return -np.inf
+        segment = self._open_segment(kind, station_id, days[-1])
+        return float(segment['timestamp'][-1]) if len(segment) else -np.inf
+
+    def append(self, kind, station_id, records):
+        """
+        Append records of one kind, split into day segments
+
+        Args:
+            kind: 'readings', 'risks' or 'diagnoses'
+            station_id: station name
+            records: structured array of KINDS[kind], sorted by timestamp
+
+        Returns:
+            int: records written
+        """
+        records = np.asarray(records, dtype=KINDS[kind])
+        if len(records) == 0:
+            return 0
+        timestamps = records['timestamp']
+        if np.any(np.diff(timestamps) < 0):
+            raise ValueError("Records must be sorted by timestamp")
+
+        station_dir = self._station_dir(kind, station_id)
+        with self._lock:
+            key = (kind, str(station_id))
+            last = self._last_timestamp.get(key)
+            if last is None:
+                last = self._last_stored_timestamp(kind, station_id)
+            if timestamps[0] < last:
+                raise ValueError(f"Out-of-order append for {kind}/{station_id}: "
+                                 f"{timestamps[0]} is before stored {last}")
+
+            os.makedirs(station_dir, exist_ok=True)
+            first_day = day_of(timestamps[0])
+            if first_day == day_of(timestamps[-1]):
+                splits = [(first_day, records)]
+            else:
+                # Group by UTC day; timestamps are sorted so each day is a contiguous run
+                day_index = np.floor(timestamps / 86400.0).astype(np.int64)
+                bounds = np.flatnonzero(np.diff(day_index)) + 1
+                splits = [(day_of(chunk['timestamp'][0]), chunk) for chunk in np.split(records, bounds)]
+
+            for day, chunk in splits:
+                with open(os.path.join(station_dir, day + SEGMENT_SUFFIX), 'ab') as f:
+                    torn = f.tell() % chunk.dtype.itemsize
+                    if torn:
+                        # Drop a partial record left by an interrupted append
+                        f.truncate(f.tell() - torn)
+                    chunk.tofile(f)
+            self._last_timestamp[key] = float(timestamps[-1])
+        return len(records)
+
+    def append_readings(self, station_id, timestamps, air_temp=None, air_humidity=None,
+                        soil_moisture=None, rainfall_24h=None, irrigation=None):
+        """
+        Append columns of sensor readings (same columns as calculate_disease_risk_batch)
+
+        Args:
+            station_id: station name
+            timestamps: array-like (N,) epoch seconds, sorted
+            air_temp, air_humidity, soil_moisture, rainfall_24h: array-like (N,) or None (missing)
+            irrigation: array-like (N,) of IRRIGATION_CODES values or None
+
+        Returns:
+            int: records written
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        records = np.empty(len(timestamps), dtype=READING_DTYPE)
+        records['timestamp'] = timestamps
+        for name, column in (('air_temp', air_temp), ('air_humidity', air_humidity),
+                             ('soil_moisture', soil_moisture), ('rainfall_24h', rainfall_24h)):
+            records[name] = np.nan if column is None else column
+        records['irrigation'] = -1 if irrigation is None else irrigation
+        return self.append('readings', station_id, records)
+
+    def append_reading(self, station_id, timestamp, sensor_data):
+        """
+        Append one sensor_data dict (as passed to calculate_disease_risk)
+
+        Returns:
+            int: records written
+        """
+        def value(key):
+            v = sensor_data.get(key)
+            return None if v is None else [v]
+        method = sensor_data.get('irrigation_method')
+        return self.append_readings(
+            station_id, [timestamp],
+            air_temp=value('air_temp'), air_humidity=value('air_humidity'),
+            soil_moisture=value('soil_moisture'), rainfall_24h=value('rainfall_24h'),
+            irrigation=[IRRIGATION_CODES.get(method, -1)]
+        )
+
+    def append_risks(self, station_id, timestamps, risks):
+        """
+        Args:
+            risks: (N, n_diseases) matrix in SIGNATURE_TABLE.diseases order,
+                   e.g. from calculate_disease_risk_batch
+
+        Returns:
+            int: records written
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        records = np.empty(len(timestamps), dtype=RISK_DTYPE)
+        records['timestamp'] = timestamps
+        records['risks'] = risks
+        return self.append('risks', station_id, records)
+
+    def append_diagnoses(self, station_id, timestamps, batch):
+        """
+        Args:
+            batch: BatchDiagnosis from FarmOGFusionEngine.cross_validate_batch
+
+        Returns:
+            int: records written
+        """
+        label_ids = np.array([self.label_id(label) for label in batch.labels], dtype=np.int16)
+        final = np.asarray(batch.final_index)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        records = np.empty(len(timestamps), dtype=DIAGNOSIS_DTYPE)
+        records['timestamp'] = timestamps
+        records['status'] = batch.status
+        records['final_index'] = np.where(final >= 0, label_ids[np.maximum(final, 0)], -1)
+        records['confidence'] = batch.confidence
+        return self.append('diagnoses', station_id, records)
+
+    def append_diagnosis(self, station_id, timestamp, diagnosis):
+        """
+        Args:
+            diagnosis: Diagnosis from FarmOGFusionEngine.diagnose
+
+        Returns:
+            int: records written
+        """
+        records = np.empty(1, dtype=DIAGNOSIS_DTYPE)
+        records['timestamp'] = timestamp
+        records['status'] = diagnosis.status
+        records['final_index'] = self.label_id(diagnosis.final_diagnosis)
+        records['confidence'] = diagnosis.confidence
+        return self.append('diagnoses', station_id, records)
+
+    # Scanning -------------------------------------------------------------------------
+
+    def _open_segment(self, kind, station_id, day):
+        path = os.path.join(self._station_dir(kind, station_id), day + SEGMENT_SUFFIX)
+        dtype = KINDS[kind]
+        count = os.path.getsize(path) // dtype.itemsize
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        # Ignore a torn trailing record from an interrupted append
+        return np.memmap(path, dtype=dtype, mode='r', shape=(count,))
+
+    def scan(self, kind, station_id, start=None, end=None):
+        """
+        Records of one station with start <= timestamp < end
+
+        Args:
+            kind: 'readings', 'risks' or 'diagnoses'
+            station_id: station name
+            start, end: epoch seconds (None = unbounded)
+
+        Returns:
+            numpy structured array: a read-only memory-mapped view when the
+            range falls in one segment, otherwise a concatenated copy
+        """
+        lo = -np.inf if start is None else start
+        hi = np.inf if end is None else end
+        parts = []
+        for day in self.segments(kind, station_id):
+            day_start = _day_start(day)
+            if day_start >= hi or day_start + 86400 <= lo:
+                continue
+            segment = self._open_segment(kind, station_id, day)
+            ts = segment['timestamp']
+            i = np.searchsorted(ts, lo, side='left') if start is not None else 0
+            j = np.searchsorted(ts, hi, side='left') if end is not None else len(segment)
+            if j > i:
+                parts.append(segment[i:j])
+
+        if not parts:
+            return np.empty(0, dtype=KINDS[kind])
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts)
+
+    def scan_readings(self, station_id, start=None, end=None):
+        return self.scan('readings', station_id, start, end)
+
+    def scan_risks(self, station_id, start=None, end=None):
+        return self.scan('risks', station_id, start, end)
+
+    def scan_diagnoses(self, station_id, start=None, end=None):
+        return self.scan('diagnoses', station_id, start, end)
+
+    def score_readings(self, station_id, start=None, end=None):
+        """
+        Rescore stored readings with the batch risk scorer
+
+        Returns:
+            tuple: (timestamps (N,), risks (N, n_diseases) in SIGNATURE_TABLE.diseases order)
+        """
+        from src.sensor_matcher import calculate_disease_risk_batch
+        readings = self.scan_readings(station_id, start, end)
+        return readings['timestamp'], calculate_disease_risk_batch(**reading_columns(readings))
+
+    def diagnosis_labels(self, diagnoses):
+        """
+        Returns:
+            list: final diagnosis class name per scanned diagnosis record (None if unset)
+        """
+        return [self.labels[i] if i >= 0 else None for i in diagnoses['final_index'].tolist()]
@@ -0,0 +1,173 @@
+"""
+FarmOG Station - Parallel Image Loader
+======================================
+Decodes and preprocesses image folders on a thread pool into reusable batch
+buffers, prefetching a bounded number of batches so JPEG decoding overlaps
+with model inference.
+"""
+
+import os
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.preprocessing import ImagePreprocessor
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+ImageBatch = namedtuple('ImageBatch', [
+    'paths',    # list of image paths in batch order
+    'images',   # (N, H, W, 3) array, reused once the next batch is requested
+    'labels',   # list of labels (class folder names) or None per image
+])
+
+_DONE = object()
+
+def find_images(root, extensions=IMAGE_EXTENSIONS):
+    """
+    List images under a directory tree in flow_from_directory order
+
+    Class folders and files are sorted, so results are stable between runs.
+
+    Args:
+        root: dataset directory (one sub-folder per class) or a flat folder
+        extensions: accepted file extensions (lowercase)
+
+    Returns:
+        list of tuples: [(path, label), ...] where label is the class folder
+        name, or None for images directly under root
+    """
+    items = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        label = os.path.relpath(dirpath, root)
+        if label == os.curdir:
+            label = None
+        for filename in sorted(filenames):
+            if filename.lower().endswith(extensions):
+                items.append((os.path.join(dirpath, filename), label))
+    return items
+
+class ImageFolderLoader:
+    """
+    Iterator of preprocessed ImageBatch objects.
+
+    A background thread schedules decodes on a thread pool (PIL releases the
+    GIL while decoding and resizing) into one of `prefetch + 1` preallocated
+    batch buffers. A batch's `images` array stays valid until the next batch
+    is requested; copy it if it must live longer.
+
+    Unreadable images are skipped and recorded in `failed`.
+    """
+
+    def __init__(self, sources, profile='resnet50v2', batch_size=32, workers=None, prefetch=2,
+                 dtype=np.float32):
+        """
+        Args:
+            sources: directory path, or list of paths / (path, label) tuples
+            profile: preprocessing profile, see src.preprocessing.PROFILES
+            batch_size: images per batch
+            workers: decode threads (default: CPU count)
+            prefetch: batches decoded ahead of the consumer
+            dtype: np.float32 for model input, np.uint8 for raw pixels
+        """
+        if isinstance(sources, (str, os.PathLike)):
+            items = find_images(sources)
+        else:
+            items = [s if isinstance(s, tuple) else (s, None) for s in sources]
+        self.items = items
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.failed = []
+
+        self._buffers = [ImagePreprocessor(profile, batch_size, dtype) for _ in range(prefetch + 1)]
+        self._free = queue.Queue()
+        for preprocessor in self._buffers:
+            self._free.put(preprocessor)
+        self._ready = queue.Queue()
+        self._held = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        """Number of batches"""
+        return (len(self.items) + self.batch_size - 1) // self.batch_size
+
+    def _decode(self, preprocessor, index, path):
+        try:
+            preprocessor.preprocess_at(index, path)
+            return None
+        except Exception as e:
+            return e
+
+    def _produce(self):
+        end = _DONE
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="farmog-decode") as pool:
+                for start in range(0, len(self.items), self.batch_size):
+                    chunk = self.items[start:start + self.batch_size]
+                    preprocessor = self._free.get()
+                    if preprocessor is None or self._stop.is_set():
+                        return
+
+                    errors = list(pool.map(self._decode, [preprocessor] * len(chunk), range(len(chunk)),
+                                           [path for path, _ in chunk]))
+                    images = preprocessor.buffer[:len(chunk)]
+                    if any(errors):
+                        ok = [i for i, e in enumerate(errors) if e is None]
+                        self.failed.extend((chunk[i][0], e) for i, e in enumerate(errors) if e is not None)
+                        images[:len(ok)] = images[ok]
+                        images = images[:len(ok)]
+                        chunk = [chunk[i] for i in ok]
+
+                    batch = ImageBatch([path for path, _ in chunk], images, [label for _, label in chunk])
+                    self._ready.put((preprocessor, batch))
+        except BaseException as e:
+            end = e
+        finally:
+            # Always end the stream, or a consumer waiting in __next__ never wakes
+            self._ready.put((None, end))
+
+    def __iter__(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._produce, name="farmog-loader", daemon=True)
+            self._thread.start()
+        return self
+
+    def __next__(self):
+        self.__iter__()
+        self._release()
+        preprocessor, batch = self._ready.get()
+        if batch is _DONE or isinstance(batch, BaseException):
+            # Leave the end marker queued so later calls stop (or raise) again
+            self._ready.put((None, batch))
+            if batch is _DONE:
+                raise StopIteration
+            raise batch
+        self._held = preprocessor
+        return batch
+
+    def _release(self):
+        """Hand the consumer's previous buffer back to the producer"""
+        if self._held is not None:
+            self._free.put(self._held)
+            self._held = None
+
+    def close(self):
+        """Stop decoding ahead; safe to call more than once"""
+        self._release()
+        if not self._stop.is_set():
+            self._stop.set()
+            # Unblock a producer waiting for a free buffer
+            self._free.put(None)
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,235 @@
+"""
+FarmOG Station - Vision Inference Backends
+==========================================
+Pluggable model runtimes for the fusion engine: Keras, TFLite float and TFLite int8
+"""
+
+import numpy as np
+
+def _load_interpreter_class():
+    """Prefer the standalone tflite_runtime (no full TensorFlow) on edge devices"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+class KerasBackend:
+    """
+    Runs a Keras model (.h5 / SavedModel)
+    """
+    name = "keras"
+
+    def __init__(self, model=None, model_path=None, batch_size=32):
+        """
+        Args:
+            model: loaded Keras model (takes precedence over model_path)
+            model_path: path to load with tf.keras.models.load_model
+            batch_size: maximum images per forward pass
+        """
+        if model is None:
+            if model_path is None:
+                raise ValueError("KerasBackend needs a model or a model_path")
+            import tensorflow as tf
+            model = tf.keras.models.load_model(model_path)
+        self.model = model
+        self.batch_size = batch_size
+
+    def predict(self, batch):
+        """
+        Args:
+            batch: (N, H, W, 3) preprocessed float array
+
+        Returns:
+            numpy array: (N, num_classes) class probabilities
+        """
+        batch = np.asarray(batch, dtype=np.float32)
+
+        # predict_on_batch skips the per-call data adapter setup of predict()
+        run = getattr(self.model, 'predict_on_batch', None)
+        outputs = []
+        for start in range(0, len(batch), self.batch_size):
+            chunk = batch[start:start + self.batch_size]
+            if run is not None:
+                outputs.append(np.asarray(run(chunk)))
+            else:
+                outputs.append(np.asarray(self.model.predict(chunk, verbose=0)))
+
+        if not outputs:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.concatenate(outputs)
+
+class TFLiteBackend:
+    """
+    Runs a .tflite flatbuffer with a single reusable interpreter.
+
+    Input and output buffers are allocated once. Full-integer models (int8/uint8
+    input) are handled transparently: float inputs are quantized with the input
+    tensor's scale/zero-point and outputs are dequantized back to probabilities.
+    """
+    name = "tflite"
+
+    def __init__(self, model_path=None, model_content=None, num_threads=None, batch_size=1):
+        """
+        Args:
+            model_path: path to .tflite file (memory-mapped by the interpreter)
+            model_content: flatbuffer bytes, alternative to model_path
+            num_threads: interpreter CPU threads (None = runtime default)
+            batch_size: images per invoke; only used if the model has a dynamic batch dim
+        """
+        Interpreter = _load_interpreter_class()
+        self.interpreter = Interpreter(
+            model_path=model_path,
+            model_content=model_content,
+            num_threads=num_threads
+        )
+
+        input_details = self.interpreter.get_input_details()[0]
+        self._input_index = input_details['index']
+
+        # Resize once to the requested batch if the batch dimension is dynamic
+        signature = input_details.get('shape_signature', input_details['shape'])
+        if batch_size > 1 and signature[0] == -1:
+            shape = [batch_size] + list(input_details['shape'][1:])
+            self.interpreter.resize_tensor_input(self._input_index, shape)
+        self.interpreter.allocate_tensors()
+
+        input_details = self.interpreter.get_input_details()[0]
+        output_details = self.interpreter.get_output_details()[0]
+        self._output_index = output_details['index']
+
+        self.input_shape = tuple(input_details['shape'])
+        self.input_dtype = input_details['dtype']
+        self.batch_size = self.input_shape[0]
+        self.num_classes = int(output_details['shape'][-1])
+
+        self.quantized = self.input_dtype in (np.int8, np.uint8)
+        self._input_scale, self._input_zero_point = input_details['quantization']
+        self._output_scale, self._output_zero_point = output_details['quantization']
+        self._output_quantized = output_details['dtype'] in (np.int8, np.uint8)
+
+        # Preallocated buffers reused on every invoke
+        self._input = np.zeros(self.input_shape, dtype=self.input_dtype)
+        if self.quantized:
+            info = np.iinfo(self.input_dtype)
+            self._qmin, self._qmax = info.min, info.max
+            self._scratch = np.zeros(self.input_shape, dtype=np.float32)
+
+    def _fill_input(self, chunk):
+        k = len(chunk)
+        if not self.quantized:
+            np.copyto(self._input[:k], chunk, casting='unsafe')
+            return
+        scratch = self._scratch[:k]
+        np.divide(chunk, self._input_scale, out=scratch)
+        scratch += self._input_zero_point
+        np.rint(scratch, out=scratch)
+        np.clip(scratch, self._qmin, self._qmax, out=scratch)
+        np.copyto(self._input[:k], scratch, casting='unsafe')
+
+    def predict(self, batch):
+        """
+        Args:
+            batch: (N, H, W, 3) preprocessed float array
+
+        Returns:
+            numpy array: (N, num_classes) float32 class probabilities
+        """
+        batch = np.asarray(batch)
+        n = len(batch)
+        results = np.empty((n, self.num_classes), dtype=np.float32)
+
+        for start in range(0, n, self.batch_size):
+            chunk = batch[start:start + self.batch_size]
+            k = len(chunk)
+            self._fill_input(chunk)
+            self.interpreter.set_tensor(self._input_index, self._input)
+            self.interpreter.invoke()
+
+            # tensor() returns a view into the interpreter arena; copy out before next invoke
+            out = results[start:start + k]
+            out[...] = self.interpreter.tensor(self._output_index)()[:k]
+            if self._output_quantized:
+                out -= self._output_zero_point
+                out *= self._output_scale
+
+        return results
+
+BACKENDS = {
+    'keras': 'Keras model (.h5)',
+    'tflite': 'TensorFlow Lite float model (.tflite)',
+    'tflite_int8': 'TensorFlow Lite full-integer quantized model (.tflite)'
+}
+
+def load_backend(kind, model_path, num_threads=None, batch_size=None):
+    """
+    Create an inference backend by name
+
+    Args:
+        kind: one of BACKENDS ('keras', 'tflite', 'tflite_int8')
+        model_path: path to the model file
+        num_threads: TFLite interpreter threads (ignored for Keras)
+        batch_size: images per forward pass (backend default if None)
+
+    Returns:
+        backend object with predict(batch) -> (N, num_classes) array
+    """
+    if kind == 'keras':
+        return KerasBackend(model_path=model_path, batch_size=batch_size or 32)
+
+    if kind in ('tflite', 'tflite_int8'):
+        backend = TFLiteBackend(model_path=model_path, num_threads=num_threads, batch_size=batch_size or 1)
+        if kind == 'tflite_int8' and not backend.quantized:
+            raise ValueError(f"{model_path} is not a full-integer quantized model")
+        backend.name = kind
+        return backend
+
+    raise ValueError(f"Unknown backend {kind!r}, expected one of {sorted(BACKENDS)}")
+
+def convert_to_tflite(keras_model, output_path, quantization=None, representative_images=None,
+                      num_calibration_samples=100):
+    """
+    Convert a Keras model to TFLite, optionally with int8 calibration
+
+    Args:
+        keras_model: loaded Keras model
+        output_path: where to write the .tflite file
+        quantization: None (float32), 'dynamic' (weights only) or 'int8' (full integer)
+        representative_images: iterable of preprocessed images, required for 'int8'
+        num_calibration_samples: number of representative images used for calibration
+
+    Returns:
+        int: size of the written model in bytes
+    """
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+
+    if quantization == 'dynamic':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    elif quantization == 'int8':
+        if representative_images is None:
+            raise ValueError("int8 quantization needs representative_images for calibration")
+
+        def representative_dataset():
+            for i, image in enumerate(representative_images):
+                if i >= num_calibration_samples:
+                    break
+                yield [np.expand_dims(np.asarray(image, dtype=np.float32), axis=0)]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+
+    elif quantization is not None:
+        raise ValueError(f"Unknown quantization {quantization!r}")
+
+    tflite_model = converter.convert()
+    with open(output_path, 'wb') as f:
+        f.write(tflite_model)
+
+    return len(tflite_model)
@@ -0,0 +1,232 @@
+"""
+FarmOG Station - Pipeline Instrumentation
+=========================================
+Per-stage timing histograms and diagnosis status counters for the fusion
+pipeline, readable from Python (snapshot) or as Prometheus text (prometheus_text).
+
+Disabled by default; enable with enable() or FARMOG_METRICS=1. While disabled
+a hook costs one global check, so the hooks stay in the station build.
+
+Stages recorded: decode, preprocess, model_forward, sensor_scoring,
+cross_validation, report_rendering. Counters: diagnosis_status and, in
+cascade mode, cascade_outcome (accepted / low_confidence / conflict), and
+sensor_gate (images deferred by the sensor-prior gate).
+"""
+
+import bisect
+import functools
+import os
+import threading
+import time
+
+# Histogram bucket upper bounds in seconds (100 µs .. 10 s)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Prometheus label name per counter
+COUNTER_LABELS = {'diagnosis_status': 'status', 'cascade_outcome': 'outcome', 'sensor_gate': 'outcome'}
+
+_enabled = os.environ.get('FARMOG_METRICS', '') not in ('', '0')
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+# Stages being timed on the current thread; a nested timer of the same stage
+# (e.g. per-row diagnose_risks inside cross_validate_batch) is not recorded
+_active = threading.local()
+
+def _active_stages():
+    stages = getattr(_active, 'stages', None)
+    if stages is None:
+        stages = _active.stages = set()
+    return stages
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+class Histogram:
+    """Fixed-bucket latency histogram (not thread-safe; guarded by the module lock)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding quantile q (0-1), None if empty"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+def observe(stage, seconds):
+    """Record one duration for a stage (no-op while disabled)"""
+    if not _enabled:
+        return
+    with _lock:
+        histogram = _histograms.get(stage)
+        if histogram is None:
+            histogram = _histograms[stage] = Histogram()
+        histogram.observe(seconds)
+
+def increment(counter, label, amount=1):
+    """Add to a labelled counter, e.g. increment('diagnosis_status', 'CONFIRMED')"""
+    if not _enabled:
+        return
+    with _lock:
+        values = _counters.setdefault(counter, {})
+        values[label] = values.get(label, 0) + amount
+
+def record_status(status):
+    """Count one diagnosis outcome (DiagnosisStatus)"""
+    if _enabled:
+        increment('diagnosis_status', status.name)
+
+def record_statuses(statuses):
+    """Count a batch of diagnosis outcomes (int array of DiagnosisStatus codes)"""
+    if not _enabled:
+        return
+    import numpy as np
+    from src.diagnosis import DiagnosisStatus
+    for code, n in enumerate(np.bincount(np.asarray(statuses), minlength=len(DiagnosisStatus))):
+        if n:
+            increment('diagnosis_status', DiagnosisStatus(code).name, int(n))
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class _StageTimer:
+    __slots__ = ('stage', 'start', 'nested')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        active = _active_stages()
+        self.nested = self.stage in active
+        if not self.nested:
+            active.add(self.stage)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if not self.nested:
+            _active_stages().discard(self.stage)
+            observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+def stage(name):
+    """
+    Context manager timing a block into the stage histogram
+
+        with stage('decode'):
+            ...
+
+    Only the outermost timer of a stage on a thread records; nested ones
+    with the same name are ignored so time is not counted twice.
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return _StageTimer(name)
+
+def timed(name):
+    """Decorator timing every call of a function into the stage histogram"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _StageTimer(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def reset():
+    """Drop all recorded timings and counts"""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+def snapshot():
+    """
+    Current metrics as plain Python data
+
+    Returns:
+        dict: {'enabled': bool,
+               'stages': {stage: {'count', 'sum_seconds', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'}},
+               'counters': {counter: {label: value}}}
+        Percentiles are bucket upper bounds.
+    """
+    def ms(value):
+        return None if value is None else value * 1000.0
+
+    with _lock:
+        stages = {
+            name: {
+                'count': h.count,
+                'sum_seconds': h.sum,
+                'mean_ms': h.sum / h.count * 1000.0 if h.count else 0.0,
+                'p50_ms': ms(h.quantile(0.50)),
+                'p95_ms': ms(h.quantile(0.95)),
+                'p99_ms': ms(h.quantile(0.99)),
+            }
+            for name, h in _histograms.items()
+        }
+        counters = {name: dict(values) for name, values in _counters.items()}
+    return {'enabled': _enabled, 'stages': stages, 'counters': counters}
+
+def prometheus_text(prefix='farmog'):
+    """
+    Metrics in the Prometheus text exposition format
+
+    Returns:
+        str: farmog_stage_seconds histogram and farmog_<counter>_total counters
+    """
+    lines = []
+    with _lock:
+        if _histograms:
+            lines.append(f"# HELP {prefix}_stage_seconds Time spent per diagnosis pipeline stage")
+            lines.append(f"# TYPE {prefix}_stage_seconds histogram")
+        for name in sorted(_histograms):
+            h = _histograms[name]
+            cumulative = 0
+            for bound, n in zip(h.buckets + (float('inf'),), h.counts):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {h.sum!r}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {h.count}')
+
+        for counter in sorted(_counters):
+            metric = f"{prefix}_{counter}_total"
+            lines.append(f"# TYPE {metric} counter")
+            label = COUNTER_LABELS.get(counter, 'label')
+            for value_label, value in sorted(_counters[counter].items()):
+                lines.append(f'{metric}{{{label}="{value_label}"}} {value}')
+    return "\n".join(lines) + "\n"
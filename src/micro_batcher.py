@@ -0,0 +1,142 @@
+"""
+FarmOG Station - Dynamic Micro-Batching
+=======================================
+Collects single-image requests from concurrent callers into one forward pass
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+_STOP = object()
+
+class MicroBatcher:
+    """
+    Background worker that groups image requests into batches.
+
+    A batch is run as soon as it holds max_batch_size images, or once the
+    oldest queued request has waited max_wait_ms, whichever comes first.
+    Each caller gets a Future resolving to its own class-probability dict.
+    """
+
+    def __init__(self, predict_batch_fn, max_batch_size=32, max_wait_ms=10):
+        """
+        Initialize and start the batching thread
+
+        Args:
+            predict_batch_fn: callable(list of images) -> list of result dicts
+            max_batch_size: maximum images per forward pass
+            max_wait_ms: maximum time a request waits for the batch to fill
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.predict_batch_fn = predict_batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self.batches_run = 0
+        self.images_processed = 0
+
+        self._queue = queue.Queue()
+        self._closed = False
+        # Serializes submit() against close() so nothing is queued after _STOP
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="farmog-micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, image):
+        """
+        Queue one preprocessed image
+
+        Returns:
+            concurrent.futures.Future: resolves to {class_name: confidence, ...}
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put((image, future))
+        return future
+
+    def predict(self, image, timeout=None):
+        """Blocking single-image predict through the shared batch queue"""
+        return self.submit(image).result(timeout=timeout)
+
+    @property
+    def mean_batch_size(self):
+        """Average number of images per forward pass so far"""
+        return self.images_processed / self.batches_run if self.batches_run else 0.0
+
+    def close(self, timeout=None):
+        """Stop accepting requests, finish queued ones and join the worker"""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _collect(self, first):
+        """Gather requests after `first` until the batch is full or the wait expires"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Put the sentinel back so the run loop exits after this batch
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+
+        return batch
+
+    def _fail_pending(self, exc):
+        """Fail requests still queued when the worker stops"""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(exc)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._fail_pending(RuntimeError("MicroBatcher is closed"))
+                return
+
+            # Drop requests whose callers cancelled while queued
+            live = [(img, f) for img, f in self._collect(item) if f.set_running_or_notify_cancel()]
+            if not live:
+                continue
+            images = [img for img, _ in live]
+            futures = [f for _, f in live]
+
+            try:
+                results = list(self.predict_batch_fn(images))
+                if len(results) != len(futures):
+                    raise ValueError(f"predict_batch_fn returned {len(results)} results "
+                                     f"for {len(futures)} images")
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.images_processed += len(images)
+            for future, result in zip(futures, results):
+                future.set_result(result)
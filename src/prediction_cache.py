@@ -0,0 +1,201 @@
+"""
+FarmOG Station - Prediction Cache
+=================================
+Content-addressed cache of vision predictions: an in-memory LRU in front of
+an optional SQLite file with size-based eviction.
+
+Keys hash the image content together with the model and backbone version, so
+a retrained or swapped model never serves stale predictions.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+def content_hash(data):
+    """
+    Hash raw image bytes or a NumPy array
+
+    Args:
+        data: bytes-like object, or array (dtype and shape are part of the hash)
+
+    Returns:
+        str: hex digest
+    """
+    h = hashlib.blake2b(digest_size=20)
+    if hasattr(data, 'dtype'):
+        import numpy as np
+        data = np.ascontiguousarray(data)
+        h.update(f"{data.dtype.str}{data.shape}".encode())
+    h.update(memoryview(data).cast('B'))
+    return h.hexdigest()
+
+def prediction_key(digest, model_version, backbone):
+    """Cache key for one image under one model and preprocessing profile"""
+    return f"{model_version}|{backbone}|{digest}"
+
+def model_version_for(model_path, backend):
+    """
+    Version string of a model file: backend, name, size and modification time
+
+    Returns:
+        str: changes whenever the file is replaced
+    """
+    try:
+        stat = os.stat(model_path)
+        return f"{backend}:{os.path.basename(model_path)}:{stat.st_size}:{int(stat.st_mtime)}"
+    except (OSError, TypeError):
+        return f"{backend}:{model_path}"
+
+class PredictionCache:
+    """
+    Two-tier prediction cache, safe to share between threads.
+
+    Values are {class_name: confidence} dicts; get() returns a copy so callers
+    may modify it.
+    """
+
+    def __init__(self, max_entries=256, db_path=None, max_db_bytes=64 * 1024 * 1024):
+        """
+        Args:
+            max_entries: predictions kept in memory
+            db_path: SQLite file for the on-disk tier (None = memory only)
+            max_db_bytes: stored prediction bytes before least recently used rows are evicted
+        """
+        self.max_entries = max_entries
+        self.max_db_bytes = max_db_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db = None
+        self._db_bytes = 0
+        if db_path is not None:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS predictions_last_used ON predictions (last_used)")
+            self._db.commit()
+            self._db_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM predictions").fetchone()[0]
+
+    def __len__(self):
+        return len(self._memory)
+
+    def _remember(self, key, predictions):
+        self._memory[key] = predictions
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Returns:
+            dict: cached {class_name: confidence}, or None on a miss
+        """
+        with self._lock:
+            predictions = self._memory.get(key)
+            if predictions is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return dict(predictions)
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM predictions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE predictions SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    predictions = json.loads(row[0])
+                    self._remember(key, predictions)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return dict(predictions)
+
+            self.misses += 1
+            return None
+
+    def put(self, key, predictions):
+        """Store predictions in memory and, if enabled, on disk"""
+        with self._lock:
+            self._remember(key, dict(predictions))
+            if self._db is None:
+                return
+
+            value = json.dumps(predictions, separators=(',', ':')).encode()
+            row = self._db.execute("SELECT size FROM predictions WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO predictions (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time())
+            )
+            self._db_bytes += len(value) - (row[0] if row else 0)
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least recently used rows until the disk tier fits max_db_bytes"""
+        while self._db_bytes > self.max_db_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM predictions ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._db_bytes = 0
+                return
+            for key, size in rows:
+                self._db.execute("DELETE FROM predictions WHERE key = ?", (key,))
+                self._db_bytes -= size
+                self.evictions += 1
+                if self._db_bytes <= self.max_db_bytes:
+                    return
+
+    def get_or_compute(self, key, compute):
+        """
+        Cached predictions for `key`, calling compute() on a miss
+
+        Returns:
+            dict: {class_name: confidence}
+        """
+        predictions = self.get(key)
+        if predictions is None:
+            predictions = compute()
+            self.put(key, predictions)
+        return predictions
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, disk_hits, misses, hit_rate, evictions, memory_entries, disk_bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'memory_entries': len(self._memory),
+                'disk_bytes': self._db_bytes,
+            }
+
+    def clear(self):
+        """Drop every cached prediction (both tiers)"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions")
+                self._db.commit()
+                self._db_bytes = 0
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,178 @@
+"""
+FarmOG Station - Image Preprocessing
+====================================
+One preprocessing path for the app, notebooks, utils and bulk loaders.
+
+Images are decoded with JPEG draft-mode downscaling, converted to RGB,
+resized like Keras `load_img` (nearest, as in the training generators) and
+normalized in place into preallocated float32 buffers.
+"""
+
+import io
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image
+
+from src.instrumentation import stage
+
+PreprocessProfile = namedtuple('PreprocessProfile', [
+    'name',
+    'size',      # (width, height) model input
+    'divisor',   # pixel / divisor + offset, None = raw 0-255 floats
+    'offset',
+])
+
+PROFILES = {
+    # keras.applications.resnet_v2 / mobilenet_v2 preprocess_input ('tf' mode): [-1, 1]
+    'resnet50v2': PreprocessProfile('resnet50v2', (224, 224), 127.5, -1.0),
+    'mobilenetv2': PreprocessProfile('mobilenetv2', (224, 224), 127.5, -1.0),
+    # keras.applications.efficientnet rescales inside the model: raw 0-255
+    'efficientnetb0': PreprocessProfile('efficientnetb0', (224, 224), None, 0.0),
+    # Plain 0-1 scaling
+    'unit': PreprocessProfile('unit', (224, 224), 255.0, 0.0),
+}
+
+# Matches keras.utils.load_img(interpolation='nearest') used by flow_from_directory
+RESAMPLE = Image.NEAREST
+
+def get_profile(profile):
+    """Look up a profile by name (profiles pass through)"""
+    if isinstance(profile, PreprocessProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown preprocessing profile {profile!r}, expected one of {sorted(PROFILES)}")
+
+def load_resized(source, size=(224, 224)):
+    """
+    Decode an image and resize it to the model input size
+
+    Args:
+        source: path, bytes, file-like object or PIL image
+        size: (width, height)
+
+    Returns:
+        PIL.Image: RGB image of exactly `size`
+    """
+    if isinstance(source, Image.Image):
+        img = source
+    else:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        img = Image.open(source)
+        # Let libjpeg decode at 1/2, 1/4 or 1/8 scale when the photo is much larger
+        if img.format == 'JPEG':
+            img.draft('RGB', size)
+
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    if img.size != tuple(size):
+        img = img.resize(size, RESAMPLE)
+    return img
+
+def normalize(pixels, profile, out=None):
+    """
+    Normalize uint8 pixels for a backbone, writing into `out`
+
+    Matches the Keras preprocess_input float32 arithmetic exactly.
+
+    Args:
+        pixels: uint8 array (..., H, W, 3)
+        profile: profile name or PreprocessProfile
+        out: float32 array of the same shape (allocated if None)
+
+    Returns:
+        numpy array: `out`
+    """
+    profile = get_profile(profile)
+    if out is None:
+        out = np.empty(np.shape(pixels), dtype=np.float32)
+
+    if profile.divisor is None:
+        np.copyto(out, pixels, casting='unsafe')
+    else:
+        np.divide(pixels, np.float32(profile.divisor), out=out, dtype=np.float32)
+    if profile.offset:
+        out += np.float32(profile.offset)
+    return out
+
+class ImagePreprocessor:
+    """
+    Reusable preprocessor with a preallocated batch buffer.
+
+    Returned arrays are views into that buffer and are overwritten by the next
+    call; copy them if they must outlive it. Not thread-safe: use one per thread.
+    """
+
+    def __init__(self, profile='resnet50v2', batch_size=1, dtype=np.float32):
+        """
+        Args:
+            profile: profile name or PreprocessProfile
+            batch_size: images the buffer holds
+            dtype: np.float32 for normalized input, np.uint8 for raw pixels
+                   (e.g. decode once and normalize per backbone later)
+        """
+        self.profile = get_profile(profile)
+        self.dtype = np.dtype(dtype)
+        width, height = self.profile.size
+        self.buffer = np.empty((batch_size, height, width, 3), dtype=self.dtype)
+
+    def preprocess_at(self, index, source):
+        """
+        Preprocess one image into slot `index` of the buffer
+
+        Different slots may be filled from different threads at once.
+
+        Returns:
+            numpy array: (H, W, 3) view of that slot
+        """
+        out = self.buffer[index]
+        with stage('decode'):
+            pixels = np.asarray(load_resized(source, self.profile.size))
+        with stage('preprocess'):
+            if self.dtype == np.uint8:
+                np.copyto(out, pixels)
+            else:
+                normalize(pixels, self.profile, out=out)
+        return out
+
+    def preprocess(self, source):
+        """
+        Args:
+            source: path, bytes, file-like object or PIL image
+
+        Returns:
+            numpy array: (H, W, 3) view into the buffer
+        """
+        return self.preprocess_at(0, source)
+
+    def preprocess_batch(self, sources):
+        """
+        Args:
+            sources: up to batch_size paths / bytes / file-likes / PIL images
+
+        Returns:
+            numpy array: (N, H, W, 3) view into the buffer
+        """
+        if len(sources) > len(self.buffer):
+            raise ValueError(f"Batch of {len(sources)} exceeds buffer size {len(self.buffer)}")
+        for i, source in enumerate(sources):
+            self.preprocess_at(i, source)
+        return self.buffer[:len(sources)]
+
+def preprocess_image(source, profile='resnet50v2'):
+    """
+    Preprocess one image into a new float32 array
+
+    Args:
+        source: path, bytes, file-like object or PIL image
+        profile: profile name or PreprocessProfile
+
+    Returns:
+        numpy array: (H, W, 3) float32 model input
+    """
+    profile = get_profile(profile)
+    pixels = np.asarray(load_resized(source, profile.size))
+    return normalize(pixels, profile)
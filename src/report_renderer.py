@@ -0,0 +1,354 @@
+"""
+FarmOG Station - Report Rendering
+=================================
+Text reports for diagnoses with the static per-disease sections (display
+names, alerts, root causes, corrective actions) rendered once and cached,
+a streaming batch mode for nightly digests, and compact encodings sized for
+LoRa payloads.
+
+render_report() output is identical to the original generate_report.
+"""
+
+import struct
+from functools import lru_cache
+
+from src.disease_siganture import DISEASE_SIGNATURES, SIGNATURE_TABLE, get_disease_display_name
+from src.diagnosis import (
+    Diagnosis, DiagnosisStatus, SENSOR_REPORT_MIN_RISK, CONFLICT_CAUSES
+)
+
+RULE = "=" * 60
+
+STATUS_EMOJI = {
+    "CONFIRMED": "✅",
+    "EARLY_WARNING": "⚠️",
+    "NEEDS_REVIEW": "🔍",
+    "LOW_CONFIDENCE": "❓",
+    "UNCERTAIN": "❓"
+}
+
+HEADER = "\n".join([RULE, "🌱 FARMOG STATION - DIAGNOSIS REPORT", RULE, ""])
+
+CONFLICT_ALERT = "⚠️ Vision and sensor predictions disagree - manual review recommended"
+CONFLICT_TAIL = "\n".join(
+    [f"   {CONFLICT_ALERT}", "", "   Possible causes:"] +
+    [f"      • {cause}" for cause in CONFLICT_CAUSES]
+)
+
+# =============================================================================
+# Cached static sections
+# =============================================================================
+
+@lru_cache(maxsize=None)
+def _display_name(disease):
+    return get_disease_display_name(disease)
+
+@lru_cache(maxsize=None)
+def _confirmed_section(disease):
+    """Everything a confirmed case prints; none of it depends on the scores"""
+    signature = DISEASE_SIGNATURES[disease]
+    lines = [
+        f"   Disease: {_display_name(disease)}",
+        "   ✅ Vision + Sensor Agreement",
+        f"   Root Cause: {signature['root_cause']}",
+        "",
+        "   🛠️ CORRECTIVE ACTIONS:",
+    ]
+    lines += [f"      → {action}" for action in signature['corrective_actions']]
+    return "\n".join(lines)
+
+@lru_cache(maxsize=None)
+def _warning_alert(disease):
+    name = _display_name(disease)
+    return f"   ⚠️ Conditions favor {name} - symptoms may appear in 24-48h"
+
+@lru_cache(maxsize=None)
+def _warning_actions(disease):
+    lines = ["", "   🛡️ PREVENTIVE ACTIONS:"]
+    lines += [f"      → {action}" for action in DISEASE_SIGNATURES[disease]['corrective_actions']]
+    return "\n".join(lines)
+
+def clear_cache():
+    """Forget cached sections, e.g. after editing DISEASE_SIGNATURES at runtime"""
+    for cached in (_display_name, _confirmed_section, _warning_alert, _warning_actions):
+        cached.cache_clear()
+
+# =============================================================================
+# Text reports
+# =============================================================================
+
+def _render_compact(diagnosis):
+    """Render a Diagnosis straight from its tuples, without expanding dicts"""
+    status = diagnosis.status.name
+    out = [
+        HEADER,
+        f"{STATUS_EMOJI.get(status, '•')} DIAGNOSIS: {_display_name(diagnosis.final_diagnosis)}",
+        f"   Confidence: {diagnosis.confidence:.1f}%",
+        f"   Status: {status}",
+        "",
+    ]
+
+    if diagnosis.vision:
+        out.append("📷 VISION ANALYSIS:")
+        for disease, confidence in diagnosis.vision[:3]:
+            out.append(f"   • {_display_name(disease)}: {confidence * 100:.1f}%")
+        out.append("")
+
+    sensors = [(d, r) for d, r in diagnosis.sensors if r > SENSOR_REPORT_MIN_RISK][:3]
+    if sensors:
+        out.append("📊 SENSOR ANALYSIS:")
+        for disease, risk in sensors:
+            out.append(f"   • {_display_name(disease)}: {risk:.1f}% risk")
+        out.append("")
+
+    if diagnosis.confirmed:
+        out.append("✅ CONFIRMED DIAGNOSIS:")
+        for disease, _, _, _ in diagnosis.confirmed:
+            out.append(_confirmed_section(disease))
+        out.append("")
+
+    if diagnosis.warnings:
+        out.append("⚠️ EARLY WARNINGS:")
+        for disease, risk in diagnosis.warnings:
+            out.append(_warning_alert(disease))
+            out.append(f"   Risk Score: {risk:.1f}%")
+            out.append(_warning_actions(disease))
+        out.append("")
+
+    if diagnosis.conflict is not None:
+        vision_disease, vision_conf, sensor_disease, sensor_risk = diagnosis.conflict
+        out.append("🔍 CONFLICTS DETECTED:")
+        out.append(f"   Vision: {_display_name(vision_disease)} ({vision_conf * 100:.1f}%)")
+        out.append(f"   Sensor: {_display_name(sensor_disease)} ({sensor_risk:.1f}%)")
+        out.append(CONFLICT_TAIL)
+        out.append("")
+
+    out.append(RULE)
+    return "\n".join(out)
+
+def _render_dict(diagnosis):
+    """Render a legacy diagnosis dict (or any mapping with the same keys)"""
+    status = diagnosis["status"]
+    out = [
+        HEADER,
+        f"{STATUS_EMOJI.get(status, '•')} DIAGNOSIS: {get_disease_display_name(diagnosis['final_diagnosis'])}",
+        f"   Confidence: {diagnosis['confidence']:.1f}%",
+        f"   Status: {status}",
+        "",
+    ]
+
+    if diagnosis["vision_predictions"]:
+        out.append("📷 VISION ANALYSIS:")
+        for pred in diagnosis["vision_predictions"][:3]:
+            out.append(f"   • {pred['display_name']}: {pred['confidence']:.1f}%")
+        out.append("")
+
+    if diagnosis["sensor_predictions"]:
+        out.append("📊 SENSOR ANALYSIS:")
+        for pred in diagnosis["sensor_predictions"][:3]:
+            out.append(f"   • {pred['display_name']}: {pred['risk_score']:.1f}% risk")
+        out.append("")
+
+    if diagnosis["confirmed"]:
+        out.append("✅ CONFIRMED DIAGNOSIS:")
+        for item in diagnosis["confirmed"]:
+            out.append(f"   Disease: {item['display_name']}")
+            out.append(f"   {item['validation']}")
+            out.append(f"   Root Cause: {item['root_cause']}")
+            out.append("")
+            out.append("   🛠️ CORRECTIVE ACTIONS:")
+            out.extend(f"      → {action}" for action in item['corrective_actions'])
+        out.append("")
+
+    if diagnosis["early_warnings"]:
+        out.append("⚠️ EARLY WARNINGS:")
+        for item in diagnosis["early_warnings"]:
+            out.append(f"   {item['alert']}")
+            out.append(f"   Risk Score: {item['risk_score']:.1f}%")
+            out.append("")
+            out.append("   🛡️ PREVENTIVE ACTIONS:")
+            out.extend(f"      → {action}" for action in item['corrective_actions'])
+        out.append("")
+
+    if diagnosis["conflicts"]:
+        out.append("🔍 CONFLICTS DETECTED:")
+        for item in diagnosis["conflicts"]:
+            out.append(f"   Vision: {item['vision_display']} ({item['vision_confidence']:.1f}%)")
+            out.append(f"   Sensor: {item['sensor_display']} ({item['sensor_risk']:.1f}%)")
+            out.append(f"   {item['alert']}")
+            out.append("")
+            out.append("   Possible causes:")
+            out.extend(f"      • {cause}" for cause in item['possible_causes'])
+        out.append("")
+
+    out.append(RULE)
+    return "\n".join(out)
+
+def render_report(diagnosis):
+    """
+    Generate human-readable report from diagnosis
+
+    Args:
+        diagnosis: Diagnosis (fast path) or legacy diagnosis dict
+
+    Returns:
+        str: formatted report
+    """
+    if isinstance(diagnosis, Diagnosis):
+        return _render_compact(diagnosis)
+    return _render_dict(diagnosis)
+
+def render_many(diagnoses, out, separator="\n\n", chunk_size=64):
+    """
+    Stream reports for many diagnoses to a text file or socket
+
+    Reports are written in chunks so thousands of plots cost few write calls.
+
+    Args:
+        diagnoses: iterable of Diagnosis or legacy dicts
+        out: object with write(str) (file, StringIO, sys.stdout) or a socket (sendall)
+        separator: text written after each report
+        chunk_size: reports per write
+
+    Returns:
+        int: reports written
+    """
+    if hasattr(out, 'sendall'):
+        def write(text):
+            out.sendall(text.encode('utf-8'))
+    else:
+        write = out.write
+
+    count = 0
+    chunk = []
+    for diagnosis in diagnoses:
+        chunk.append(render_report(diagnosis))
+        chunk.append(separator)
+        count += 1
+        if len(chunk) >= 2 * chunk_size:
+            write("".join(chunk))
+            chunk = []
+    if chunk:
+        write("".join(chunk))
+    return count
+
+# =============================================================================
+# Compact encodings for LoRa
+# =============================================================================
+
+# Typical LoRaWAN payload ceiling at the slowest data rates (EU868 SF12)
+LORA_MAX_PAYLOAD = 51
+
+# Header: version, status, station id, timestamp (s), final class, confidence %, warning count
+_COMPACT_HEADER = struct.Struct('<BBHIBBB')
+_COMPACT_WARNING = struct.Struct('<BB')
+COMPACT_VERSION = 1
+UNKNOWN_CLASS = 255
+
+# Class codes are positions in SIGNATURE_TABLE.diseases
+CLASS_CODES = {disease: code for code, disease in enumerate(SIGNATURE_TABLE.diseases)}
+
+STATUS_CODES = {
+    DiagnosisStatus.UNKNOWN: "UNK",
+    DiagnosisStatus.CONFIRMED: "CONF",
+    DiagnosisStatus.EARLY_WARNING: "WARN",
+    DiagnosisStatus.NEEDS_REVIEW: "REVIEW",
+    DiagnosisStatus.LOW_CONFIDENCE: "LOW",
+    DiagnosisStatus.UNCERTAIN: "UNSURE",
+}
+
+def _percent_byte(value):
+    return max(0, min(100, int(round(value))))
+
+def encode_compact(diagnosis, station_id=0, timestamp=0, max_warnings=3):
+    """
+    Pack a Diagnosis into a few bytes
+
+    Layout (little endian): version u8, status u8, station u16, timestamp u32,
+    final class u8, confidence % u8, warning count u8, then per warning
+    class u8 + risk % u8. 11 bytes plus 2 per warning.
+
+    Args:
+        diagnosis: Diagnosis
+        station_id: 0-65535
+        timestamp: epoch seconds
+        max_warnings: early warnings included
+
+    Returns:
+        bytes
+    """
+    warnings = diagnosis.warnings[:max_warnings]
+    parts = [_COMPACT_HEADER.pack(
+        COMPACT_VERSION,
+        int(diagnosis.status),
+        station_id,
+        int(timestamp) & 0xFFFFFFFF,
+        CLASS_CODES.get(diagnosis.final_diagnosis, UNKNOWN_CLASS),
+        _percent_byte(diagnosis.confidence),
+        len(warnings),
+    )]
+    for disease, risk in warnings:
+        parts.append(_COMPACT_WARNING.pack(CLASS_CODES.get(disease, UNKNOWN_CLASS), _percent_byte(risk)))
+    return b"".join(parts)
+
+def decode_compact(data):
+    """
+    Unpack encode_compact() bytes
+
+    Returns:
+        dict: status, station_id, timestamp, final_diagnosis, confidence,
+              early_warnings [(disease, risk), ...]; unknown classes are None
+    """
+    version, status, station_id, timestamp, final, confidence, count = _COMPACT_HEADER.unpack_from(data)
+    if version != COMPACT_VERSION:
+        raise ValueError(f"Unsupported compact report version {version}")
+
+    def disease(code):
+        return SIGNATURE_TABLE.diseases[code] if code < len(SIGNATURE_TABLE.diseases) else None
+
+    warnings = []
+    for i in range(count):
+        code, risk = _COMPACT_WARNING.unpack_from(data, _COMPACT_HEADER.size + i * _COMPACT_WARNING.size)
+        warnings.append((disease(code), risk))
+    return {
+        'status': DiagnosisStatus(status).name,
+        'station_id': station_id,
+        'timestamp': timestamp,
+        'final_diagnosis': disease(final),
+        'confidence': confidence,
+        'early_warnings': warnings,
+    }
+
+def short_text(diagnosis, max_bytes=LORA_MAX_PAYLOAD):
+    """
+    One-line summary for SMS/LoRa text, e.g. "CONF Late Blight 88%; !Leaf Mold 72%"
+
+    Early warnings are appended while they fit in max_bytes (UTF-8).
+
+    Args:
+        diagnosis: Diagnosis or legacy diagnosis dict
+
+    Returns:
+        str: at most max_bytes when encoded as UTF-8
+    """
+    if isinstance(diagnosis, Diagnosis):
+        status = STATUS_CODES[diagnosis.status]
+        final, confidence, warnings = diagnosis.final_diagnosis, diagnosis.confidence, diagnosis.warnings
+    else:
+        status = STATUS_CODES[DiagnosisStatus[diagnosis["status"]]]
+        final, confidence = diagnosis["final_diagnosis"], diagnosis["confidence"]
+        warnings = [(w["disease"], w["risk_score"]) for w in diagnosis["early_warnings"]]
+
+    text = f"{status} {_display_name(final)} {confidence:.0f}%"
+    encoded = text.encode('utf-8')
+    if len(encoded) > max_bytes:
+        return encoded[:max_bytes].decode('utf-8', errors='ignore')
+
+    for disease, risk in warnings:
+        if disease == final:
+            continue
+        extra = f"; !{_display_name(disease)} {risk:.0f}%"
+        if len(text.encode('utf-8')) + len(extra.encode('utf-8')) > max_bytes:
+            break
+        text += extra
+    return text
@@ -0,0 +1,250 @@
+"""
+FarmOG Station - Memoized Sensor Risk Scoring
+=============================================
+Quantized-input LRU cache and precomputed lookup tables for sensor risk scores.
+
+Only humidity and temperature are continuous in the scoring rules. Soil
+moisture, irrigation and rainfall only matter through the band they fall in,
+so they are keyed by band and cost no precision. Readings are snapped to
+`resolution` (0.1 by default, the precision sensors report), and the snapped
+reading is scored exactly, so on-grid readings match get_all_disease_risks.
+"""
+
+import threading
+from collections import OrderedDict
+
+from src.disease_siganture import SIGNATURE_TABLE
+from src.sensor_matcher import SCORED_FEATURES, MOISTURE_LOW, MOISTURE_OPTIMAL, MOISTURE_HIGH
+from src.selection import top_k_items
+
+_, HUMIDITY_TERM = SCORED_FEATURES[0]
+_, TEMPERATURE_TERM = SCORED_FEATURES[1]
+_, MOISTURE_TERM = SCORED_FEATURES[2]
+_, IRRIGATION_TERM = SCORED_FEATURES[3]
+_, RAINFALL_TERM = SCORED_FEATURES[4]
+
+# Representative readings for each band; scoring them gives the band's terms
+MOISTURE_BAND_VALUES = {MOISTURE_LOW: 0.0, MOISTURE_OPTIMAL: 50.0, MOISTURE_HIGH: 100.0}
+RAINFALL_BAND_VALUES = {False: 0.0, True: 10.0}
+
+def moisture_band(moisture):
+    """Soil moisture band as scored by the signatures"""
+    if moisture > 70:
+        return MOISTURE_HIGH
+    if moisture >= 40:
+        return MOISTURE_OPTIMAL
+    if moisture < 40:
+        return MOISTURE_LOW
+    return None  # NaN matches no band
+
+def quantize(value, steps_per_unit):
+    """Grid index of a reading (round half to even)"""
+    return round(value * steps_per_unit)
+
+def _steps_per_unit(resolution):
+    steps = round(1 / resolution)
+    if steps <= 0 or abs(steps * resolution - 1) > 1e-9:
+        raise ValueError(f"resolution must be 1/n for a whole n, got {resolution}")
+    return steps
+
+def quantized_key(sensor_data, steps_per_unit):
+    """
+    Hashable key of a reading: grid indices for humidity and temperature,
+    bands for moisture, irrigation and rainfall (None = key not present or
+    NaN, which the scorers treat as missing)
+    """
+    humidity = sensor_data.get('air_humidity')
+    temp = sensor_data.get('air_temp')
+    moisture = sensor_data.get('soil_moisture')
+    rain = sensor_data.get('rainfall_24h')
+    return (
+        None if humidity is None or humidity != humidity else quantize(humidity, steps_per_unit),
+        None if temp is None or temp != temp else quantize(temp, steps_per_unit),
+        None if moisture is None else moisture_band(moisture),
+        sensor_data.get('irrigation_method') == 'overhead' if 'irrigation_method' in sensor_data else None,
+        None if rain is None or rain != rain else rain > 5,
+    )
+
+def _score_key(key, steps_per_unit):
+    """Risk vector (SIGNATURE_TABLE order) of a quantized key"""
+    humidity, temp, moisture, overhead, rainy = key
+    n = len(SIGNATURE_TABLE.diseases)
+    risks = []
+    for i in range(n):
+        risk = 0.0
+        if humidity is not None:
+            risk += HUMIDITY_TERM(i, humidity / steps_per_unit)
+        if temp is not None:
+            risk += TEMPERATURE_TERM(i, temp / steps_per_unit)
+        if moisture is not None:
+            risk += MOISTURE_TERM(i, MOISTURE_BAND_VALUES[moisture])
+        if overhead is not None:
+            risk += IRRIGATION_TERM(i, 'overhead' if overhead else 'drip')
+        if rainy is not None:
+            risk += RAINFALL_TERM(i, RAINFALL_BAND_VALUES[rainy])
+        risks.append(min(100.0, risk))
+    return tuple(risks)
+
+class CachedRiskScorer:
+    """
+    Drop-in for get_all_disease_risks / get_top_risks with a bounded LRU
+    of risk vectors keyed by the quantized reading. Safe to share between threads.
+    """
+
+    def __init__(self, resolution=0.1, max_entries=4096, lookup_table=None):
+        """
+        Args:
+            resolution: grid step for humidity (%) and temperature (°C), 1/n
+            max_entries: cached risk vectors
+            lookup_table: RiskLookupTable used to score misses (optional)
+        """
+        self.resolution = resolution
+        self.steps_per_unit = _steps_per_unit(resolution)
+        self.max_entries = max_entries
+        self.lookup_table = lookup_table
+        if lookup_table is not None and lookup_table.steps_per_unit != self.steps_per_unit:
+            raise ValueError("lookup_table resolution must match the cache resolution")
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def risk_vector(self, sensor_data):
+        """
+        Returns:
+            tuple: risk scores in SIGNATURE_TABLE.diseases order
+        """
+        key = quantized_key(sensor_data, self.steps_per_unit)
+        with self._lock:
+            risks = self._cache.get(key)
+            if risks is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return risks
+            self.misses += 1
+
+        if self.lookup_table is not None:
+            risks = self.lookup_table.score_key(key)
+        else:
+            risks = _score_key(key, self.steps_per_unit)
+
+        with self._lock:
+            self._cache[key] = risks
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return risks
+
+    def get_all_disease_risks(self, sensor_data):
+        """
+        Returns:
+            dict: {disease_name: risk_score}
+        """
+        return dict(zip(SIGNATURE_TABLE.diseases, self.risk_vector(sensor_data)))
+
+    def get_top_risks(self, sensor_data, top_n=3):
+        """
+        Returns:
+            list of tuples: [(disease_name, risk_score), ...]
+        """
+        return top_k_items(self.get_all_disease_risks(sensor_data), top_n)
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, misses, hit_rate, entries
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._cache),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+class RiskLookupTable:
+    """
+    Precomputed per-feature score terms for constant-time scoring.
+
+    The score is a sum of independent per-feature terms, so instead of a dense
+    temperature x humidity x disease cube (~5M floats at 0.1 resolution) the
+    table stores one row of terms per humidity step and per temperature step
+    (~15k floats), plus tiny band tables. A lookup is two list indexings and a
+    sum per disease. Readings outside the table range are scored directly.
+    Pure Python lists, so it also runs where NumPy is not available.
+    """
+
+    def __init__(self, resolution=0.1, temp_range=(0, 50), humidity_range=(0, 100)):
+        """
+        Args:
+            resolution: grid step for humidity (%) and temperature (°C), 1/n
+            temp_range: (min, max) °C covered by the table
+            humidity_range: (min, max) % covered by the table
+        """
+        self.resolution = resolution
+        self.steps_per_unit = steps = _steps_per_unit(resolution)
+        n = range(len(SIGNATURE_TABLE.diseases))
+
+        self._humidity_start = quantize(humidity_range[0], steps)
+        self._humidity_stop = quantize(humidity_range[1], steps)
+        self._temp_start = quantize(temp_range[0], steps)
+        self._temp_stop = quantize(temp_range[1], steps)
+
+        self.humidity = [
+            tuple(HUMIDITY_TERM(i, q / steps) for i in n)
+            for q in range(self._humidity_start, self._humidity_stop + 1)
+        ]
+        self.temperature = [
+            tuple(TEMPERATURE_TERM(i, q / steps) for i in n)
+            for q in range(self._temp_start, self._temp_stop + 1)
+        ]
+        self.moisture = {band: tuple(MOISTURE_TERM(i, value) for i in n)
+                         for band, value in MOISTURE_BAND_VALUES.items()}
+        self.irrigation = {overhead: tuple(IRRIGATION_TERM(i, 'overhead' if overhead else 'drip') for i in n)
+                           for overhead in (False, True)}
+        self.rainfall = {rainy: tuple(RAINFALL_TERM(i, value) for i in n)
+                         for rainy, value in RAINFALL_BAND_VALUES.items()}
+        self._zeros = tuple(0.0 for _ in n)
+
+    def _humidity_terms(self, q):
+        if q is None:
+            return self._zeros
+        if self._humidity_start <= q <= self._humidity_stop:
+            return self.humidity[q - self._humidity_start]
+        return tuple(HUMIDITY_TERM(i, q / self.steps_per_unit) for i in range(len(self._zeros)))
+
+    def _temperature_terms(self, q):
+        if q is None:
+            return self._zeros
+        if self._temp_start <= q <= self._temp_stop:
+            return self.temperature[q - self._temp_start]
+        return tuple(TEMPERATURE_TERM(i, q / self.steps_per_unit) for i in range(len(self._zeros)))
+
+    def score_key(self, key):
+        """Risk vector (SIGNATURE_TABLE order) of a quantized_key()"""
+        humidity, temp, moisture, overhead, rainy = key
+        h = self._humidity_terms(humidity)
+        t = self._temperature_terms(temp)
+        m = self._zeros if moisture is None else self.moisture[moisture]
+        irr = self._zeros if overhead is None else self.irrigation[overhead]
+        r = self._zeros if rainy is None else self.rainfall[rainy]
+        # Same summation order as calculate_disease_risk
+        return tuple(min(100.0, 0.0 + h[i] + t[i] + m[i] + irr[i] + r[i]) for i in range(len(h)))
+
+    def risk_vector(self, sensor_data):
+        """
+        Returns:
+            tuple: risk scores in SIGNATURE_TABLE.diseases order
+        """
+        return self.score_key(quantized_key(sensor_data, self.steps_per_unit))
+
+    def get_all_disease_risks(self, sensor_data):
+        """
+        Returns:
+            dict: {disease_name: risk_score}
+        """
+        return dict(zip(SIGNATURE_TABLE.diseases, self.risk_vector(sensor_data)))
@@ -0,0 +1,71 @@
+"""
+FarmOG Station - Top-K Selection
+================================
+Shared top-N primitives for the sensor matcher and the fusion engine
+"""
+
+import heapq
+from operator import itemgetter
+
+_by_score = itemgetter(1)
+
+# Below these sizes a plain sort beats heap/partition selection
+# (see benchmarks/bench_topk.py); results are identical either way.
+SMALL_DICT = 64
+SMALL_ROW = 32
+
+def top_k_items(scores, k, threshold=None):
+    """
+    Top k (name, score) pairs of a dict without sorting the whole dict
+    
+    Uses heapq.nlargest for large dicts, which returns exactly
+    sorted(..., reverse=True)[:k] including the order of ties (first
+    inserted wins); small dicts are simply sorted.
+    
+    Args:
+        scores: dict {name: score}
+        k: number of items to keep
+        threshold: if set, only scores >= threshold are considered
+    
+    Returns:
+        list of tuples: [(name, score), ...] highest first
+    """
+    items = scores.items()
+    if threshold is not None:
+        items = [item for item in items if item[1] >= threshold]
+    if len(items) <= SMALL_DICT:
+        return sorted(items, key=_by_score, reverse=True)[:k]
+    return heapq.nlargest(k, items, key=_by_score)
+
+def top_k_rows(matrix, k, stable=False):
+    """
+    Top k columns of every row of a score matrix
+    
+    For wide rows uses np.argpartition, so only the k selected columns per
+    row are sorted; ties at the k-th score may then be broken arbitrarily.
+    Narrow rows, or stable=True, use a full stable argsort where ties keep
+    column order (matching top_k_items).
+    
+    Args:
+        matrix: (N, C) array of scores
+        k: number of columns to keep per row
+        stable: break ties by lowest column index
+    
+    Returns:
+        tuple: (indices (N, k) int array, scores (N, k) array), highest first
+    """
+    import numpy as np
+    
+    matrix = np.asarray(matrix)
+    num_cols = matrix.shape[1]
+    k = min(k, num_cols)
+    
+    if stable or num_cols <= SMALL_ROW or k == 0:
+        indices = np.argsort(-matrix, axis=1, kind='stable')[:, :k]
+    else:
+        candidates = np.argpartition(matrix, num_cols - k, axis=1)[:, num_cols - k:]
+        candidate_scores = np.take_along_axis(matrix, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind='stable')
+        indices = np.take_along_axis(candidates, order, axis=1)
+    
+    return indices, np.take_along_axis(matrix, indices, axis=1)
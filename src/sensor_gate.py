@@ -0,0 +1,152 @@
+"""
+FarmOG Station - Sensor-Prior Inference Gate
+============================================
+Opt-in policy for postponing the forward pass when sensors see little risk.
+
+No sensor reading makes cross_validate independent of the image: with every
+sensor risk at or below 50 (CONFIRM_SENSOR_MIN and CONFLICT_SENSOR_MIN;
+EARLY_WARNING_RISK is 60) CONFIRMED, EARLY_WARNING and NEEDS_REVIEW are out
+of reach, but the model still decides between LOW_CONFIDENCE (its own top
+class, e.g. a diseased leaf) and UNCERTAIN. Deferring is therefore a trade:
+the gate saves energy on low-risk, healthy-band readings and delays, not
+settles, the vision result.
+
+When the gate defers, diagnose_file reports a pending UNKNOWN diagnosis
+(sensor risks only, no disease claim) and the image waits in a bounded queue
+for FarmOGFusionEngine.process_deferred (e.g. on mains power or solar
+surplus), which produces the real diagnosis.
+"""
+
+import threading
+import time
+from collections import deque, namedtuple
+
+from src.disease_siganture import SIGNATURE_TABLE
+from src.fusion_engine import HEALTHY_CLASS, CONFIRM_SENSOR_MIN, CONFLICT_SENSOR_MIN, EARLY_WARNING_RISK
+from src.risk_cache import moisture_band
+
+# Highest sensor risk at which no vision result can raise an alerting status
+# (vision still picks between LOW_CONFIDENCE and UNCERTAIN)
+ALERT_FREE_MAX_RISK = min(CONFIRM_SENSOR_MIN, CONFLICT_SENSOR_MIN, EARLY_WARNING_RISK)
+
+DeferredImage = namedtuple('DeferredImage', [
+    'item_id',        # caller's id (station/photo), or a running number
+    'source',         # image path or encoded bytes
+    'sensor_risks',   # dict from get_all_disease_risks at capture time
+    'timestamp',      # capture time (epoch seconds)
+])
+
+def in_healthy_band(sensor_data):
+    """
+    True if humidity, temperature and soil moisture are all inside the
+    Tomato___healthy signature's conditions (missing readings are not)
+    """
+    i = SIGNATURE_TABLE.index[HEALTHY_CLASS]
+    humidity = sensor_data.get('air_humidity')
+    temp = sensor_data.get('air_temp')
+    moisture = sensor_data.get('soil_moisture')
+    if humidity is None or temp is None or moisture is None:
+        return False
+    return (SIGNATURE_TABLE.humidity_lo[i] <= humidity <= SIGNATURE_TABLE.humidity_hi[i]
+            and SIGNATURE_TABLE.temp_lo[i] <= temp <= SIGNATURE_TABLE.temp_hi[i]
+            and moisture_band(moisture) == SIGNATURE_TABLE.moisture_target[i])
+
+class SensorGate:
+    """
+    Deferral policy with a bounded queue of deferred images.
+
+    Off unless attached: engine.sensor_gate = SensorGate() opts the engine in,
+    and diagnose_file consults it before running the model. Deferred images
+    that fail to decode in process_deferred are recorded in `failed`.
+    """
+
+    def __init__(self, max_risk=ALERT_FREE_MAX_RISK, require_healthy_band=True, max_deferred=1000,
+                 clock=time.time):
+        """
+        Args:
+            max_risk: defer only if no disease risk exceeds this; values above
+                      ALERT_FREE_MAX_RISK also delay images that could have
+                      raised CONFIRMED / EARLY_WARNING / NEEDS_REVIEW
+            require_healthy_band: also require readings inside the healthy band
+            max_deferred: queue bound; the oldest image is dropped when full
+            clock: time source for deferred timestamps
+        """
+        self.max_risk = max_risk
+        self.require_healthy_band = require_healthy_band
+        self.clock = clock
+        self._queue = deque(maxlen=max_deferred)
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+        self.checked = 0
+        self.deferred = 0
+        self.dropped = 0
+        self.failed = []
+
+    def __len__(self):
+        return len(self._queue)
+
+    def should_defer(self, sensor_data, sensor_risks):
+        """
+        Args:
+            sensor_data: dict with sensor readings
+            sensor_risks: dict from get_all_disease_risks
+
+        Returns:
+            bool: True if the policy postpones the model call for this reading
+        """
+        with self._lock:
+            self.checked += 1
+        if max(sensor_risks.values(), default=0.0) > self.max_risk:
+            return False
+        return not self.require_healthy_band or in_healthy_band(sensor_data)
+
+    def defer(self, source, sensor_risks, item_id=None):
+        """
+        Queue an image for later batch inference
+
+        Args:
+            source: image path or encoded bytes (file-like objects are read now)
+
+        Returns:
+            item id of the queued image
+        """
+        if hasattr(source, 'getvalue'):
+            source = source.getvalue()
+        elif hasattr(source, 'read'):
+            source = source.read()
+        with self._lock:
+            if item_id is None:
+                item_id = self._next_id
+                self._next_id += 1
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(DeferredImage(item_id, source, sensor_risks, self.clock()))
+            self.deferred += 1
+        return item_id
+
+    def take(self, max_items=None):
+        """
+        Remove deferred images from the queue, oldest first
+
+        Returns:
+            list of DeferredImage
+        """
+        with self._lock:
+            n = len(self._queue) if max_items is None else min(max_items, len(self._queue))
+            return [self._queue.popleft() for _ in range(n)]
+
+    def stats(self):
+        """
+        Returns:
+            dict: checked, deferred, dropped, failed, queued, defer_rate (0-1)
+        """
+        with self._lock:
+            return {
+                'checked': self.checked,
+                'deferred': self.deferred,
+                'dropped': self.dropped,
+                'failed': len(self.failed),
+                'queued': len(self._queue),
+                'defer_rate': self.deferred / self.checked if self.checked else 0.0,
+            }
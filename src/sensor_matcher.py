@@ -2,10 +2,101 @@
 FarmOG Station - Sensor Pattern Matching
 ========================================
 Calculates disease risk scores based on environmental sensor data
+
+The scalar scorers are pure Python; NumPy is only imported by the batch API,
+so sensor-only deployments start without it.
 """
 
-import numpy as np
-from src.disease_siganture import DISEASE_SIGNATURES, get_all_diseases
+from src.disease_siganture import (
+    SIGNATURE_TABLE, IRRIGATION_CODES, MOISTURE_CODES,
+    HUMIDITY_MIN, HUMIDITY_MAX, HUMIDITY_RANGE
+)
+from src.instrumentation import timed
+from src.selection import top_k_items
+
+MOISTURE_LOW = MOISTURE_CODES['low']
+MOISTURE_OPTIMAL = MOISTURE_CODES['optimal']
+MOISTURE_HIGH = MOISTURE_CODES['high']
+
+# Per-feature score terms. Each returns the contribution of one reading to one
+# disease (position i in SIGNATURE_TABLE), 0.0 if the feature is not scored.
+
+def _humidity_term(i, humidity):
+    t = SIGNATURE_TABLE
+    if not t.has_humidity[i]:
+        return 0.0
+    weight = t.w_humidity[i]
+    mode = t.humidity_mode[i]
+    
+    if mode == HUMIDITY_MIN:
+        if humidity >= t.humidity_lo[i]:
+            return 100 * weight
+        # Partial score if close
+        diff = t.humidity_lo[i] - humidity
+        if diff < 10:
+            return (100 - diff * 10) * weight
+    
+    elif mode == HUMIDITY_MAX:  # Spider mites (LOW humidity)
+        if humidity <= t.humidity_hi[i]:
+            return 100 * weight
+    
+    elif mode == HUMIDITY_RANGE:  # Healthy range
+        if t.humidity_lo[i] <= humidity <= t.humidity_hi[i]:
+            return 100 * weight
+    
+    return 0.0
+
+def _temperature_term(i, temp):
+    t = SIGNATURE_TABLE
+    if not t.has_temperature[i]:
+        return 0.0
+    weight = t.w_temperature[i]
+    min_t, max_t = t.temp_lo[i], t.temp_hi[i]
+    
+    if min_t <= temp <= max_t:
+        return 100 * weight
+    # Partial score if within 5°C
+    if temp < min_t and (min_t - temp) < 5:
+        return (100 - (min_t - temp) * 20) * weight
+    if temp > max_t and (temp - max_t) < 5:
+        return (100 - (temp - max_t) * 20) * weight
+    return 0.0
+
+def _moisture_term(i, moisture):
+    t = SIGNATURE_TABLE
+    if not t.has_moisture[i]:
+        return 0.0
+    target = t.moisture_target[i]
+    
+    if target == MOISTURE_HIGH and moisture > 70:
+        return 100 * t.w_moisture[i]
+    if target == MOISTURE_OPTIMAL and 40 <= moisture <= 70:
+        return 100 * t.w_moisture[i]
+    if target == MOISTURE_LOW and moisture < 40:
+        return 100 * t.w_moisture[i]
+    return 0.0
+
+def _irrigation_term(i, method):
+    # Only overhead irrigation adds risk
+    t = SIGNATURE_TABLE
+    if t.has_irrigation[i] and method == 'overhead':
+        return 100 * t.w_irrigation[i]
+    return 0.0
+
+def _rainfall_term(i, rain):
+    t = SIGNATURE_TABLE
+    if t.has_rainfall[i] and rain > 5:
+        return 100 * t.w_rainfall[i]
+    return 0.0
+
+# Sensor keys and their terms, in the order they are summed into the score
+SCORED_FEATURES = (
+    ('air_humidity', _humidity_term),
+    ('air_temp', _temperature_term),
+    ('soil_moisture', _moisture_term),
+    ('irrigation_method', _irrigation_term),
+    ('rainfall_24h', _rainfall_term),
+)
 
 def calculate_disease_risk(sensor_data, disease_name):
     """
@@ -18,82 +109,18 @@ def calculate_disease_risk(sensor_data, disease_name):
     Returns:
         float: risk score 0-100
     """
-    signature = DISEASE_SIGNATURES.get(disease_name)
-    if not signature:
+    i = SIGNATURE_TABLE.index.get(disease_name)
+    if i is None:
         return 0.0
     
-    conditions = signature['sensor_conditions']
-    weights = signature['risk_weights']
-    
     risk_score = 0.0
-    
-    # Humidity check
-    if 'humidity' in weights and 'air_humidity' in sensor_data:
-        humidity = sensor_data['air_humidity']
-        
-        if 'air_humidity_min' in conditions:
-            if humidity >= conditions['air_humidity_min']:
-                risk_score += 100 * weights['humidity']
-            else:
-                # Partial score if close
-                diff = conditions['air_humidity_min'] - humidity
-                if diff < 10:
-                    risk_score += (100 - diff * 10) * weights['humidity']
-        
-        elif 'air_humidity_max' in conditions:  # Spider mites (LOW humidity)
-            if humidity <= conditions['air_humidity_max']:
-                risk_score += 100 * weights['humidity']
-        
-        elif 'air_humidity_range' in conditions:  # Healthy range
-            min_h, max_h = conditions['air_humidity_range']
-            if min_h <= humidity <= max_h:
-                risk_score += 100 * weights['humidity']
-    
-    # Temperature check
-    if 'temperature' in weights and 'air_temp' in sensor_data:
-        temp = sensor_data['air_temp']
-        
-        if 'air_temp_range' in conditions:
-            min_t, max_t = conditions['air_temp_range']
-            if min_t <= temp <= max_t:
-                risk_score += 100 * weights['temperature']
-            else:
-                # Partial score if within 5°C
-                if temp < min_t and (min_t - temp) < 5:
-                    risk_score += (100 - (min_t - temp) * 20) * weights['temperature']
-                elif temp > max_t and (temp - max_t) < 5:
-                    risk_score += (100 - (temp - max_t) * 20) * weights['temperature']
-    
-    # Soil moisture check
-    if 'moisture' in weights and 'soil_moisture' in sensor_data:
-        moisture = sensor_data['soil_moisture']
-        target = conditions.get('soil_moisture', 'optimal')
-        
-        if target == 'high' and moisture > 70:
-            risk_score += 100 * weights['moisture']
-        elif target == 'optimal' and 40 <= moisture <= 70:
-            risk_score += 100 * weights['moisture']
-        elif target == 'low' and moisture < 40:
-            risk_score += 100 * weights['moisture']
-    
-    # Irrigation method check
-    if 'irrigation' in weights and 'irrigation_method' in sensor_data:
-        method = sensor_data['irrigation_method']
-        risk_method = conditions.get('irrigation_risk')
-        
-        if risk_method == 'overhead' and method == 'overhead':
-            risk_score += 100 * weights['irrigation']
-        elif risk_method != 'overhead' or method == 'drip':
-            risk_score += 0  # No additional risk
-    
-    # Rainfall check
-    if 'rainfall' in weights and 'rainfall_24h' in sensor_data:
-        rain = sensor_data['rainfall_24h']
-        if conditions.get('rainfall') == 'frequent' and rain > 5:
-            risk_score += 100 * weights['rainfall']
+    for key, term in SCORED_FEATURES:
+        if key in sensor_data:
+            risk_score += term(i, sensor_data[key])
     
     return min(100.0, risk_score)
 
+@timed('sensor_scoring')
 def get_all_disease_risks(sensor_data):
     """
     Calculate risk scores for all diseases
@@ -102,7 +129,7 @@ def get_all_disease_risks(sensor_data):
         dict: {disease_name: risk_score}
     """
     risks = {}
-    for disease in get_all_diseases():
+    for disease in SIGNATURE_TABLE.diseases:
         risks[disease] = calculate_disease_risk(sensor_data, disease)
     
     return risks
@@ -115,5 +142,204 @@ def get_top_risks(sensor_data, top_n=3):
         list of tuples: [(disease_name, risk_score), ...]
     """
     risks = get_all_disease_risks(sensor_data)
-    sorted_risks = sorted(risks.items(), key=lambda x: x[1], reverse=True)
-    return sorted_risks[:top_n]
\ No newline at end of file
+    return top_k_items(risks, top_n)
+
+
+_MISSING = object()
+
+class IncrementalRiskScorer:
+    """
+    Stateful scorer for an always-on station loop.
+    
+    Caches every per-disease, per-feature score term. On update() only the
+    terms whose sensor input changed are recomputed; totals are then re-summed
+    in the scalar scorer's order, so results equal get_all_disease_risks.
+    """
+    
+    def __init__(self, sensor_data=None):
+        n = len(SIGNATURE_TABLE.diseases)
+        self._inputs = [_MISSING] * len(SCORED_FEATURES)
+        self._terms = [[0.0] * n for _ in SCORED_FEATURES]
+        self.risks = {disease: 0.0 for disease in SIGNATURE_TABLE.diseases}
+        self.terms_recomputed = 0
+        if sensor_data is not None:
+            self.update(sensor_data)
+    
+    def update(self, sensor_data, top_n=3, partial=False):
+        """
+        Apply a new reading and rescore only what changed
+        
+        Args:
+            sensor_data: dict with sensor readings (same keys as calculate_disease_risk)
+            top_n: number of top risks to return
+            partial: treat sensor_data as a delta; keys not present keep their last value
+        
+        Returns:
+            tuple: (risks dict {disease_name: risk_score}, [(disease_name, risk_score), ...] top N)
+        """
+        n = len(SIGNATURE_TABLE.diseases)
+        changed = False
+        
+        for f, (key, term) in enumerate(SCORED_FEATURES):
+            if key in sensor_data:
+                value = sensor_data[key]
+            elif partial:
+                continue
+            else:
+                value = _MISSING
+            
+            previous = self._inputs[f]
+            if previous is not _MISSING and value is not _MISSING and previous == value:
+                continue
+            if previous is _MISSING and value is _MISSING:
+                continue
+            
+            self._inputs[f] = value
+            if value is _MISSING:
+                self._terms[f] = [0.0] * n
+            else:
+                self._terms[f] = [term(i, value) for i in range(n)]
+                self.terms_recomputed += n
+            changed = True
+        
+        if changed:
+            h, t, m, irr, r = self._terms
+            self.risks = {
+                disease: min(100.0, 0.0 + h[i] + t[i] + m[i] + irr[i] + r[i])
+                for i, disease in enumerate(SIGNATURE_TABLE.diseases)
+            }
+        
+        return self.risks, self.top_risks(top_n)
+    
+    def top_risks(self, top_n=3):
+        """
+        Returns:
+            list of tuples: [(disease_name, risk_score), ...] from the cached totals
+        """
+        return top_k_items(self.risks, top_n)
+
+
+_TABLE_ARRAYS = None
+
+def _table_arrays():
+    """SIGNATURE_TABLE as read-only (1, n_diseases) NumPy rows, built once"""
+    global _TABLE_ARRAYS
+    if _TABLE_ARRAYS is None:
+        import numpy as np
+        arrays = {}
+        for field in SIGNATURE_TABLE._fields[2:]:
+            arr = np.array(getattr(SIGNATURE_TABLE, field))[np.newaxis, :]
+            arr.flags.writeable = False
+            arrays[field] = arr
+        _TABLE_ARRAYS = arrays
+    return _TABLE_ARRAYS
+
+def encode_irrigation(methods):
+    """
+    Convert irrigation method strings to batch scorer codes
+    
+    Args:
+        methods: iterable of strings ('drip', 'overhead', ...) or None
+    
+    Returns:
+        numpy array: int8 codes, -1 for unknown or missing methods
+    """
+    import numpy as np
+    return np.array([IRRIGATION_CODES.get(m, -1) for m in methods], dtype=np.int8)
+
+@timed('sensor_scoring')
+def calculate_disease_risk_batch(air_temp=None, air_humidity=None, soil_moisture=None,
+                                 rainfall_24h=None, irrigation=None, diseases=None):
+    """
+    Calculate risk scores for many readings and diseases in one NumPy pass
+    
+    Columns mirror the keys of the sensor_data dict used by calculate_disease_risk.
+    A column that is None, or a NaN value inside a column, behaves like a
+    missing key in the scalar scorer. Results match calculate_disease_risk exactly.
+    
+    Args:
+        air_temp, air_humidity, soil_moisture, rainfall_24h: array-like (N,) or None
+        irrigation: array-like (N,) of IRRIGATION_CODES values or None
+        diseases: list of disease names (default: SIGNATURE_TABLE.diseases)
+    
+    Returns:
+        numpy array: (N, n_diseases) float64 risk matrix, columns in `diseases` order
+    """
+    import numpy as np
+    
+    columns = [air_temp, air_humidity, soil_moisture, rainfall_24h, irrigation]
+    n = max((np.shape(c)[0] for c in columns if c is not None), default=0)
+    
+    def as_column(values):
+        if values is None:
+            return np.full((n, 1), np.nan)
+        return np.asarray(values, dtype=np.float64).reshape(n, 1)
+    
+    temp = as_column(air_temp)
+    humidity = as_column(air_humidity)
+    moisture = as_column(soil_moisture)
+    rain = as_column(rainfall_24h)
+    if irrigation is None:
+        irrigation = np.full((n, 1), -1, dtype=np.int8)
+    else:
+        irrigation = np.asarray(irrigation).reshape(n, 1)
+    
+    t = _table_arrays()
+    
+    # Humidity check
+    w = t['w_humidity']
+    mode = t['humidity_mode']
+    diff = t['humidity_lo'] - humidity
+    min_term = np.where(diff <= 0, 100 * w, np.where(diff < 10, (100 - diff * 10) * w, 0.0))
+    max_term = np.where(humidity <= t['humidity_hi'], 100 * w, 0.0)
+    range_term = np.where((t['humidity_lo'] <= humidity) & (humidity <= t['humidity_hi']), 100 * w, 0.0)
+    humidity_term = np.select(
+        [mode == HUMIDITY_MIN, mode == HUMIDITY_MAX, mode == HUMIDITY_RANGE],
+        [min_term, max_term, range_term],
+        0.0
+    )
+    humidity_term = np.where(t['has_humidity'], humidity_term, 0.0)
+    
+    # Temperature check (partial score within 5°C of the range)
+    w = t['w_temperature']
+    below = t['temp_lo'] - temp
+    above = temp - t['temp_hi']
+    temp_term = np.where((below > 0) & (below < 5), (100 - below * 20) * w, 0.0)
+    temp_term = np.where((above > 0) & (above < 5), (100 - above * 20) * w, temp_term)
+    temp_term = np.where((below <= 0) & (above <= 0), 100 * w, temp_term)
+    temp_term = np.where(t['has_temperature'], temp_term, 0.0)
+    
+    # Soil moisture check
+    target = t['moisture_target']
+    moisture_match = (
+        ((target == MOISTURE_HIGH) & (moisture > 70)) |
+        ((target == MOISTURE_OPTIMAL) & (40 <= moisture) & (moisture <= 70)) |
+        ((target == MOISTURE_LOW) & (moisture < 40))
+    )
+    moisture_term = np.where(t['has_moisture'] & moisture_match, 100 * t['w_moisture'], 0.0)
+    
+    # Irrigation method check
+    irrigation_match = t['has_irrigation'] & (irrigation == IRRIGATION_CODES['overhead'])
+    irrigation_term = np.where(irrigation_match, 100 * t['w_irrigation'], 0.0)
+    
+    # Rainfall check
+    rain_term = np.where(t['has_rainfall'] & (rain > 5), 100 * t['w_rainfall'], 0.0)
+    
+    # Same term order as calculate_disease_risk so float sums are identical
+    risks = np.zeros((n, len(SIGNATURE_TABLE.diseases)))
+    risks += humidity_term
+    risks += temp_term
+    risks += moisture_term
+    risks += irrigation_term
+    risks += rain_term
+    np.minimum(risks, 100.0, out=risks)
+    
+    if diseases is None:
+        return risks
+    
+    selected = np.zeros((n, len(diseases)))
+    for col, disease in enumerate(diseases):
+        i = SIGNATURE_TABLE.index.get(disease)
+        if i is not None:
+            selected[:, col] = risks[:, i]
+    return selected
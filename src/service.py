@@ -0,0 +1,442 @@
+"""
+FarmOG Station - HTTP Inference Service
+=======================================
+Asyncio HTTP/1.1 service over FarmOGFusionEngine for gateways and mobile clients.
+
+Endpoints (JSON responses):
+    GET  /health        model status and counters
+    GET  /metrics       pipeline stage timings, Prometheus text format
+    POST /sensor-risk   {"sensor_data": {...}, "top_n": 3}
+    POST /vision        raw image bytes, or {"image": "<base64>", "top_n": 3}
+    POST /diagnose      {"image": "<base64>", "sensor_data": {...}, "report": false}
+
+Sensor-only requests are scored inline on the event loop (pure Python, no
+model). Image decoding runs in a thread pool and forward passes go through a
+MicroBatcher, so concurrent requests share batches. Requests beyond
+`max_pending` image jobs are rejected with 503 instead of queueing unbounded.
+
+Run with:
+    python -m src.service --model-path notebooks/models/farmog_resnet50v2_classifier.h5
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from src import instrumentation
+from src.sensor_matcher import get_all_disease_risks
+from src.selection import top_k_items
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+MAX_HEADER_LINES = 100
+
+# Readings the risk scorer compares numerically; other keys pass through as-is
+NUMERIC_SENSOR_FIELDS = ('air_humidity', 'air_temp', 'soil_moisture', 'rainfall_24h')
+
+class HTTPError(Exception):
+    """Error returned to the client as a JSON body with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def _json_body(body):
+    try:
+        payload = json.loads(body or b'{}')
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise HTTPError(400, f"Invalid JSON: {e}")
+    if not isinstance(payload, dict):
+        raise HTTPError(400, "Request body must be a JSON object")
+    return payload
+
+def _image_bytes(payload):
+    image = payload.get('image')
+    if not image:
+        raise HTTPError(400, "Missing 'image' (base64)")
+    try:
+        return base64.b64decode(image, validate=True)
+    except (TypeError, ValueError) as e:
+        raise HTTPError(400, f"Invalid base64 image: {e}")
+
+def _sensor_data(payload):
+    """Sensor readings with numeric fields coerced to float; null drops a reading"""
+    sensor_data = payload.get('sensor_data')
+    if not isinstance(sensor_data, dict):
+        raise HTTPError(400, "Missing 'sensor_data' object")
+    sensor_data = dict(sensor_data)
+    for key in NUMERIC_SENSOR_FIELDS:
+        if key not in sensor_data:
+            continue
+        value = sensor_data[key]
+        if value is None:
+            del sensor_data[key]
+            continue
+        if isinstance(value, bool):
+            raise HTTPError(400, f"'sensor_data.{key}' must be a number, got {value!r}")
+        try:
+            sensor_data[key] = float(value)
+        except (TypeError, ValueError):
+            raise HTTPError(400, f"'sensor_data.{key}' must be a number, got {value!r}")
+    return sensor_data
+
+def _top_n(payload, default=3):
+    """top_n as an int; JSON integers and whole floats (2.0) only"""
+    value = payload.get('top_n', default)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise HTTPError(400, f"'top_n' must be a non-negative integer, got {value!r}")
+    return value
+
+async def _readline(reader, status, message):
+    """readline() with an over-long line (past the StreamReader limit) as an HTTPError"""
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise HTTPError(status, message)
+
+class FarmOGService:
+    """
+    Request handling for the HTTP service, independent of the transport.
+
+    handle() is what both the socket server and ServiceClient call.
+    """
+
+    def __init__(self, engine, max_pending=64, max_body_bytes=10 * 1024 * 1024,
+                 max_batch_size=16, max_wait_ms=10, decode_workers=None):
+        """
+        Args:
+            engine: FarmOGFusionEngine
+            max_pending: image requests in flight before new ones get 503
+            max_body_bytes: largest accepted request body
+            max_batch_size, max_wait_ms: micro-batching of forward passes
+            decode_workers: image decode threads (default: executor default)
+        """
+        self.engine = engine
+        self.max_pending = max_pending
+        self.max_body_bytes = max_body_bytes
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.decode_workers = decode_workers
+
+        self.pending = 0
+        self.requests = 0
+        self.rejected = 0
+        self._executor = None
+        self._batcher = None
+
+    def _vision_pipeline(self):
+        if self._batcher is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.decode_workers,
+                                                thread_name_prefix="farmog-decode")
+            self._batcher = self.engine.create_micro_batcher(self.max_batch_size, self.max_wait_ms)
+        return self._executor, self._batcher
+
+    def close(self):
+        if self._batcher is not None:
+            self._batcher.close()
+            self._executor.shutdown(wait=True)
+            self._batcher = None
+            self._executor = None
+
+    # Scoring ------------------------------------------------------------------
+
+    def sensor_risks(self, sensor_data):
+        """Risk dict through the engine's memoized scorer if it has one"""
+        scorer = self.engine.risk_scorer
+        if scorer is not None:
+            return scorer.get_all_disease_risks(sensor_data)
+        return get_all_disease_risks(sensor_data)
+
+    async def predict_image(self, data):
+        """
+        Vision predictions for encoded image bytes
+
+        Returns:
+            dict: {class_name: confidence, ...}
+        """
+        engine = self.engine
+        cache = engine.prediction_cache
+        executor, batcher = self._vision_pipeline()
+        loop = asyncio.get_running_loop()
+        key = None
+        if cache is not None:
+            from src.prediction_cache import content_hash, prediction_key
+            key = prediction_key(content_hash(data), engine.model_version, engine.backbone)
+            # A memory miss falls through to SQLite; keep that off the event loop
+            cached = await loop.run_in_executor(executor, cache.get, key)
+            if cached is not None:
+                return cached
+
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPError(503, "Too many pending image requests, retry later")
+
+        self.pending += 1
+        try:
+            from src.preprocessing import preprocess_image
+            try:
+                # A fresh array per request: it waits in the batch queue after decoding
+                image = await loop.run_in_executor(executor, preprocess_image, data, engine.backbone)
+            except (OSError, ValueError) as e:
+                raise HTTPError(400, f"Cannot decode image: {e}")
+            predictions = await asyncio.wrap_future(batcher.submit(image))
+        finally:
+            self.pending -= 1
+
+        if cache is not None:
+            await loop.run_in_executor(executor, cache.put, key, predictions)
+        return predictions
+
+    # Endpoints ----------------------------------------------------------------
+
+    async def health(self, body, headers):
+        return {
+            'status': 'ok',
+            'vision_ready': self.engine.vision_ready,
+            'pending': self.pending,
+            'requests': self.requests,
+            'rejected': self.rejected,
+        }
+
+    async def metrics(self, body, headers):
+        return instrumentation.prometheus_text()
+
+    async def sensor_risk(self, body, headers):
+        payload = _json_body(body)
+        risks = self.sensor_risks(_sensor_data(payload))
+        top_n = _top_n(payload)
+        return {
+            'risks': risks,
+            'top': [[disease, risk] for disease, risk in top_k_items(risks, top_n)],
+        }
+
+    async def vision(self, body, headers):
+        if headers.get('content-type', '').startswith('image/'):
+            data, top_n = body, 3
+        else:
+            payload = _json_body(body)
+            data, top_n = _image_bytes(payload), _top_n(payload)
+        predictions = await self.predict_image(data)
+        top = self.engine.get_top_vision_predictions(predictions, top_n=top_n)
+        return {
+            'predictions': predictions,
+            'top': [[disease, confidence] for disease, confidence in top],
+        }
+
+    async def diagnose(self, body, headers):
+        payload = _json_body(body)
+        data = _image_bytes(payload)
+        sensor_data = _sensor_data(payload)
+
+        vision_results = await self.predict_image(data)
+        diagnosis = self.engine.diagnose_risks(vision_results, self.sensor_risks(sensor_data))
+        response = {'diagnosis': diagnosis.to_dict()}
+        if payload.get('report'):
+            response['report'] = self.engine.generate_report(diagnosis)
+        return response
+
+    ROUTES = {
+        '/health': ('GET', health),
+        '/metrics': ('GET', metrics),
+        '/sensor-risk': ('POST', sensor_risk),
+        '/vision': ('POST', vision),
+        '/diagnose': ('POST', diagnose),
+    }
+
+    async def handle(self, method, path, body=b'', headers=None):
+        """
+        Dispatch one request
+
+        Args:
+            method: 'GET' or 'POST'
+            path: request path (query string ignored)
+            body: request body bytes
+            headers: dict with lowercase header names
+
+        Returns:
+            tuple: (status code, JSON-serializable payload, or str for plain text)
+        """
+        self.requests += 1
+        route = self.ROUTES.get(path.split('?', 1)[0])
+        if route is None:
+            return 404, {'error': f"No endpoint {path}"}
+        if method != route[0]:
+            return 405, {'error': f"{path} expects {route[0]}"}
+        if len(body) > self.max_body_bytes:
+            return 413, {'error': f"Body exceeds {self.max_body_bytes} bytes"}
+        try:
+            return 200, await route[1](self, body, headers or {})
+        except HTTPError as e:
+            return e.status, {'error': e.message}
+        except Exception as e:
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+
+    # HTTP transport -------------------------------------------------------------
+
+    async def _read_request(self, reader):
+        """Parse one request; None when the client closed the connection"""
+        line = await _readline(reader, 400, "Request line too long")
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await _readline(reader, 431, "Header line too long")
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HTTPError(400, "Too many headers")
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > self.max_body_bytes:
+            raise HTTPError(413, f"Body exceeds {self.max_body_bytes} bytes")
+        body = await reader.readexactly(length) if length else b''
+        return method, target, headers, body
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, target, headers, body = request
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                    status, payload = await self.handle(method, target, body, headers)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': e.message}
+                except asyncio.IncompleteReadError:
+                    break
+
+                if isinstance(payload, str):
+                    data, content_type = payload.encode(), "text/plain; version=0.0.4"
+                else:
+                    data, content_type = json.dumps(payload).encode(), "application/json"
+                head = [
+                    f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(data)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                if status == 503:
+                    head.append("Retry-After: 1")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='0.0.0.0', port=8080):
+        """Serve HTTP until cancelled"""
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+class ServiceClient:
+    """
+    In-process client for tests and local scripts: calls FarmOGService.handle
+    directly, no sockets involved.
+    """
+
+    def __init__(self, service):
+        self.service = service
+
+    async def get(self, path):
+        """
+        Returns:
+            tuple: (status code, decoded JSON payload)
+        """
+        return await self.request('GET', path)
+
+    async def post(self, path, json_body=None, data=None, content_type=None):
+        """
+        Args:
+            json_body: object sent as JSON
+            data: raw body bytes (e.g. an image for /vision)
+            content_type: header for raw bodies, e.g. 'image/jpeg'
+
+        Returns:
+            tuple: (status code, decoded JSON payload)
+        """
+        headers = {}
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers['content-type'] = 'application/json'
+        elif content_type is not None:
+            headers['content-type'] = content_type
+        return await self.request('POST', path, data or b'', headers)
+
+    async def request(self, method, path, body=b'', headers=None):
+        status, payload = await self.service.handle(method, path, body, headers)
+        # Round-trip through JSON so results look exactly like the wire format
+        return status, json.loads(json.dumps(payload))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FarmOG Station HTTP inference service")
+    parser.add_argument('--model-path', default='notebooks/models/farmog_resnet50v2_classifier.h5')
+    parser.add_argument('--class-names', default='notebooks/models/class_names.json')
+    parser.add_argument('--backend', default='keras', help="keras, tflite or tflite_int8")
+    parser.add_argument('--backbone', default='resnet50v2', help="preprocessing profile")
+    parser.add_argument('--threads', type=int, default=None, help="TFLite interpreter threads")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-pending', type=int, default=64)
+    parser.add_argument('--max-batch-size', type=int, default=16)
+    parser.add_argument('--max-wait-ms', type=float, default=10)
+    parser.add_argument('--cache-path', default=None, help="SQLite file for the prediction cache")
+    args = parser.parse_args(argv)
+
+    from src.fusion_engine import FarmOGFusionEngine
+    from src.prediction_cache import PredictionCache
+    from src.risk_cache import CachedRiskScorer
+
+    with open(args.class_names, 'r') as f:
+        class_names = json.load(f)
+    engine = FarmOGFusionEngine.from_model_file(args.model_path, class_names, backend=args.backend,
+                                                num_threads=args.threads, lazy=True,
+                                                backbone=args.backbone,
+                                                prediction_cache=PredictionCache(db_path=args.cache_path))
+    engine.risk_scorer = CachedRiskScorer()
+    engine.warm_up(background=True)
+
+    service = FarmOGService(engine, max_pending=args.max_pending, max_batch_size=args.max_batch_size,
+                            max_wait_ms=args.max_wait_ms)
+    print(f"FarmOG service listening on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+if __name__ == '__main__':
+    main()
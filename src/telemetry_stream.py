@@ -0,0 +1,296 @@
+"""
+FarmOG Station - Streaming Telemetry Pipeline
+=============================================
+Replays timestamped sensor records through rolling-window aggregates and
+emits risk updates only when a disease score crosses the alert threshold.
+
+Every stage is a generator and every window is a fixed-size ring of time
+buckets, so memory stays constant no matter how long the stream runs.
+"""
+
+import csv
+import json
+from collections import namedtuple
+from datetime import datetime
+
+from src.sensor_matcher import get_all_disease_risks
+
+NUMERIC_FIELDS = ('air_temp', 'air_humidity', 'soil_moisture', 'rainfall', 'rainfall_24h')
+
+RiskUpdate = namedtuple('RiskUpdate', [
+    'timestamp',        # epoch seconds of the reading that caused the crossing
+    'station_id',
+    'disease',
+    'risk_score',
+    'previous_score',
+    'rising',           # True when crossing above the threshold, False when falling below
+    'aggregates',       # rolling window values at that moment
+])
+
+# =============================================================================
+# Record readers
+# =============================================================================
+
+def parse_timestamp(value):
+    """
+    Convert epoch seconds or an ISO 8601 string to epoch seconds
+
+    Returns:
+        float: seconds since the epoch
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+def _clean_record(raw):
+    """Normalize one raw record: numeric fields to float, blanks dropped"""
+    record = {}
+    for key, value in raw.items():
+        if value is None or value == '':
+            continue
+        if key in NUMERIC_FIELDS:
+            value = float(value)
+        record[key] = value
+    record['timestamp'] = parse_timestamp(record['timestamp'])
+    return record
+
+def read_csv_records(path):
+    """
+    Stream sensor records from a CSV file with a header row
+
+    Expected columns: timestamp, optional station_id, and any of air_temp,
+    air_humidity, soil_moisture, rainfall (mm since last sample),
+    rainfall_24h, irrigation_method.
+
+    Yields:
+        dict: one cleaned record per row
+    """
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            yield _clean_record(row)
+
+def read_jsonl_records(path):
+    """
+    Stream sensor records from a JSON Lines file (one object per line)
+
+    Yields:
+        dict: one cleaned record per line
+    """
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield _clean_record(json.loads(line))
+
+# =============================================================================
+# Rolling windows
+# =============================================================================
+
+class RollingWindow:
+    """
+    Time-bucketed rolling aggregate over the last `window_seconds`.
+
+    Samples are folded into `window_seconds / bucket_seconds` buckets held in a
+    ring, so add() is amortized O(1) and memory is fixed. Results are exact to
+    bucket resolution: a bucket leaves the window all at once.
+    """
+
+    def __init__(self, window_seconds, bucket_seconds):
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = max(1, int(round(window_seconds / bucket_seconds)))
+
+        n = self.num_buckets
+        self._ids = [None] * n
+        self._sums = [0.0] * n
+        self._mins = [None] * n
+        self._maxs = [None] * n
+        self._last_id = None
+
+        self.total = 0.0
+        self._min = None
+        self._max = None
+        self._extremes_stale = False
+
+    def _expire_until(self, bucket_id):
+        """Clear every bucket that falls out of the window when time reaches bucket_id"""
+        if self._last_id is None:
+            self._last_id = bucket_id
+            return
+        if bucket_id <= self._last_id:
+            return
+
+        # At most num_buckets slots need clearing, however long the gap
+        start = max(self._last_id + 1, bucket_id - self.num_buckets + 1)
+        for expired in range(start, bucket_id + 1):
+            slot = expired % self.num_buckets
+            if self._ids[slot] is not None:
+                self.total -= self._sums[slot]
+                if self._mins[slot] == self._min or self._maxs[slot] == self._max:
+                    self._extremes_stale = True
+            self._ids[slot] = None
+            self._sums[slot] = 0.0
+            self._mins[slot] = None
+            self._maxs[slot] = None
+        if bucket_id - self._last_id >= self.num_buckets:
+            # Whole window expired; drop accumulated float error with it
+            self.total = 0.0
+        self._last_id = bucket_id
+
+    def add(self, timestamp, value):
+        """Fold one sample into the window"""
+        bucket_id = int(timestamp // self.bucket_seconds)
+        self._expire_until(bucket_id)
+        if self._last_id - bucket_id >= self.num_buckets:
+            return  # Late sample older than the window
+
+        slot = bucket_id % self.num_buckets
+        if self._ids[slot] != bucket_id:
+            self._ids[slot] = bucket_id
+            self._mins[slot] = value
+            self._maxs[slot] = value
+        else:
+            self._mins[slot] = min(self._mins[slot], value)
+            self._maxs[slot] = max(self._maxs[slot], value)
+        self._sums[slot] += value
+        self.total += value
+
+        if not self._extremes_stale:
+            self._min = value if self._min is None else min(self._min, value)
+            self._max = value if self._max is None else max(self._max, value)
+
+    def advance(self, timestamp):
+        """Move the window end to `timestamp` without adding a sample"""
+        self._expire_until(int(timestamp // self.bucket_seconds))
+
+    def _refresh_extremes(self):
+        if self._extremes_stale:
+            mins = [m for m in self._mins if m is not None]
+            maxs = [m for m in self._maxs if m is not None]
+            self._min = min(mins) if mins else None
+            self._max = max(maxs) if maxs else None
+            self._extremes_stale = False
+
+    @property
+    def minimum(self):
+        self._refresh_extremes()
+        return self._min
+
+    @property
+    def maximum(self):
+        self._refresh_extremes()
+        return self._max
+
+class StationWindows:
+    """
+    Rolling aggregates for one station: 24h rainfall, hours above a humidity
+    threshold and min/max air temperature.
+    """
+
+    def __init__(self, window_hours=24, bucket_minutes=15, humidity_threshold=90.0,
+                 max_gap_minutes=60):
+        window = window_hours * 3600
+        bucket = bucket_minutes * 60
+        self.humidity_threshold = humidity_threshold
+        self.max_gap = max_gap_minutes * 60
+
+        self.rainfall = RollingWindow(window, bucket)
+        self.humid_seconds = RollingWindow(window, bucket)
+        self.temperature = RollingWindow(window, bucket)
+
+        self._last_ts = None
+        self._last_humid = False
+
+    def update(self, record):
+        """Fold one record into the windows"""
+        ts = record['timestamp']
+
+        # Attribute the time since the last sample to the last humidity state,
+        # capped so a sensor outage does not count as hours of saturation
+        if self._last_ts is not None and ts > self._last_ts and self._last_humid:
+            self.humid_seconds.add(ts, min(ts - self._last_ts, self.max_gap))
+        if 'air_humidity' in record:
+            self._last_humid = record['air_humidity'] >= self.humidity_threshold
+        self._last_ts = ts if self._last_ts is None else max(ts, self._last_ts)
+
+        if 'rainfall' in record:
+            self.rainfall.add(ts, record['rainfall'])
+        else:
+            self.rainfall.advance(ts)
+        if 'air_temp' in record:
+            self.temperature.add(ts, record['air_temp'])
+        else:
+            self.temperature.advance(ts)
+        self.humid_seconds.advance(ts)
+
+    def aggregates(self):
+        """
+        Returns:
+            dict: rainfall_24h (mm), humid_hours, temp_min, temp_max
+        """
+        return {
+            'rainfall_24h': self.rainfall.total,
+            'humid_hours': self.humid_seconds.total / 3600.0,
+            'temp_min': self.temperature.minimum,
+            'temp_max': self.temperature.maximum,
+        }
+
+# =============================================================================
+# Streaming risk updates
+# =============================================================================
+
+def stream_risk_updates(records, threshold=60.0, window_hours=24, bucket_minutes=15,
+                        humidity_threshold=90.0):
+    """
+    Score a stream of records and yield only threshold crossings
+
+    Each record is merged with the station's last known readings, and
+    rainfall_24h comes from the rolling window when records carry per-sample
+    `rainfall` instead of a precomputed 24h total.
+
+    Args:
+        records: iterable of dicts with 'timestamp' (see read_csv_records)
+        threshold: risk score that triggers an update when crossed (either way)
+        window_hours, bucket_minutes: rolling window length and resolution
+        humidity_threshold: humidity (%) counted towards humid_hours
+
+    Yields:
+        RiskUpdate: one per disease per crossing
+    """
+    stations = {}
+
+    for record in records:
+        station_id = record.get('station_id', 'default')
+        state = stations.get(station_id)
+        if state is None:
+            state = {
+                'windows': StationWindows(window_hours, bucket_minutes, humidity_threshold),
+                'readings': {},
+                'risks': {},
+                'uses_rain_window': False,
+            }
+            stations[station_id] = state
+
+        windows = state['windows']
+        windows.update(record)
+        aggregates = windows.aggregates()
+
+        readings = state['readings']
+        for key in ('air_temp', 'air_humidity', 'soil_moisture', 'irrigation_method', 'rainfall_24h'):
+            if key in record:
+                readings[key] = record[key]
+        if 'rainfall' in record:
+            state['uses_rain_window'] = True
+        if state['uses_rain_window']:
+            readings['rainfall_24h'] = aggregates['rainfall_24h']
+
+        previous = state['risks']
+        risks = get_all_disease_risks(readings)
+        for disease, risk in risks.items():
+            before = previous.get(disease, 0.0)
+            if (risk > threshold) != (before > threshold):
+                yield RiskUpdate(record['timestamp'], station_id, disease, risk, before,
+                                 risk > threshold, aggregates)
+        state['risks'] = risks
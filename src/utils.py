@@ -4,25 +4,27 @@ FarmOG Station - Utility Functions
 Helper functions for image processing, data validation, etc.
 """
 
-import numpy as np
-from PIL import Image
-
-def preprocess_image(image_path, target_size=(224, 224)):
+def preprocess_image(image_path, target_size=(224, 224), profile='resnet50v2'):
     """
     Load and preprocess image for model input
     
     Args:
-        image_path: path to image file
-        target_size: tuple (height, width)
+        image_path: path to image file (or bytes, file-like object, PIL image)
+        target_size: tuple (width, height)
+        profile: backbone preprocessing profile, see src.preprocessing.PROFILES
     
     Returns:
-        numpy array: preprocessed image
+        numpy array: float32 image normalized for `profile` ([-1, 1] for
+        'resnet50v2'). Before profiles were added this returned float64 in
+        [0, 1]; pass profile='unit' for that 0-1 scaling (now float32)
     """
-    img = Image.open(image_path)
-    img = img.convert('RGB')
-    img = img.resize(target_size)
-    img_array = np.array(img) / 255.0  # Normalize to 0-1
-    return img_array
+    # Imported here so sensor/report helpers don't pull in NumPy and PIL
+    from src import preprocessing
+    
+    profile = preprocessing.get_profile(profile)
+    if tuple(target_size) != profile.size:
+        profile = profile._replace(size=tuple(target_size))
+    return preprocessing.preprocess_image(image_path, profile)
 
 def validate_sensor_data(sensor_data):
     """
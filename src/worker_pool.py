@@ -0,0 +1,117 @@
+"""
+FarmOG Station - Multi-Process Inference Pool
+=============================================
+Runs decode, inference and fusion in N worker processes so CPU servers use
+every core instead of one GIL-bound interpreter.
+
+Each worker opens the same .tflite file by path. The TFLite interpreter
+memory-maps the flatbuffer, so the weights sit once in the OS page cache and
+are shared by all workers; only activations are private per process.
+"""
+
+import multiprocessing
+import os
+
+# Per-process state, set by _init_worker
+_ENGINE = None
+
+def _init_worker(model_path, class_names, backend, backbone, num_threads):
+    """Build this worker's engine (runs once per process)"""
+    global _ENGINE
+    from src.fusion_engine import FarmOGFusionEngine
+    _ENGINE = FarmOGFusionEngine.from_model_file(model_path, class_names, backend=backend,
+                                                 num_threads=num_threads, backbone=backbone)
+
+def _predict_task(source):
+    if isinstance(source, (str, bytes, os.PathLike)):
+        return _ENGINE.predict_from_file(source)
+    return _ENGINE.predict_from_image(source)
+
+def _diagnose_task(task):
+    source, sensor_data = task
+    return _ENGINE.diagnose(_predict_task(source), sensor_data).to_dict()
+
+class InferenceWorkerPool:
+    """
+    Process pool of fusion engines sharing one memory-mapped TFLite model.
+
+    Tasks are distributed through the pool's queue and results come back in
+    input order. Keras models work too, but every worker then holds its own
+    copy of the weights.
+    """
+
+    def __init__(self, model_path, class_names, backend='tflite', backbone='resnet50v2',
+                 processes=None, threads_per_worker=1, chunksize=4, start_method='spawn'):
+        """
+        Args:
+            model_path: .tflite file (or .h5 for 'keras')
+            class_names: Dict mapping indices to class names
+            backend: backend name, see src.inference_backends.BACKENDS
+            backbone: preprocessing profile name, see src.preprocessing.PROFILES
+            processes: worker count (default: CPU count)
+            threads_per_worker: interpreter threads per worker; 1 avoids oversubscription
+            chunksize: tasks handed to a worker at a time
+            start_method: multiprocessing start method; 'spawn' keeps workers
+                          clear of the parent's TensorFlow and thread state
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.chunksize = chunksize
+        context = multiprocessing.get_context(start_method)
+        self._pool = context.Pool(
+            self.processes,
+            initializer=_init_worker,
+            initargs=(model_path, class_names, backend, backbone, threads_per_worker)
+        )
+
+    def imap_predict(self, sources):
+        """
+        Args:
+            sources: iterable of image paths, encoded bytes or preprocessed arrays
+
+        Yields:
+            dict: {class_name: confidence, ...} per source, in input order
+        """
+        return self._pool.imap(_predict_task, sources, chunksize=self.chunksize)
+
+    def predict(self, sources):
+        """
+        Returns:
+            list of dicts: [{class_name: confidence, ...}, ...] in input order
+        """
+        return list(self.imap_predict(sources))
+
+    def imap_diagnose(self, tasks):
+        """
+        Args:
+            tasks: iterable of (image source, sensor_data dict)
+
+        Yields:
+            dict: cross_validate diagnosis per task, in input order
+        """
+        return self._pool.imap(_diagnose_task, tasks, chunksize=self.chunksize)
+
+    def diagnose(self, tasks):
+        """
+        Returns:
+            list of dicts: cross_validate diagnoses in input order
+        """
+        return list(self.imap_diagnose(tasks))
+
+    def close(self):
+        """Finish queued tasks and stop the workers"""
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self):
+        """Stop the workers immediately"""
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()